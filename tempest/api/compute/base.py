@@ -78,17 +78,15 @@ class BaseComputeTest(tempest.test.BaseTestCase):
 
     @classmethod
     def clear_servers(cls):
-        for server in cls.servers:
-            try:
-                cls.servers_client.delete_server(server['id'])
-            except Exception:
-                pass
+        cls.servers_client.map_concurrently(
+            cls.servers_client.delete_server,
+            [server['id'] for server in cls.servers], return_exceptions=True)
 
-        for server in cls.servers:
-            try:
-                cls.servers_client.wait_for_server_termination(server['id'])
-            except Exception:
-                pass
+        try:
+            cls.servers_client.wait_for_servers_termination(
+                [server['id'] for server in cls.servers])
+        except Exception:
+            pass
 
     @classmethod
     def clear_images(cls):
@@ -141,23 +139,28 @@ class BaseComputeTest(tempest.test.BaseTestCase):
         servers = [body]
         if 'min_count' in kwargs or 'max_count' in kwargs:
             # Get servers created which name match with name param.
-            r, b = cls.servers_client.list_servers()
+            r, b = cls.servers_client.list_servers({'name': name})
             servers = [s for s in b['servers'] if s['name'].startswith(name)]
 
         if 'wait_until' in kwargs:
-            for server in servers:
-                try:
+            try:
+                if len(servers) != 1:
+                    # Wait for all the servers at once, listing them
+                    cls.servers_client.wait_for_servers_status(
+                        [server['id'] for server in servers],
+                        kwargs['wait_until'], params={'name': name})
+                else:
                     cls.servers_client.wait_for_server_status(
-                        server['id'], kwargs['wait_until'])
-                except Exception as ex:
-                    if ('preserve_server_on_error' not in kwargs
-                        or kwargs['preserve_server_on_error'] is False):
-                        for server in servers:
-                            try:
-                                cls.servers_client.delete_server(server['id'])
-                            except Exception:
-                                pass
-                    raise ex
+                        servers[0]['id'], kwargs['wait_until'])
+            except Exception as ex:
+                if ('preserve_server_on_error' not in kwargs
+                    or kwargs['preserve_server_on_error'] is False):
+                    for server in servers:
+                        try:
+                            cls.servers_client.delete_server(server['id'])
+                        except Exception:
+                            pass
+                raise ex
 
         cls.servers.extend(servers)
 
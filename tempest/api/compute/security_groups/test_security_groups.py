@@ -48,7 +48,8 @@ class SecurityGroupsTestJSON(base.BaseSecurityGroupsTest):
         for sg in self.security_groups:
             resp, _ = self.client.delete_security_group(sg['id'])
             self.assertEqual(202, resp.status)
-            self.client.wait_for_resource_deletion(sg['id'])
+        self.client.wait_for_resources_deletion(
+            [sg['id'] for sg in self.security_groups])
         # Now check if all the created Security Groups are deleted
         resp, fetched_list = self.client.list_security_groups()
         deleted_sgs = \
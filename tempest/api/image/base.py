@@ -58,8 +58,7 @@ class BaseImageTest(tempest.test.BaseTestCase):
             except exceptions.NotFound:
                 pass
 
-        for image_id in cls.created_images:
-                cls.client.wait_for_resource_deletion(image_id)
+        cls.client.wait_for_resources_deletion(cls.created_images)
         cls.isolated_creds.clear_isolated_creds()
         super(BaseImageTest, cls).tearDownClass()
 
@@ -76,11 +76,11 @@ class BaseVolumeTest(tempest.test.BaseTestCase):
             except Exception:
                 pass
 
-        for volume in cls.volumes:
-            try:
-                cls.volumes_client.wait_for_resource_deletion(volume['id'])
-            except Exception:
-                pass
+        try:
+            cls.volumes_client.wait_for_resources_deletion(
+                [volume['id'] for volume in cls.volumes])
+        except Exception:
+            pass
 
     @classmethod
     def clear_snapshots(cls):
@@ -90,11 +90,11 @@ class BaseVolumeTest(tempest.test.BaseTestCase):
             except Exception:
                 pass
 
-        for snapshot in cls.snapshots:
-            try:
-                cls.snapshots_client.wait_for_resource_deletion(snapshot['id'])
-            except Exception:
-                pass
+        try:
+            cls.snapshots_client.wait_for_resources_deletion(
+                [snapshot['id'] for snapshot in cls.snapshots])
+        except Exception:
+            pass
 
 
 class BaseVolumeV1Test(BaseVolumeTest):
@@ -76,7 +76,7 @@ class VolumesV2ListTestJSON(base.BaseVolumeV2Test):
         # Delete the created volumes
         for volid in cls.volume_id_list:
             resp, _ = cls.client.delete_volume(volid)
-            cls.client.wait_for_resource_deletion(volid)
+        cls.client.wait_for_resources_deletion(cls.volume_id_list)
         super(VolumesV2ListTestJSON, cls).tearDownClass()
 
     def _list_by_param_value_and_assert(self, params, expected_list=None,
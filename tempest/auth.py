@@ -16,7 +16,12 @@
 import copy
 import datetime
 import exceptions
+import hashlib
+import json
+import os
 import re
+import tempfile
+import threading
 import urlparse
 
 from tempest import config
@@ -25,11 +30,107 @@ from tempest.services.identity.v3.json import identity_client as json_v3id
 from tempest.services.identity.v3.xml import identity_client as xml_v3id
 from tempest.services.identity.xml import identity_client as xml_id
 
+from tempest.openstack.common import lockutils
 from tempest.openstack.common import log as logging
 
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+_TOKEN_CACHE = None
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
+class TokenCache(object):
+    """
+    Cache of auth data shared by all the auth providers of a process
+
+    Entries are looked up by a key identifying the auth version, the
+    identity endpoint and the credentials. When cache_dir is set entries
+    are stored there as well, so that parallel test processes fetch a
+    token for each set of credentials only once.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._cache = {}
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, 'token-%s' % key)
+
+    def _read(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return tuple(json.load(f))
+        except (IOError, ValueError, TypeError):
+            return None
+
+    def _write(self, key, auth_data):
+        # mkstemp creates the file readable by the current user only
+        fd, path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(auth_data, f)
+        os.rename(path, self._path(key))
+
+    def _fetch(self, key, fetch, is_expired):
+        if not self.cache_dir:
+            return fetch()
+        with lockutils.lock(key, lock_file_prefix='tempest-token-',
+                            external=True, lock_path=self.cache_dir):
+            auth_data = self._read(key)
+            if auth_data is None or is_expired(auth_data):
+                auth_data = fetch()
+                self._write(key, auth_data)
+            return auth_data
+
+    def get(self, key, fetch, is_expired):
+        """
+        Returns the cached auth data for key
+        :param key: cache key, see KeystoneAuthProvider.token_cache_key
+        :param fetch: callable returning fresh auth data on a cache miss
+        :param is_expired: callable telling whether auth data is expired
+        """
+        with self._key_lock(key):
+            auth_data = self._cache.get(key)
+            if auth_data is None or is_expired(auth_data):
+                auth_data = self._fetch(key, fetch, is_expired)
+                self._cache[key] = auth_data
+            return auth_data
+
+    def invalidate(self, key, token=None):
+        """
+        Drops the entry for key, only if it holds token when one is given
+        """
+        with self._key_lock(key):
+            auth_data = self._cache.get(key)
+            if auth_data is not None and token in (None, auth_data[0]):
+                del self._cache[key]
+            if self.cache_dir:
+                auth_data = self._read(key)
+                if auth_data is not None and token in (None, auth_data[0]):
+                    try:
+                        os.remove(self._path(key))
+                    except OSError:
+                        pass
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def get_token_cache():
+    """Returns the token cache shared by all the auth providers."""
+    global _TOKEN_CACHE
+    with _TOKEN_CACHE_LOCK:
+        if _TOKEN_CACHE is None:
+            _TOKEN_CACHE = TokenCache(CONF.identity.token_cache_dir)
+        return _TOKEN_CACHE
+
 
 class AuthProvider(object):
     """
@@ -170,6 +271,8 @@ class KeystoneAuthProvider(AuthProvider):
         super(KeystoneAuthProvider, self).__init__(credentials, client_type,
                                                    interface)
         self.auth_client = self._auth_client()
+        self._base_urls = {}
+        self._base_urls_token = None
 
     def _decorate_request(self, filters, method, url, headers=None, body=None,
                           auth_data=None):
@@ -198,8 +301,39 @@ class KeystoneAuthProvider(AuthProvider):
     def _auth_params(self):
         raise NotImplementedError
 
+    def _base_url(self, filters, auth_data=None):
+        raise NotImplementedError
+
+    def base_url(self, filters, auth_data=None):
+        """
+        Extracts the base_url based on provided filters
+
+        Results are memoized per token and filters, and forgotten as soon
+        as the token of this provider changes.
+        """
+        if auth_data is None:
+            auth_data = self.auth_data
+        token = auth_data[0]
+        if self.cache is not None and self.cache[0] != self._base_urls_token:
+            self._base_urls = {}
+            self._base_urls_token = self.cache[0]
+        key = (token, filters.get('service'), filters.get('region'),
+               filters.get('endpoint_type'), filters.get('api_version'),
+               filters.get('skip_path'))
+        url = self._base_urls.get(key)
+        if url is None:
+            url = self._base_url(filters, auth_data)
+            self._base_urls[key] = url
+        return url
+
     def _get_auth(self):
-        # Bypasses the cache
+        # Bypasses the cache of this provider, but not the shared one
+        if CONF.identity.shared_token_cache:
+            return get_token_cache().get(self.token_cache_key(),
+                                         self._fetch_auth, self.is_expired)
+        return self._fetch_auth()
+
+    def _fetch_auth(self):
         if self.client_type == 'tempest':
             auth_func = getattr(self.auth_client, 'get_token')
             auth_params = self._auth_params()
@@ -210,6 +344,22 @@ class KeystoneAuthProvider(AuthProvider):
         else:
             raise NotImplementedError
 
+    def token_cache_key(self):
+        """
+        Key of the credentials of this provider in the shared token cache
+        """
+        key = [self.__class__.__name__, self.interface,
+               self.auth_client.auth_url, sorted(self.credentials.items())]
+        return hashlib.sha1(json.dumps(key)).hexdigest()
+
+    def clear_auth(self):
+        # Make sure the token is not handed out again by the shared cache
+        if self.cache is not None and CONF.identity.shared_token_cache:
+            get_token_cache().invalidate(self.token_cache_key(),
+                                         token=self.cache[0])
+        self._base_urls = {}
+        super(KeystoneAuthProvider, self).clear_auth()
+
     def get_token(self):
         return self.auth_data[0]
 
@@ -247,7 +397,7 @@ class KeystoneV2AuthProvider(KeystoneAuthProvider):
         else:
             raise NotImplementedError
 
-    def base_url(self, filters, auth_data=None):
+    def _base_url(self, filters, auth_data=None):
         """
         Filters can be:
         - service: compute, image, etc
@@ -333,7 +483,7 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
         else:
             raise NotImplementedError
 
-    def base_url(self, filters, auth_data=None):
+    def _base_url(self, filters, auth_data=None):
         """
         Filters can be:
         - service: compute, image, etc
@@ -13,185 +13,242 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import keystoneclient.exceptions
-import keystoneclient.v2_0.client
-
-from tempest.common.rest_client import NegativeRestClient
 from tempest import config
 from tempest import exceptions
 from tempest import manager
 from tempest.openstack.common import log as logging
-from tempest.services.baremetal.v1.client_json import BaremetalClientJSON
-from tempest.services import botoclients
-from tempest.services.compute.json.agents_client import \
-    AgentsClientJSON
-from tempest.services.compute.json.aggregates_client import \
-    AggregatesClientJSON
-from tempest.services.compute.json.availability_zone_client import \
-    AvailabilityZoneClientJSON
-from tempest.services.compute.json.certificates_client import \
-    CertificatesClientJSON
-from tempest.services.compute.json.extensions_client import \
-    ExtensionsClientJSON
-from tempest.services.compute.json.fixed_ips_client import FixedIPsClientJSON
-from tempest.services.compute.json.flavors_client import FlavorsClientJSON
-from tempest.services.compute.json.floating_ips_client import \
-    FloatingIPsClientJSON
-from tempest.services.compute.json.hosts_client import HostsClientJSON
-from tempest.services.compute.json.hypervisor_client import \
-    HypervisorClientJSON
-from tempest.services.compute.json.images_client import ImagesClientJSON
-from tempest.services.compute.json.instance_usage_audit_log_client import \
-    InstanceUsagesAuditLogClientJSON
-from tempest.services.compute.json.interfaces_client import \
-    InterfacesClientJSON
-from tempest.services.compute.json.keypairs_client import KeyPairsClientJSON
-from tempest.services.compute.json.limits_client import LimitsClientJSON
-from tempest.services.compute.json.migrations_client import \
-    MigrationsClientJSON
-from tempest.services.compute.json.quotas_client import QuotasClientJSON
-from tempest.services.compute.json.security_groups_client import \
-    SecurityGroupsClientJSON
-from tempest.services.compute.json.servers_client import ServersClientJSON
-from tempest.services.compute.json.services_client import ServicesClientJSON
-from tempest.services.compute.json.tenant_usages_client import \
-    TenantUsagesClientJSON
-from tempest.services.compute.json.volumes_extensions_client import \
-    VolumesExtensionsClientJSON
-from tempest.services.compute.v3.json.agents_client import AgentsV3ClientJSON
-from tempest.services.compute.v3.json.aggregates_client import \
-    AggregatesV3ClientJSON
-from tempest.services.compute.v3.json.availability_zone_client import \
-    AvailabilityZoneV3ClientJSON
-from tempest.services.compute.v3.json.certificates_client import \
-    CertificatesV3ClientJSON
-from tempest.services.compute.v3.json.extensions_client import \
-    ExtensionsV3ClientJSON
-from tempest.services.compute.v3.json.flavors_client import FlavorsV3ClientJSON
-from tempest.services.compute.v3.json.hosts_client import HostsV3ClientJSON
-from tempest.services.compute.v3.json.hypervisor_client import \
-    HypervisorV3ClientJSON
-from tempest.services.compute.v3.json.interfaces_client import \
-    InterfacesV3ClientJSON
-from tempest.services.compute.v3.json.keypairs_client import \
-    KeyPairsV3ClientJSON
-from tempest.services.compute.v3.json.migration_client import \
-    MigrationsV3ClientJSON
-from tempest.services.compute.v3.json.quotas_client import \
-    QuotasV3ClientJSON
-from tempest.services.compute.v3.json.servers_client import \
-    ServersV3ClientJSON
-from tempest.services.compute.v3.json.services_client import \
-    ServicesV3ClientJSON
-from tempest.services.compute.v3.json.version_client import \
-    VersionV3ClientJSON
-from tempest.services.compute.xml.aggregates_client import AggregatesClientXML
-from tempest.services.compute.xml.availability_zone_client import \
-    AvailabilityZoneClientXML
-from tempest.services.compute.xml.certificates_client import \
-    CertificatesClientXML
-from tempest.services.compute.xml.extensions_client import ExtensionsClientXML
-from tempest.services.compute.xml.fixed_ips_client import FixedIPsClientXML
-from tempest.services.compute.xml.flavors_client import FlavorsClientXML
-from tempest.services.compute.xml.floating_ips_client import \
-    FloatingIPsClientXML
-from tempest.services.compute.xml.hosts_client import HostsClientXML
-from tempest.services.compute.xml.hypervisor_client import HypervisorClientXML
-from tempest.services.compute.xml.images_client import ImagesClientXML
-from tempest.services.compute.xml.instance_usage_audit_log_client import \
-    InstanceUsagesAuditLogClientXML
-from tempest.services.compute.xml.interfaces_client import \
-    InterfacesClientXML
-from tempest.services.compute.xml.keypairs_client import KeyPairsClientXML
-from tempest.services.compute.xml.limits_client import LimitsClientXML
-from tempest.services.compute.xml.quotas_client import QuotasClientXML
-from tempest.services.compute.xml.security_groups_client \
-    import SecurityGroupsClientXML
-from tempest.services.compute.xml.servers_client import ServersClientXML
-from tempest.services.compute.xml.services_client import ServicesClientXML
-from tempest.services.compute.xml.tenant_usages_client import \
-    TenantUsagesClientXML
-from tempest.services.compute.xml.volumes_extensions_client import \
-    VolumesExtensionsClientXML
-from tempest.services.data_processing.v1_1.client import DataProcessingClient
-from tempest.services.database.json.flavors_client import \
-    DatabaseFlavorsClientJSON
-from tempest.services.identity.json.identity_client import IdentityClientJSON
-from tempest.services.identity.json.identity_client import TokenClientJSON
-from tempest.services.identity.v3.json.credentials_client import \
-    CredentialsClientJSON
-from tempest.services.identity.v3.json.endpoints_client import \
-    EndPointClientJSON
-from tempest.services.identity.v3.json.identity_client import \
-    IdentityV3ClientJSON
-from tempest.services.identity.v3.json.identity_client import V3TokenClientJSON
-from tempest.services.identity.v3.json.policy_client import PolicyClientJSON
-from tempest.services.identity.v3.json.service_client import \
-    ServiceClientJSON
-from tempest.services.identity.v3.xml.credentials_client import \
-    CredentialsClientXML
-from tempest.services.identity.v3.xml.endpoints_client import EndPointClientXML
-from tempest.services.identity.v3.xml.identity_client import \
-    IdentityV3ClientXML
-from tempest.services.identity.v3.xml.identity_client import V3TokenClientXML
-from tempest.services.identity.v3.xml.policy_client import PolicyClientXML
-from tempest.services.identity.v3.xml.service_client import \
-    ServiceClientXML
-from tempest.services.identity.xml.identity_client import IdentityClientXML
-from tempest.services.identity.xml.identity_client import TokenClientXML
-from tempest.services.image.v1.json.image_client import ImageClientJSON
-from tempest.services.image.v2.json.image_client import ImageClientV2JSON
-from tempest.services.network.json.network_client import NetworkClientJSON
-from tempest.services.network.xml.network_client import NetworkClientXML
-from tempest.services.object_storage.account_client import AccountClient
-from tempest.services.object_storage.account_client import \
-    AccountClientCustomizedHeader
-from tempest.services.object_storage.container_client import ContainerClient
-from tempest.services.object_storage.object_client import ObjectClient
-from tempest.services.object_storage.object_client import \
-    ObjectClientCustomizedHeader
-from tempest.services.orchestration.json.orchestration_client import \
-    OrchestrationClient
-from tempest.services.queuing.json.queuing_client import QueuingClientJSON
-from tempest.services.telemetry.json.telemetry_client import \
-    TelemetryClientJSON
-from tempest.services.telemetry.xml.telemetry_client import \
-    TelemetryClientXML
-from tempest.services.volume.json.admin.volume_hosts_client import \
-    VolumeHostsClientJSON
-from tempest.services.volume.json.admin.volume_quotas_client import \
-    VolumeQuotasClientJSON
-from tempest.services.volume.json.admin.volume_types_client import \
-    VolumeTypesClientJSON
-from tempest.services.volume.json.backups_client import BackupsClientJSON
-from tempest.services.volume.json.extensions_client import \
-    ExtensionsClientJSON as VolumeExtensionClientJSON
-from tempest.services.volume.json.snapshots_client import SnapshotsClientJSON
-from tempest.services.volume.json.volumes_client import VolumesClientJSON
-from tempest.services.volume.v2.json.volumes_client import VolumesV2ClientJSON
-from tempest.services.volume.v2.xml.volumes_client import VolumesV2ClientXML
-from tempest.services.volume.xml.admin.volume_hosts_client import \
-    VolumeHostsClientXML
-from tempest.services.volume.xml.admin.volume_quotas_client import \
-    VolumeQuotasClientXML
-from tempest.services.volume.xml.admin.volume_types_client import \
-    VolumeTypesClientXML
-from tempest.services.volume.xml.backups_client import BackupsClientXML
-from tempest.services.volume.xml.extensions_client import \
-    ExtensionsClientXML as VolumeExtensionClientXML
-from tempest.services.volume.xml.snapshots_client import SnapshotsClientXML
-from tempest.services.volume.xml.volumes_client import VolumesClientXML
 
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+def _unauthenticated_client(manager, client_class):
+    return client_class()
+
+
+def _negative_client(manager, client_class):
+    client = client_class(manager.auth_provider)
+    client.service = manager.service
+    return client
+
+
+def _ec2_client(manager, client_class):
+    # TODO(andreaf) EC2 client still do their auth, v2 only
+    return client_class(manager.credentials.get('username'),
+                        manager.credentials.get('password'),
+                        CONF.identity.uri,
+                        manager.credentials.get('tenant_name'))
+
+
 class Manager(manager.Manager):
 
     """
     Top level manager for OpenStack tempest clients
+
+    Service clients are built on first access, so that a manager only pays
+    for the clients its tests use.
     """
 
+    certificates_client = manager.ServiceClient(
+        'compute.%s.certificates_client', json='CertificatesClientJSON',
+        xml='CertificatesClientXML')
+    servers_client = manager.ServiceClient(
+        'compute.%s.servers_client', json='ServersClientJSON',
+        xml='ServersClientXML')
+    limits_client = manager.ServiceClient(
+        'compute.%s.limits_client', json='LimitsClientJSON',
+        xml='LimitsClientXML')
+    images_client = manager.ServiceClient(
+        'compute.%s.images_client', json='ImagesClientJSON',
+        xml='ImagesClientXML')
+    keypairs_client = manager.ServiceClient(
+        'compute.%s.keypairs_client', json='KeyPairsClientJSON',
+        xml='KeyPairsClientXML')
+    quotas_client = manager.ServiceClient(
+        'compute.%s.quotas_client', json='QuotasClientJSON',
+        xml='QuotasClientXML')
+    flavors_client = manager.ServiceClient(
+        'compute.%s.flavors_client', json='FlavorsClientJSON',
+        xml='FlavorsClientXML')
+    extensions_client = manager.ServiceClient(
+        'compute.%s.extensions_client', json='ExtensionsClientJSON',
+        xml='ExtensionsClientXML')
+    volumes_extensions_client = manager.ServiceClient(
+        'compute.%s.volumes_extensions_client',
+        json='VolumesExtensionsClientJSON', xml='VolumesExtensionsClientXML')
+    floating_ips_client = manager.ServiceClient(
+        'compute.%s.floating_ips_client', json='FloatingIPsClientJSON',
+        xml='FloatingIPsClientXML')
+    backups_client = manager.ServiceClient(
+        'volume.%s.backups_client', json='BackupsClientJSON',
+        xml='BackupsClientXML')
+    snapshots_client = manager.ServiceClient(
+        'volume.%s.snapshots_client', json='SnapshotsClientJSON',
+        xml='SnapshotsClientXML')
+    volumes_client = manager.ServiceClient(
+        'volume.%s.volumes_client', json='VolumesClientJSON',
+        xml='VolumesClientXML')
+    volumes_v2_client = manager.ServiceClient(
+        'volume.v2.%s.volumes_client', json='VolumesV2ClientJSON',
+        xml='VolumesV2ClientXML')
+    volume_types_client = manager.ServiceClient(
+        'volume.%s.admin.volume_types_client', json='VolumeTypesClientJSON',
+        xml='VolumeTypesClientXML')
+    identity_client = manager.ServiceClient(
+        'identity.%s.identity_client', json='IdentityClientJSON',
+        xml='IdentityClientXML')
+    identity_v3_client = manager.ServiceClient(
+        'identity.v3.%s.identity_client', json='IdentityV3ClientJSON',
+        xml='IdentityV3ClientXML')
+    security_groups_client = manager.ServiceClient(
+        'compute.%s.security_groups_client', json='SecurityGroupsClientJSON',
+        xml='SecurityGroupsClientXML')
+    interfaces_client = manager.ServiceClient(
+        'compute.%s.interfaces_client', json='InterfacesClientJSON',
+        xml='InterfacesClientXML')
+    endpoints_client = manager.ServiceClient(
+        'identity.v3.%s.endpoints_client', json='EndPointClientJSON',
+        xml='EndPointClientXML')
+    fixed_ips_client = manager.ServiceClient(
+        'compute.%s.fixed_ips_client', json='FixedIPsClientJSON',
+        xml='FixedIPsClientXML')
+    availability_zone_client = manager.ServiceClient(
+        'compute.%s.availability_zone_client',
+        json='AvailabilityZoneClientJSON', xml='AvailabilityZoneClientXML')
+    service_client = manager.ServiceClient(
+        'identity.v3.%s.service_client', json='ServiceClientJSON',
+        xml='ServiceClientXML')
+    aggregates_client = manager.ServiceClient(
+        'compute.%s.aggregates_client', json='AggregatesClientJSON',
+        xml='AggregatesClientXML')
+    services_client = manager.ServiceClient(
+        'compute.%s.services_client', json='ServicesClientJSON',
+        xml='ServicesClientXML')
+    tenant_usages_client = manager.ServiceClient(
+        'compute.%s.tenant_usages_client', json='TenantUsagesClientJSON',
+        xml='TenantUsagesClientXML')
+    policy_client = manager.ServiceClient(
+        'identity.v3.%s.policy_client', json='PolicyClientJSON',
+        xml='PolicyClientXML')
+    hosts_client = manager.ServiceClient(
+        'compute.%s.hosts_client', json='HostsClientJSON',
+        xml='HostsClientXML')
+    hypervisor_client = manager.ServiceClient(
+        'compute.%s.hypervisor_client', json='HypervisorClientJSON',
+        xml='HypervisorClientXML')
+    network_client = manager.ServiceClient(
+        'network.%s.network_client', json='NetworkClientJSON',
+        xml='NetworkClientXML')
+    credentials_client = manager.ServiceClient(
+        'identity.v3.%s.credentials_client', json='CredentialsClientJSON',
+        xml='CredentialsClientXML')
+    instance_usages_audit_log_client = manager.ServiceClient(
+        'compute.%s.instance_usage_audit_log_client',
+        json='InstanceUsagesAuditLogClientJSON',
+        xml='InstanceUsagesAuditLogClientXML')
+    volume_hosts_client = manager.ServiceClient(
+        'volume.%s.admin.volume_hosts_client', json='VolumeHostsClientJSON',
+        xml='VolumeHostsClientXML')
+    volume_quotas_client = manager.ServiceClient(
+        'volume.%s.admin.volume_quotas_client', json='VolumeQuotasClientJSON',
+        xml='VolumeQuotasClientXML')
+    volumes_extension_client = manager.ServiceClient(
+        'volume.%s.extensions_client', json='ExtensionsClientJSON',
+        xml='ExtensionsClientXML')
+    telemetry_client = manager.ServiceClient(
+        'telemetry.%s.telemetry_client', json='TelemetryClientJSON',
+        xml='TelemetryClientXML', service='ceilometer')
+    token_client = manager.ServiceClient(
+        'identity.%s.identity_client', json='TokenClientJSON',
+        xml='TokenClientXML', factory=_unauthenticated_client)
+    token_v3_client = manager.ServiceClient(
+        'identity.v3.%s.identity_client', json='V3TokenClientJSON',
+        xml='V3TokenClientXML', factory=_unauthenticated_client)
+
+    # json only clients
+    certificates_v3_client = manager.ServiceClient(
+        'compute.v3.json.certificates_client',
+        json='CertificatesV3ClientJSON')
+    baremetal_client = manager.ServiceClient(
+        'baremetal.v1.client_json', json='BaremetalClientJSON')
+    servers_v3_client = manager.ServiceClient(
+        'compute.v3.json.servers_client', json='ServersV3ClientJSON')
+    keypairs_v3_client = manager.ServiceClient(
+        'compute.v3.json.keypairs_client', json='KeyPairsV3ClientJSON')
+    quotas_v3_client = manager.ServiceClient(
+        'compute.v3.json.quotas_client', json='QuotasV3ClientJSON')
+    flavors_v3_client = manager.ServiceClient(
+        'compute.v3.json.flavors_client', json='FlavorsV3ClientJSON')
+    extensions_v3_client = manager.ServiceClient(
+        'compute.v3.json.extensions_client', json='ExtensionsV3ClientJSON')
+    interfaces_v3_client = manager.ServiceClient(
+        'compute.v3.json.interfaces_client', json='InterfacesV3ClientJSON')
+    availability_zone_v3_client = manager.ServiceClient(
+        'compute.v3.json.availability_zone_client',
+        json='AvailabilityZoneV3ClientJSON')
+    services_v3_client = manager.ServiceClient(
+        'compute.v3.json.services_client', json='ServicesV3ClientJSON')
+    agents_v3_client = manager.ServiceClient(
+        'compute.v3.json.agents_client', json='AgentsV3ClientJSON')
+    aggregates_v3_client = manager.ServiceClient(
+        'compute.v3.json.aggregates_client', json='AggregatesV3ClientJSON')
+    version_v3_client = manager.ServiceClient(
+        'compute.v3.json.version_client', json='VersionV3ClientJSON')
+    migrations_v3_client = manager.ServiceClient(
+        'compute.v3.json.migration_client', json='MigrationsV3ClientJSON')
+    hypervisor_v3_client = manager.ServiceClient(
+        'compute.v3.json.hypervisor_client', json='HypervisorV3ClientJSON')
+    hosts_v3_client = manager.ServiceClient(
+        'compute.v3.json.hosts_client', json='HostsV3ClientJSON')
+    database_flavors_client = manager.ServiceClient(
+        'database.json.flavors_client', json='DatabaseFlavorsClientJSON')
+    queuing_client = manager.ServiceClient(
+        'queuing.json.queuing_client', json='QueuingClientJSON')
+    negative_client = manager.ServiceClient(
+        'rest_client', json='NegativeRestClient', factory=_negative_client,
+        package='tempest.common')
+
+    # common clients
+    account_client = manager.ServiceClient(
+        'object_storage.account_client', json='AccountClient',
+        xml='AccountClient')
+    agents_client = manager.ServiceClient(
+        'compute.json.agents_client', json='AgentsClientJSON',
+        xml='AgentsClientJSON')
+    container_client = manager.ServiceClient(
+        'object_storage.container_client', json='ContainerClient',
+        xml='ContainerClient')
+    object_client = manager.ServiceClient(
+        'object_storage.object_client', json='ObjectClient',
+        xml='ObjectClient')
+    orchestration_client = manager.ServiceClient(
+        'orchestration.json.orchestration_client', json='OrchestrationClient',
+        xml='OrchestrationClient')
+    custom_object_client = manager.ServiceClient(
+        'object_storage.object_client', json='ObjectClientCustomizedHeader',
+        xml='ObjectClientCustomizedHeader')
+    custom_account_client = manager.ServiceClient(
+        'object_storage.account_client', json='AccountClientCustomizedHeader',
+        xml='AccountClientCustomizedHeader')
+    data_processing_client = manager.ServiceClient(
+        'data_processing.v1_1.client', json='DataProcessingClient',
+        xml='DataProcessingClient')
+    migrations_client = manager.ServiceClient(
+        'compute.json.migrations_client', json='MigrationsClientJSON',
+        xml='MigrationsClientJSON')
+    image_client = manager.ServiceClient(
+        'image.v1.json.image_client', json='ImageClientJSON',
+        xml='ImageClientJSON', service='glance')
+    image_client_v2 = manager.ServiceClient(
+        'image.v2.json.image_client', json='ImageClientV2JSON',
+        xml='ImageClientV2JSON', service='glance')
+    ec2api_client = manager.ServiceClient(
+        'botoclients', json='APIClientEC2', xml='APIClientEC2',
+        factory=_ec2_client)
+    s3_client = manager.ServiceClient(
+        'botoclients', json='ObjectClientS3', xml='ObjectClientS3',
+        factory=_ec2_client)
+
     def __init__(self, username=None, password=None, tenant_name=None,
                  interface='json', service=None):
         """
@@ -203,188 +260,17 @@ class Manager(manager.Manager):
         :param password: Override of the password
         :param tenant_name: Override of the tenant name
         """
+        if interface not in ('json', 'xml'):
+            msg = "Unsupported interface type `%s'" % interface
+            raise exceptions.InvalidConfiguration(msg)
         self.interface = interface
         self.client_type = 'tempest'
+        # Service of the negative client
+        self.service = service
         # super cares for credentials validation
         super(Manager, self).__init__(
             username=username, password=password, tenant_name=tenant_name)
 
-        if self.interface == 'xml':
-            self.certificates_client = CertificatesClientXML(
-                self.auth_provider)
-            self.servers_client = ServersClientXML(self.auth_provider)
-            self.limits_client = LimitsClientXML(self.auth_provider)
-            self.images_client = ImagesClientXML(self.auth_provider)
-            self.keypairs_client = KeyPairsClientXML(self.auth_provider)
-            self.quotas_client = QuotasClientXML(self.auth_provider)
-            self.flavors_client = FlavorsClientXML(self.auth_provider)
-            self.extensions_client = ExtensionsClientXML(self.auth_provider)
-            self.volumes_extensions_client = VolumesExtensionsClientXML(
-                self.auth_provider)
-            self.floating_ips_client = FloatingIPsClientXML(
-                self.auth_provider)
-            self.backups_client = BackupsClientXML(self.auth_provider)
-            self.snapshots_client = SnapshotsClientXML(self.auth_provider)
-            self.volumes_client = VolumesClientXML(self.auth_provider)
-            self.volumes_v2_client = VolumesV2ClientXML(self.auth_provider)
-            self.volume_types_client = VolumeTypesClientXML(
-                self.auth_provider)
-            self.identity_client = IdentityClientXML(self.auth_provider)
-            self.identity_v3_client = IdentityV3ClientXML(
-                self.auth_provider)
-            self.security_groups_client = SecurityGroupsClientXML(
-                self.auth_provider)
-            self.interfaces_client = InterfacesClientXML(self.auth_provider)
-            self.endpoints_client = EndPointClientXML(self.auth_provider)
-            self.fixed_ips_client = FixedIPsClientXML(self.auth_provider)
-            self.availability_zone_client = AvailabilityZoneClientXML(
-                self.auth_provider)
-            self.service_client = ServiceClientXML(self.auth_provider)
-            self.aggregates_client = AggregatesClientXML(self.auth_provider)
-            self.services_client = ServicesClientXML(self.auth_provider)
-            self.tenant_usages_client = TenantUsagesClientXML(
-                self.auth_provider)
-            self.policy_client = PolicyClientXML(self.auth_provider)
-            self.hosts_client = HostsClientXML(self.auth_provider)
-            self.hypervisor_client = HypervisorClientXML(self.auth_provider)
-            self.network_client = NetworkClientXML(self.auth_provider)
-            self.credentials_client = CredentialsClientXML(
-                self.auth_provider)
-            self.instance_usages_audit_log_client = \
-                InstanceUsagesAuditLogClientXML(self.auth_provider)
-            self.volume_hosts_client = VolumeHostsClientXML(
-                self.auth_provider)
-            self.volume_quotas_client = VolumeQuotasClientXML(
-                self.auth_provider)
-            self.volumes_extension_client = VolumeExtensionClientXML(
-                self.auth_provider)
-            if CONF.service_available.ceilometer:
-                self.telemetry_client = TelemetryClientXML(
-                    self.auth_provider)
-            self.token_client = TokenClientXML()
-            self.token_v3_client = V3TokenClientXML()
-
-        elif self.interface == 'json':
-            self.certificates_client = CertificatesClientJSON(
-                self.auth_provider)
-            self.certificates_v3_client = CertificatesV3ClientJSON(
-                self.auth_provider)
-            self.baremetal_client = BaremetalClientJSON(self.auth_provider)
-            self.servers_client = ServersClientJSON(self.auth_provider)
-            self.servers_v3_client = ServersV3ClientJSON(self.auth_provider)
-            self.limits_client = LimitsClientJSON(self.auth_provider)
-            self.images_client = ImagesClientJSON(self.auth_provider)
-            self.keypairs_v3_client = KeyPairsV3ClientJSON(
-                self.auth_provider)
-            self.keypairs_client = KeyPairsClientJSON(self.auth_provider)
-            self.keypairs_v3_client = KeyPairsV3ClientJSON(
-                self.auth_provider)
-            self.quotas_client = QuotasClientJSON(self.auth_provider)
-            self.quotas_v3_client = QuotasV3ClientJSON(self.auth_provider)
-            self.flavors_client = FlavorsClientJSON(self.auth_provider)
-            self.flavors_v3_client = FlavorsV3ClientJSON(self.auth_provider)
-            self.extensions_v3_client = ExtensionsV3ClientJSON(
-                self.auth_provider)
-            self.extensions_client = ExtensionsClientJSON(
-                self.auth_provider)
-            self.volumes_extensions_client = VolumesExtensionsClientJSON(
-                self.auth_provider)
-            self.floating_ips_client = FloatingIPsClientJSON(
-                self.auth_provider)
-            self.backups_client = BackupsClientJSON(self.auth_provider)
-            self.snapshots_client = SnapshotsClientJSON(self.auth_provider)
-            self.volumes_client = VolumesClientJSON(self.auth_provider)
-            self.volumes_v2_client = VolumesV2ClientJSON(self.auth_provider)
-            self.volume_types_client = VolumeTypesClientJSON(
-                self.auth_provider)
-            self.identity_client = IdentityClientJSON(self.auth_provider)
-            self.identity_v3_client = IdentityV3ClientJSON(
-                self.auth_provider)
-            self.security_groups_client = SecurityGroupsClientJSON(
-                self.auth_provider)
-            self.interfaces_v3_client = InterfacesV3ClientJSON(
-                self.auth_provider)
-            self.interfaces_client = InterfacesClientJSON(
-                self.auth_provider)
-            self.endpoints_client = EndPointClientJSON(self.auth_provider)
-            self.fixed_ips_client = FixedIPsClientJSON(self.auth_provider)
-            self.availability_zone_v3_client = AvailabilityZoneV3ClientJSON(
-                self.auth_provider)
-            self.availability_zone_client = AvailabilityZoneClientJSON(
-                self.auth_provider)
-            self.services_v3_client = ServicesV3ClientJSON(
-                self.auth_provider)
-            self.service_client = ServiceClientJSON(self.auth_provider)
-            self.agents_v3_client = AgentsV3ClientJSON(self.auth_provider)
-            self.aggregates_v3_client = AggregatesV3ClientJSON(
-                self.auth_provider)
-            self.aggregates_client = AggregatesClientJSON(
-                self.auth_provider)
-            self.services_client = ServicesClientJSON(self.auth_provider)
-            self.tenant_usages_client = TenantUsagesClientJSON(
-                self.auth_provider)
-            self.version_v3_client = VersionV3ClientJSON(self.auth_provider)
-            self.migrations_v3_client = MigrationsV3ClientJSON(
-                self.auth_provider)
-            self.policy_client = PolicyClientJSON(self.auth_provider)
-            self.hosts_client = HostsClientJSON(self.auth_provider)
-            self.hypervisor_v3_client = HypervisorV3ClientJSON(
-                self.auth_provider)
-            self.hypervisor_client = HypervisorClientJSON(
-                self.auth_provider)
-            self.network_client = NetworkClientJSON(self.auth_provider)
-            self.credentials_client = CredentialsClientJSON(
-                self.auth_provider)
-            self.instance_usages_audit_log_client = \
-                InstanceUsagesAuditLogClientJSON(self.auth_provider)
-            self.volume_hosts_client = VolumeHostsClientJSON(
-                self.auth_provider)
-            self.volume_quotas_client = VolumeQuotasClientJSON(
-                self.auth_provider)
-            self.volumes_extension_client = VolumeExtensionClientJSON(
-                self.auth_provider)
-            self.hosts_v3_client = HostsV3ClientJSON(self.auth_provider)
-            self.database_flavors_client = DatabaseFlavorsClientJSON(
-                self.auth_provider)
-            self.queuing_client = QueuingClientJSON(self.auth_provider)
-            if CONF.service_available.ceilometer:
-                self.telemetry_client = TelemetryClientJSON(
-                    self.auth_provider)
-            self.token_client = TokenClientJSON()
-            self.token_v3_client = V3TokenClientJSON()
-            self.negative_client = NegativeRestClient(self.auth_provider)
-            self.negative_client.service = service
-
-        else:
-            msg = "Unsupported interface type `%s'" % interface
-            raise exceptions.InvalidConfiguration(msg)
-
-        # TODO(andreaf) EC2 client still do their auth, v2 only
-        ec2_client_args = (self.credentials.get('username'),
-                           self.credentials.get('password'),
-                           CONF.identity.uri,
-                           self.credentials.get('tenant_name'))
-
-        # common clients
-        self.account_client = AccountClient(self.auth_provider)
-        self.agents_client = AgentsClientJSON(self.auth_provider)
-        if CONF.service_available.glance:
-            self.image_client = ImageClientJSON(self.auth_provider)
-            self.image_client_v2 = ImageClientV2JSON(self.auth_provider)
-        self.container_client = ContainerClient(self.auth_provider)
-        self.object_client = ObjectClient(self.auth_provider)
-        self.orchestration_client = OrchestrationClient(
-            self.auth_provider)
-        self.ec2api_client = botoclients.APIClientEC2(*ec2_client_args)
-        self.s3_client = botoclients.ObjectClientS3(*ec2_client_args)
-        self.custom_object_client = ObjectClientCustomizedHeader(
-            self.auth_provider)
-        self.custom_account_client = \
-            AccountClientCustomizedHeader(self.auth_provider)
-        self.data_processing_client = DataProcessingClient(
-            self.auth_provider)
-        self.migrations_client = MigrationsClientJSON(self.auth_provider)
-
 
 class AltManager(Manager):
 
@@ -573,6 +459,7 @@ class OfficialClientManager(manager.Manager):
     def _get_object_storage_client(self, username, password, tenant_name):
         if not CONF.service_available.swift:
             return None
+        import keystoneclient.exceptions
         import swiftclient
         auth_url = CONF.identity.uri
         # add current tenant to swift operator role group.
@@ -606,6 +493,7 @@ class OfficialClientManager(manager.Manager):
         if not CONF.service_available.heat:
             return None
         import heatclient.client
+        import keystoneclient.exceptions
         if not username:
             username = CONF.identity.admin_username
         if not password:
@@ -638,6 +526,7 @@ class OfficialClientManager(manager.Manager):
     def _get_identity_client(self, username, password, tenant_name):
         # This identity client is not intended to check the security
         # of the identity service, so use admin credentials by default.
+        import keystoneclient.v2_0.client
         self._validate_credentials(username, password, tenant_name)
 
         auth_url = CONF.identity.uri
@@ -654,6 +543,7 @@ class OfficialClientManager(manager.Manager):
         if not CONF.service_available.ironic:
             return None
         import ironicclient.client
+        import keystoneclient.exceptions
         roles = self._get_roles()
         if CONF.identity.admin_role not in roles:
             return None
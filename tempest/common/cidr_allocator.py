@@ -0,0 +1,117 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import errno
+import json
+import os
+import tempfile
+import threading
+
+import netaddr
+from oslo.config import cfg
+
+from tempest import config
+from tempest.openstack.common import lockutils
+
+CONF = config.CONF
+
+_ALLOCATOR = None
+_ALLOCATOR_LOCK = threading.Lock()
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno != errno.ESRCH
+    return True
+
+
+class CidrAllocator(object):
+    """
+    Hands out the subnets of a CIDR to the test processes of a host
+
+    Allocations are recorded, with the pid of their owner, in a JSON file
+    of state_dir guarded by a file lock, so that concurrent test processes
+    never try the same CIDR. The allocations of processes which are gone
+    are reclaimed.
+    """
+
+    def __init__(self, base_cidr, mask_bits, state_dir):
+        self.base_cidr = netaddr.IPNetwork(base_cidr)
+        self.mask_bits = mask_bits
+        self.state_dir = state_dir
+        self.lock_name = 'cidrs-%s-%d' % (self.base_cidr.cidr, mask_bits)
+        self.path = os.path.join(
+            state_dir, 'tempest-%s.json' % self.lock_name.replace('/', '_'))
+
+    def _lock(self):
+        return lockutils.lock(self.lock_name, lock_file_prefix='tempest-',
+                              external=True, lock_path=self.state_dir)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        except ValueError:
+            # Interrupted write, the owners will be checked again
+            pass
+        return {}
+
+    def _save(self, allocations):
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_dir)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(allocations, f)
+        os.rename(tmp_path, self.path)
+
+    def allocate(self):
+        """Returns a free CIDR as a string, or None if all are used."""
+        pid = os.getpid()
+        with self._lock():
+            allocations = dict((cidr, owner) for cidr, owner in
+                               self._load().items()
+                               if owner == pid or _is_alive(owner))
+            for subnet_cidr in self.base_cidr.subnet(self.mask_bits):
+                subnet_cidr = str(subnet_cidr)
+                if subnet_cidr not in allocations:
+                    allocations[subnet_cidr] = pid
+                    self._save(allocations)
+                    return subnet_cidr
+
+    def release(self, subnet_cidr):
+        """Frees a CIDR allocated by this process."""
+        with self._lock():
+            allocations = self._load()
+            if allocations.get(subnet_cidr) == os.getpid():
+                del allocations[subnet_cidr]
+                self._save(allocations)
+
+
+def get_cidr_allocator():
+    """Returns the allocator of [network] tenant_network_cidr subnets."""
+    global _ALLOCATOR
+    with _ALLOCATOR_LOCK:
+        base_cidr = CONF.network.tenant_network_cidr
+        mask_bits = CONF.network.tenant_network_mask_bits
+        if (_ALLOCATOR is None or
+                _ALLOCATOR.base_cidr != netaddr.IPNetwork(base_cidr) or
+                _ALLOCATOR.mask_bits != mask_bits):
+            _ALLOCATOR = CidrAllocator(
+                base_cidr, mask_bits,
+                cfg.CONF.lock_path or tempfile.gettempdir())
+        return _ALLOCATOR
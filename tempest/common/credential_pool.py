@@ -0,0 +1,146 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import errno
+import hashlib
+import json
+import os
+import threading
+import time
+
+from tempest import config
+from tempest import exceptions
+from tempest.openstack.common import lockutils
+from tempest.openstack.common import log as logging
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+
+class CredentialPool(object):
+    """
+    Pre-provisioned accounts leased by test classes
+
+    The accounts are read from a JSON file, a list of objects with the keys
+    username, password, tenant_name, user_id, tenant_id, admin (true for
+    accounts with the admin role) and optionally network, subnet and router
+    (objects with at least an id and a name), as written by
+    tools/credential_pool.py.
+
+    An account is leased by holding an exclusive lock on a file of its own
+    in lock_dir, so that test processes never share an account. The lock is
+    released by release(), or by the system if the process dies.
+    """
+
+    def __init__(self, path, lock_dir=None, timeout=300, interval=1):
+        self.path = path
+        self.lock_dir = lock_dir or path + '.locks'
+        self.timeout = timeout
+        self.interval = interval
+        with open(path) as f:
+            self.accounts = json.load(f)
+        # Locks on files are per process, leases are tracked between
+        # the threads of a process with this
+        self._leases = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def account_key(account):
+        return hashlib.sha1('%s:%s' % (account['username'],
+                                       account['tenant_name'])).hexdigest()
+
+    def _try_lock(self, key):
+        lock = lockutils.InterProcessLock(
+            os.path.join(self.lock_dir, key + '.lock'))
+        lock.lockfile = open(lock.fname, 'w')
+        try:
+            lock.trylock()
+        except IOError as e:
+            lock.lockfile.close()
+            if e.errno in (errno.EACCES, errno.EAGAIN):
+                return None
+            raise
+        return lock
+
+    def _try_lease(self, admin):
+        with self._lock:
+            for account in self.accounts:
+                if bool(account.get('admin')) != admin:
+                    continue
+                key = self.account_key(account)
+                if key in self._leases:
+                    continue
+                lock = self._try_lock(key)
+                if lock is not None:
+                    self._leases[key] = lock
+                    return account
+
+    def lease(self, admin=False):
+        """
+        Returns a free account, waiting for one to be released if needed
+        :param admin: whether to lease an account with the admin role
+        """
+        if not any(bool(account.get('admin')) == admin
+                   for account in self.accounts):
+            raise exceptions.InvalidConfiguration(
+                "No %saccount in the credential pool %s" %
+                ('admin ' if admin else '', self.path))
+        try:
+            os.makedirs(self.lock_dir)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        start = time.time()
+        while True:
+            account = self._try_lease(admin)
+            if account is not None:
+                LOG.info("Leased account %s from the credential pool" %
+                         account['username'])
+                return account
+            if time.time() - start > self.timeout:
+                raise exceptions.TimeoutException(
+                    "No free %saccount in the credential pool %s after %ss" %
+                    ('admin ' if admin else '', self.path, self.timeout))
+            time.sleep(self.interval)
+
+    def release(self, account):
+        """Returns a leased account to the pool."""
+        with self._lock:
+            lock = self._leases.pop(self.account_key(account), None)
+        if lock is not None:
+            lock.unlock()
+            lock.lockfile.close()
+            LOG.info("Released account %s to the credential pool" %
+                     account['username'])
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_credential_pool():
+    """
+    Returns the credential pool of the process, or None if no pool is
+    configured
+    """
+    global _POOL
+    path = CONF.compute.credential_pool_file
+    if not path:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None or _POOL.path != path:
+            _POOL = CredentialPool(
+                path, timeout=CONF.compute.credential_pool_timeout)
+        return _POOL
@@ -0,0 +1,85 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import math
+
+
+class Histogram(object):
+    """
+    Histogram of non negative values with geometrically growing buckets
+
+    Bucket upper bounds are base * factor ** n, so percentiles are known
+    to within factor while the memory used does not depend on the number
+    of samples.
+    """
+
+    def __init__(self, base, factor=1.1):
+        self.base = base
+        self.factor = factor
+        self.buckets = collections.defaultdict(int)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def bucket_index(self, value):
+        if value <= self.base:
+            return 0
+        return int(math.ceil(math.log(float(value) / self.base) /
+                             math.log(self.factor)))
+
+    def add(self, value):
+        self.buckets[self.bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def mean(self):
+        if not self.count:
+            return None
+        return float(self.total) / self.count
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        rank = percent / 100.0 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.base * self.factor ** index, self.max)
+        return self.max
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def to_dict(self):
+        return dict(base=self.base, factor=self.factor, count=self.count,
+                    total=self.total, max=self.max,
+                    buckets=dict(self.buckets))
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['base'], data['factor'])
+        for index, count in data['buckets'].items():
+            histogram.buckets[int(index)] = count
+        histogram.count = data['count']
+        histogram.total = data['total']
+        histogram.max = data['max']
+        return histogram
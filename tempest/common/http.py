@@ -14,8 +14,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import os
+import threading
+import time
+import urlparse
+
 import httplib2
 
+from tempest import config
+
+CONF = config.CONF
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
 
 class ClosingHttp(httplib2.Http):
     def request(self, *args, **kwargs):
@@ -23,3 +36,134 @@ class ClosingHttp(httplib2.Http):
         new_headers = dict(original_headers, connection='close')
         new_kwargs = dict(kwargs, headers=new_headers)
         return super(ClosingHttp, self).request(*args, **new_kwargs)
+
+
+class HttpConnectionPool(object):
+    """
+    Thread-safe pool of keep-alive httplib2.Http objects.
+
+    Idle objects are kept per endpoint (scheme and netloc), at most
+    max_size of them per endpoint, and are closed once they have not been
+    used for idle_timeout seconds. The pool is reset in forked children so
+    that sockets are never shared between processes.
+    """
+
+    def __init__(self, max_size=10, idle_timeout=60, **http_kwargs):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.http_kwargs = http_kwargs
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._idle = collections.defaultdict(collections.deque)
+
+    @staticmethod
+    def close(http_obj):
+        for conn in http_obj.connections.values():
+            conn.close()
+        http_obj.connections.clear()
+
+    def get(self, key):
+        """Returns an idle Http object for the endpoint, or a new one."""
+        if self._pid != os.getpid():
+            self._reset()
+        expired = []
+        http_obj = None
+        now = time.time()
+        with self._lock:
+            idle = self._idle[key]
+            # The oldest entries are on the left, the most recent on the right
+            while idle and now - idle[0][1] >= self.idle_timeout:
+                expired.append(idle.popleft()[0])
+            if idle:
+                http_obj = idle.pop()[0]
+        for obj in expired:
+            self.close(obj)
+        if http_obj is None:
+            http_obj = httplib2.Http(**self.http_kwargs)
+        return http_obj
+
+    def put(self, key, http_obj):
+        """Returns an Http object to the pool once a request is done."""
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_size:
+                idle.append((http_obj, time.time()))
+                return
+        self.close(http_obj)
+
+    def clear(self):
+        """Closes all the idle connections."""
+        with self._lock:
+            idle, self._idle = (self._idle,
+                                collections.defaultdict(collections.deque))
+        for entries in idle.values():
+            for http_obj, _ in entries:
+                self.close(http_obj)
+
+
+class PooledHttp(object):
+    """
+    Drop-in replacement for httplib2.Http which keeps connections alive.
+
+    Each request borrows an Http object from the pool for its endpoint and
+    gives it back when done, so consecutive requests to the same service
+    skip the TCP and TLS handshakes.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    @staticmethod
+    def _pool_key(uri):
+        parts = urlparse.urlparse(uri)
+        return parts.scheme, parts.netloc
+
+    def request(self, uri, method="GET", body=None, headers=None,
+                redirections=httplib2.DEFAULT_MAX_REDIRECTS,
+                connection_type=None):
+        key = self._pool_key(uri)
+        http_obj = self.pool.get(key)
+        try:
+            resp, resp_body = http_obj.request(
+                uri, method, body=body, headers=headers,
+                redirections=redirections, connection_type=connection_type)
+        except Exception:
+            # The connection state is unknown, do not hand it out again
+            self.pool.close(http_obj)
+            raise
+        self.pool.put(key, http_obj)
+        return resp, resp_body
+
+
+def get_connection_pool(disable_ssl_certificate_validation=False):
+    """Returns the process-wide connection pool for the given SSL mode."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(disable_ssl_certificate_validation)
+        if pool is None:
+            pool = HttpConnectionPool(
+                max_size=CONF.service_clients.connection_pool_size,
+                idle_timeout=CONF.service_clients.connection_idle_timeout,
+                disable_ssl_certificate_validation=(
+                    disable_ssl_certificate_validation))
+            _POOLS[disable_ssl_certificate_validation] = pool
+        return pool
+
+
+def get_http(disable_ssl_certificate_validation=False):
+    """
+    Returns the HTTP object service clients should use.
+
+    That is a PooledHttp unless connection pooling is disabled in the
+    configuration, in which case a ClosingHttp is returned and every request
+    opens a new connection.
+    """
+    if not CONF.service_clients.connection_pooling:
+        return ClosingHttp(
+            disable_ssl_certificate_validation=(
+                disable_ssl_certificate_validation))
+    return PooledHttp(get_connection_pool(disable_ssl_certificate_validation))
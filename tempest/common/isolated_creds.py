@@ -12,12 +12,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import netaddr
+import functools
 
 import keystoneclient.v2_0.client as keystoneclient
 import neutronclient.v2_0.client as neutronclient
 
 from tempest import clients
+from tempest.common import cidr_allocator
+from tempest.common import credential_pool
+from tempest.common import parallel
 from tempest.common.utils import data_utils
 from tempest import config
 from tempest import exceptions
@@ -26,6 +29,19 @@ from tempest.openstack.common import log as logging
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+# Number of ports listed per request when cleaning up the ports of a network
+PORTS_PAGE_SIZE = 500
+
+
+class _AccountResource(dict):
+    """User or tenant of a pooled account, with attribute access."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
 
 class IsolatedCreds(object):
 
@@ -34,13 +50,17 @@ class IsolatedCreds(object):
         self.network_resources = network_resources
         self.isolated_creds = {}
         self.isolated_net_resources = {}
-        self.ports = []
         self.name = name
         self.tempest_client = tempest_client
         self.interface = interface
         self.password = password
         self.identity_admin_client, self.network_admin_client = (
             self._get_admin_clients())
+        # Accounts leased from the credential pool, by credentials type.
+        # They come with all their network resources, whichever ones
+        # network_resources asks for.
+        self.leased_accounts = {}
+        self.credential_pool = credential_pool.get_credential_pool()
 
     def _get_official_admin_clients(self):
         username = CONF.identity.admin_username
@@ -237,7 +257,8 @@ class IsolatedCreds(object):
             if router:
                 self._clear_isolated_router(router['id'], router['name'])
             if subnet:
-                self._clear_isolated_subnet(subnet['id'], subnet['name'])
+                self._clear_isolated_subnet(subnet['id'], subnet['name'],
+                                            subnet.get('cidr'))
             if network:
                 self._clear_isolated_network(network['id'], network['name'])
             raise
@@ -258,15 +279,17 @@ class IsolatedCreds(object):
                                'network_id': network_id, 'ip_version': 4}}
             if self.network_resources:
                 body['enable_dhcp'] = self.network_resources['dhcp']
-        base_cidr = netaddr.IPNetwork(CONF.network.tenant_network_cidr)
-        mask_bits = CONF.network.tenant_network_mask_bits
-        for subnet_cidr in base_cidr.subnet(mask_bits):
+        # CIDRs are allocated locally, so that concurrent test processes do
+        # not try the same ones. Those which turn out to be used elsewhere
+        # stay allocated to this process.
+        allocator = cidr_allocator.get_cidr_allocator()
+        for subnet_cidr in iter(allocator.allocate, None):
             try:
                 if self.tempest_client:
                     if self.network_resources:
                         resp, resp_body = self.network_admin_client.\
                             create_subnet(
-                                network_id=network_id, cidr=str(subnet_cidr),
+                                network_id=network_id, cidr=subnet_cidr,
                                 name=subnet_name,
                                 tenant_id=tenant_id,
                                 enable_dhcp=self.network_resources['dhcp'],
@@ -274,17 +297,21 @@ class IsolatedCreds(object):
                     else:
                         resp, resp_body = self.network_admin_client.\
                             create_subnet(network_id=network_id,
-                                          cidr=str(subnet_cidr),
+                                          cidr=subnet_cidr,
                                           name=subnet_name,
                                           tenant_id=tenant_id,
                                           ip_version=4)
                 else:
-                    body['subnet']['cidr'] = str(subnet_cidr)
+                    body['subnet']['cidr'] = subnet_cidr
                     resp_body = self.network_admin_client.create_subnet(body)
                 break
             except exceptions.BadRequest as e:
                 if 'overlaps with another subnet' not in str(e):
+                    allocator.release(subnet_cidr)
                     raise
+            except Exception:
+                allocator.release(subnet_cidr)
+                raise
         else:
             e = exceptions.BuildErrorException()
             e.message = 'Available CIDR for subnet creation could not be found'
@@ -359,7 +386,27 @@ class IsolatedCreds(object):
     def get_alt_router(self):
         return self.isolated_net_resources.get('alt')[2]
 
+    def _get_pool_creds(self, cred_type, admin=False):
+        account = self.leased_accounts.get(cred_type)
+        if account is None:
+            account = self.credential_pool.lease(admin=admin)
+            self.leased_accounts[cred_type] = account
+            user = _AccountResource(id=account['user_id'],
+                                    name=account['username'],
+                                    tenantId=account['tenant_id'])
+            tenant = _AccountResource(id=account['tenant_id'],
+                                      name=account['tenant_name'])
+            self.isolated_creds[cred_type] = (user, tenant)
+            if CONF.service_available.neutron:
+                self.isolated_net_resources[cred_type] = (
+                    account.get('network'), account.get('subnet'),
+                    account.get('router'),)
+        return (account['username'], account['tenant_name'],
+                account['password'])
+
     def get_primary_creds(self):
+        if self.credential_pool is not None:
+            return self._get_pool_creds('primary')
         if self.isolated_creds.get('primary'):
             user, tenant = self.isolated_creds['primary']
             username, tenant_name = self._get_cred_names(user, tenant)
@@ -379,6 +426,8 @@ class IsolatedCreds(object):
         return username, tenant_name, self.password
 
     def get_admin_creds(self):
+        if self.credential_pool is not None:
+            return self._get_pool_creds('admin', admin=True)
         if self.isolated_creds.get('admin'):
             user, tenant = self.isolated_creds['admin']
             username, tenant_name = self._get_cred_names(user, tenant)
@@ -398,6 +447,8 @@ class IsolatedCreds(object):
         return username, tenant_name, self.password
 
     def get_alt_creds(self):
+        if self.credential_pool is not None:
+            return self._get_pool_creds('alt')
         if self.isolated_creds.get('alt'):
             user, tenant = self.isolated_creds['alt']
             username, tenant_name = self._get_cred_names(user, tenant)
@@ -425,7 +476,7 @@ class IsolatedCreds(object):
                      router_name)
             pass
 
-    def _clear_isolated_subnet(self, subnet_id, subnet_name):
+    def _clear_isolated_subnet(self, subnet_id, subnet_name, cidr=None):
         net_client = self.network_admin_client
         try:
             net_client.delete_subnet(subnet_id)
@@ -433,6 +484,8 @@ class IsolatedCreds(object):
             LOG.warn('subnet with name: %s not found for delete' %
                      subnet_name)
             pass
+        if cidr:
+            cidr_allocator.get_cidr_allocator().release(cidr)
 
     def _clear_isolated_network(self, network_id, network_name):
         net_client = self.network_admin_client
@@ -446,17 +499,20 @@ class IsolatedCreds(object):
     def _cleanup_ports(self, network_id):
         # TODO(mlavalle) This method will be removed once patch
         # https://review.openstack.org/#/c/46563/ merges in Neutron
-        if not self.ports:
-            if self.tempest_client:
-                resp, resp_body = self.network_admin_client.list_ports()
-            else:
-                resp_body = self.network_admin_client.list_ports()
-            self.ports = resp_body['ports']
+        # Only the ports of the network are listed, by Neutron, which
+        # cannot exclude the router interface and DHCP ports by itself
+        filters = dict(network_id=network_id,
+                       fields=['id', 'name', 'device_owner'])
+        if self.tempest_client:
+            resp, resp_body = self.network_admin_client.list_ports(
+                page_size=PORTS_PAGE_SIZE, **filters)
+        else:
+            # neutronclient follows the pages by itself
+            resp_body = self.network_admin_client.list_ports(**filters)
         ports_to_delete = [
             port
-            for port in self.ports
-            if (port['network_id'] == network_id and
-                port['device_owner'] != 'network:router_interface' and
+            for port in resp_body['ports']
+            if (port['device_owner'] != 'network:router_interface' and
                 port['device_owner'] != 'network:dhcp')
         ]
         for port in ports_to_delete:
@@ -468,66 +524,119 @@ class IsolatedCreds(object):
                 LOG.warn('Port id: %s, name %s not found for clean-up' %
                          (port['id'], port['name']))
 
-    def _clear_isolated_net_resources(self):
-        net_client = self.network_admin_client
-        for cred in self.isolated_net_resources:
-            network, subnet, router = self.isolated_net_resources.get(cred)
-            LOG.debug("Clearing network: %(network)s, "
-                      "subnet: %(subnet)s, router: %(router)s",
-                      {'network': network, 'subnet': subnet, 'router': router})
-            if (not self.network_resources or
-                self.network_resources.get('router')):
-                try:
-                    if self.tempest_client:
-                        net_client.remove_router_interface_with_subnet_id(
-                            router['id'], subnet['id'])
-                    else:
-                        body = {'subnet_id': subnet['id']}
-                        net_client.remove_interface_router(router['id'], body)
-                except exceptions.NotFound:
-                    LOG.warn('router with name: %s not found for delete' %
-                             router['name'])
-                    pass
-                self._clear_isolated_router(router['id'], router['name'])
-            if (not self.network_resources or
-                self.network_resources.get('network')):
-                # TODO(mlavalle) This method call will be removed once patch
-                # https://review.openstack.org/#/c/46563/ merges in Neutron
-                self._cleanup_ports(network['id'])
-            if (not self.network_resources or
-                self.network_resources.get('subnet')):
-                self._clear_isolated_subnet(subnet['id'], subnet['name'])
-            if (not self.network_resources or
-                self.network_resources.get('network')):
-                self._clear_isolated_network(network['id'], network['name'])
+    def _run_concurrently(self, tasks):
+        """
+        Calls each of tasks, concurrently when the admin clients allow it,
+        and raises the first error once all of them are done
+        """
+        def run(task):
+            return task()
 
-    def clear_isolated_creds(self):
-        if not self.isolated_creds:
-            return
-        self._clear_isolated_net_resources()
-        for cred in self.isolated_creds:
-            user, tenant = self.isolated_creds.get(cred)
-            try:
-                if self.tempest_client:
-                    self._delete_user(user['id'])
-                else:
-                    self._delete_user(user.id)
-            except exceptions.NotFound:
-                if self.tempest_client:
-                    name = user['name']
-                else:
-                    name = user.name
-                LOG.warn("user with name: %s not found for delete" % name)
-                pass
+        if self.tempest_client:
+            results = self.identity_admin_client.map_concurrently(
+                run, tasks, return_exceptions=True)
+        else:
+            # The official clients are not known to be thread safe
+            results = parallel.map_concurrently(run, tasks, 1,
+                                                return_exceptions=True)
+        errors = [result for result in results
+                  if isinstance(result, Exception)]
+        for error in errors:
+            LOG.error("Failed to clear isolated resources: %s" % error)
+        if errors:
+            raise errors[0]
+
+    def _clear_isolated_net_resources_for(self, cred):
+        net_client = self.network_admin_client
+        network, subnet, router = self.isolated_net_resources.get(cred)
+        LOG.debug("Clearing network: %(network)s, "
+                  "subnet: %(subnet)s, router: %(router)s",
+                  {'network': network, 'subnet': subnet, 'router': router})
+        # The router and the ports are deleted once the router interface is
+        # removed, and the subnet and the network after them
+        tasks = []
+        if (not self.network_resources or
+            self.network_resources.get('router')):
             try:
                 if self.tempest_client:
-                    self._delete_tenant(tenant['id'])
+                    net_client.remove_router_interface_with_subnet_id(
+                        router['id'], subnet['id'])
                 else:
-                    self._delete_tenant(tenant.id)
+                    body = {'subnet_id': subnet['id']}
+                    net_client.remove_interface_router(router['id'], body)
             except exceptions.NotFound:
-                if self.tempest_client:
-                    name = tenant['name']
-                else:
-                    name = tenant.name
-                LOG.warn("tenant with name: %s not found for delete" % name)
+                LOG.warn('router with name: %s not found for delete' %
+                         router['name'])
                 pass
+            tasks.append(functools.partial(self._clear_isolated_router,
+                                           router['id'], router['name']))
+        if (not self.network_resources or
+            self.network_resources.get('network')):
+            # TODO(mlavalle) This method call will be removed once patch
+            # https://review.openstack.org/#/c/46563/ merges in Neutron
+            tasks.append(functools.partial(self._cleanup_ports,
+                                           network['id']))
+        self._run_concurrently(tasks)
+        if (not self.network_resources or
+            self.network_resources.get('subnet')):
+            self._clear_isolated_subnet(subnet['id'], subnet['name'],
+                                        subnet.get('cidr'))
+        if (not self.network_resources or
+            self.network_resources.get('network')):
+            self._clear_isolated_network(network['id'], network['name'])
+
+    def _clear_isolated_net_resources_tasks(self):
+        return [functools.partial(self._clear_isolated_net_resources_for,
+                                  cred)
+                for cred in self.isolated_net_resources]
+
+    def _clear_isolated_user(self, user):
+        try:
+            if self.tempest_client:
+                self._delete_user(user['id'])
+            else:
+                self._delete_user(user.id)
+        except exceptions.NotFound:
+            if self.tempest_client:
+                name = user['name']
+            else:
+                name = user.name
+            LOG.warn("user with name: %s not found for delete" % name)
+            pass
+
+    def _clear_isolated_tenant(self, tenant):
+        try:
+            if self.tempest_client:
+                self._delete_tenant(tenant['id'])
+            else:
+                self._delete_tenant(tenant.id)
+        except exceptions.NotFound:
+            if self.tempest_client:
+                name = tenant['name']
+            else:
+                name = tenant.name
+            LOG.warn("tenant with name: %s not found for delete" % name)
+            pass
+
+    def _release_pool_creds(self):
+        for account in self.leased_accounts.values():
+            self.credential_pool.release(account)
+        self.leased_accounts = {}
+        self.isolated_creds = {}
+        self.isolated_net_resources = {}
+
+    def clear_isolated_creds(self):
+        if not self.isolated_creds:
+            return
+        if self.leased_accounts:
+            # Pooled accounts and their resources are kept for other tests
+            self._release_pool_creds()
+            return
+        # Each credentials' network resources are cleared in order, while
+        # users and tenants are deleted at the same time
+        tasks = self._clear_isolated_net_resources_tasks()
+        for user, tenant in self.isolated_creds.values():
+            tasks.append(functools.partial(self._clear_isolated_user, user))
+            tasks.append(functools.partial(self._clear_isolated_tenant,
+                                           tenant))
+        self._run_concurrently(tasks)
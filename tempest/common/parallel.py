@@ -0,0 +1,145 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sys
+import threading
+
+import six
+from six import moves
+
+
+class Future(object):
+    """The pending result of a call submitted to an Executor."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._exc_info = None
+
+    def set_result(self, result):
+        self._result = result
+        self._done.set()
+
+    def set_exc_info(self, exc_info):
+        self._exc_info = exc_info
+        self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.done()
+
+    def exception(self):
+        """Waits for the call and returns the exception it raised, if any."""
+        self._done.wait()
+        if self._exc_info is not None:
+            return self._exc_info[1]
+
+    def result(self):
+        """Waits for the call and returns its result, or raises its error."""
+        self._done.wait()
+        if self._exc_info is not None:
+            six.reraise(*self._exc_info)
+        return self._result
+
+
+class Executor(object):
+    """
+    Runs calls in a bounded pool of worker threads
+
+    Threads are started on demand, up to max_workers, and stopped by
+    shutdown(). The executor can be used as a context manager, in which case
+    it is shut down, after all the submitted calls are done, on exit.
+    """
+
+    def __init__(self, max_workers):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._queue = moves.queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException:
+                future.set_exc_info(sys.exc_info())
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedules fn(*args, **kwargs) and returns its Future."""
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit calls after shutdown")
+            self._queue.put((future, fn, args, kwargs))
+            if len(self._threads) < min(self.max_workers,
+                                        self._queue.qsize()):
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def map(self, fn, iterable, return_exceptions=False):
+        """
+        Calls fn on each item of iterable concurrently
+
+        Waits for all the calls and returns their results in the order of
+        iterable. If a call fails its exception is raised, unless
+        return_exceptions is True, in which case it takes the place of the
+        result in the list.
+        """
+        futures = [self.submit(fn, item) for item in iterable]
+        for future in futures:
+            future.wait()
+        results = []
+        for future in futures:
+            if return_exceptions and future.exception() is not None:
+                results.append(future.exception())
+            else:
+                results.append(future.result())
+        return results
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+def map_concurrently(fn, iterable, max_workers, return_exceptions=False):
+    """Executor.map() with a pool of at most max_workers threads."""
+    items = list(iterable)
+    with Executor(max(1, min(max_workers, len(items)))) as executor:
+        return executor.map(fn, items, return_exceptions=return_exceptions)
@@ -14,30 +14,313 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
 import collections
+import csv
 import inspect
 import json
 from lxml import etree
+import os
+import random
 import re
+import socket
+import threading
 import time
+import urlparse
 
 import jsonschema
 
+from tempest.common import histogram
 from tempest.common import http
+from tempest.common import parallel
+from tempest.common import waiters
 from tempest.common import xml_utils as common
 from tempest import config
 from tempest import exceptions
+from tempest.openstack.common import importutils
 from tempest.openstack.common import log as logging
 
 CONF = config.CONF
 
-# redrive rate limited calls at most twice
-MAX_RECURSION_DEPTH = 2
 TOKEN_CHARS_RE = re.compile('^[-A-Za-z0-9+/=]*$')
 
 # All the successful HTTP status codes from RFC 2616
 HTTP_SUCCESS = (200, 201, 202, 203, 204, 205, 206)
 
+# The caller reported in the request logs of each thread, when known
+_CALLER = threading.local()
+
+
+def set_caller(caller_name):
+    """
+    Sets the ClassName:method reported for the requests of this thread
+
+    tempest.test.BaseTestCase sets it around setUp, test methods, tearDown
+    and cleanups, so that RestClient does not have to look for the caller
+    in the stack on every request. Pass None to fall back to the stack.
+    """
+    _CALLER.name = caller_name
+
+
+def get_caller():
+    return getattr(_CALLER, 'name', None)
+
+
+class RequestMetrics(object):
+    """
+    Latency and response size statistics of the requests of a process
+
+    Requests are grouped by service, method, URL template and status. The
+    URL template is the request path with resource ids and generated names
+    replaced by placeholders, so that e.g. all the GETs of a server end up
+    in the same group.
+    """
+
+    ID_RE = re.compile('^([0-9a-fA-F]{8}-([0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}|'
+                       '[0-9a-fA-F]{32,}|[0-9]+)$')
+    NAME_RE = re.compile('^.+-[0-9]+$')
+    CSV_FIELDS = ('service', 'method', 'url', 'status', 'count', 'retries',
+                  'latency_mean', 'latency_p50', 'latency_p90',
+                  'latency_p99', 'latency_max', 'size_mean', 'size_p50',
+                  'size_p90', 'size_max')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.stats = {}
+
+    @classmethod
+    def url_template(cls, url):
+        path = urlparse.urlparse(url or '').path
+        segments = []
+        for segment in path.strip('/').split('/'):
+            if cls.ID_RE.match(segment):
+                segment = '{id}'
+            elif cls.NAME_RE.match(segment):
+                segment = '{name}'
+            segments.append(segment)
+        return '/'.join(segments)
+
+    def _group(self, key):
+        group = self.stats.get(key)
+        if group is None:
+            group = dict(latency=histogram.Histogram(0.001),
+                         size=histogram.Histogram(64, 2),
+                         retries=0)
+            self.stats[key] = group
+        return group
+
+    def _locked_group(self, service, method, url, status):
+        # Must be called with the lock held
+        # Forked processes keep their own statistics
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self.stats = {}
+        return self._group((service, method, self.url_template(url), status))
+
+    def record(self, service, method, url, status, secs, size):
+        with self._lock:
+            group = self._locked_group(service, method, url, status)
+            group['latency'].add(secs)
+            group['size'].add(size)
+
+    def record_retry(self, service, method, url, status):
+        """
+        Counts a retry of a request which got status, or 'error' when the
+        request failed without a response.
+        """
+        with self._lock:
+            self._locked_group(service, method, url, status)['retries'] += 1
+
+    def merge(self, other):
+        with self._lock:
+            for key, other_group in other.stats.items():
+                group = self._group(key)
+                group['latency'].merge(other_group['latency'])
+                group['size'].merge(other_group['size'])
+                group['retries'] += other_group['retries']
+
+    def to_dict(self):
+        with self._lock:
+            return [dict(service=key[0], method=key[1], url=key[2],
+                         status=key[3], retries=group['retries'],
+                         latency=group['latency'].to_dict(),
+                         size=group['size'].to_dict())
+                    for key, group in self.stats.items()]
+
+    @classmethod
+    def from_dict(cls, data):
+        metrics = cls()
+        for entry in data:
+            key = (entry['service'], entry['method'], entry['url'],
+                   entry['status'])
+            metrics.stats[key] = dict(
+                latency=histogram.Histogram.from_dict(entry['latency']),
+                size=histogram.Histogram.from_dict(entry['size']),
+                retries=entry.get('retries', 0))
+        return metrics
+
+    def summary(self):
+        """Returns one row per group, with the columns in CSV_FIELDS."""
+        rows = []
+        with self._lock:
+            for key in sorted(self.stats):
+                latency = self.stats[key]['latency']
+                size = self.stats[key]['size']
+                row = dict(zip(self.CSV_FIELDS[:4], key),
+                           count=latency.count,
+                           retries=self.stats[key]['retries'],
+                           latency_mean=latency.mean(),
+                           latency_p50=latency.percentile(50),
+                           latency_p90=latency.percentile(90),
+                           latency_p99=latency.percentile(99),
+                           latency_max=latency.max,
+                           size_mean=size.mean(),
+                           size_p50=size.percentile(50),
+                           size_p90=size.percentile(90),
+                           size_max=size.max)
+                rows.append(row)
+        return rows
+
+    def dump_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    def dump_csv(self, path):
+        with open(path, 'w') as f:
+            writer = csv.DictWriter(f, self.CSV_FIELDS)
+            writer.writerow(dict(zip(self.CSV_FIELDS, self.CSV_FIELDS)))
+            writer.writerows(self.summary())
+
+    def dump(self, directory):
+        """Writes the statistics of this process as JSON and CSV."""
+        path = os.path.join(directory, 'request-metrics-%d' % os.getpid())
+        self.dump_json(path + '.json')
+        self.dump_csv(path + '.csv')
+
+
+# The statistics of all the requests issued by RestClient in this process
+METRICS = RequestMetrics()
+
+
+def _dump_metrics():
+    if METRICS.stats and METRICS._pid == os.getpid():
+        metrics_dir = CONF.service_clients.request_metrics_dir
+        if metrics_dir:
+            METRICS.dump(metrics_dir)
+
+
+atexit.register(_dump_metrics)
+
+
+class RetryBudget(object):
+    """
+    Bounds the retries of a process to a share of its requests
+
+    Every request deposits ratio tokens, up to capacity, and every retry
+    withdraws one, so that retries cannot snowball when the cloud is
+    overloaded. The budget starts full.
+    """
+
+    def __init__(self, ratio, capacity=10):
+        self.ratio = ratio
+        self.capacity = capacity
+        self.tokens = capacity
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+_RETRY_BUDGET = None
+_RETRY_BUDGET_LOCK = threading.Lock()
+
+
+def get_retry_budget():
+    """Returns the retry budget shared by all the clients of a process."""
+    global _RETRY_BUDGET
+    with _RETRY_BUDGET_LOCK:
+        if _RETRY_BUDGET is None:
+            _RETRY_BUDGET = RetryBudget(CONF.service_clients.retry_budget)
+        return _RETRY_BUDGET
+
+
+class RetryPolicy(object):
+    """
+    Decides whether a failed request is retried, and after which delay
+
+    Rate limited requests (413 with retry-after but not an absolute limit,
+    and 429) were not processed, so they are retried whatever their method.
+    Other retryable statuses and connection errors are only retried for
+    idempotent methods. Delays grow exponentially with jitter, unless the
+    response says how long to wait in a retry-after header. All retries
+    are taken from the process-wide RetryBudget.
+
+    Alternative policies can be configured with [service-clients]
+    retry_policy; they are built with no arguments and must implement
+    get_delay().
+    """
+
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'DELETE')
+    RATE_LIMIT_STATUSES = (413, 429)
+
+    def __init__(self):
+        self.max_retries = CONF.service_clients.max_retries
+        self.statuses = set(int(status) for status in
+                            CONF.service_clients.retry_statuses)
+        self.backoff = CONF.service_clients.retry_backoff
+        self.backoff_max = CONF.service_clients.retry_backoff_max
+        self.budget = get_retry_budget()
+
+    def _is_retryable(self, client, method, resp, resp_body, error):
+        if error is not None:
+            return method in self.IDEMPOTENT_METHODS
+        if resp.status == 413:
+            return ('retry-after' in resp and not client.is_absolute_limit(
+                resp, client._parse_resp(resp_body)))
+        if resp.status not in self.statuses:
+            return False
+        return (resp.status in self.RATE_LIMIT_STATUSES or
+                method in self.IDEMPOTENT_METHODS)
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_max, self.backoff * 2 ** (attempt - 1))
+        return delay / 2.0 + random.uniform(0, delay / 2.0)
+
+    def get_delay(self, client, method, attempt, resp=None, resp_body=None,
+                  error=None):
+        """
+        Returns the seconds to wait before retrying, or None not to retry
+        :param client: the RestClient which issued the request
+        :param attempt: number of the retry being considered, from 1
+        :param resp: the response, None when the request raised error
+        """
+        if attempt == 1:
+            self.budget.deposit()
+        if attempt > self.max_retries:
+            return None
+        if not self._is_retryable(client, method.upper(), resp, resp_body,
+                                  error):
+            return None
+        if not self.budget.withdraw():
+            client.LOG.warning("Retry budget exhausted, not retrying")
+            return None
+        if resp is not None and 'retry-after' in resp:
+            try:
+                return int(resp['retry-after'])
+            except ValueError:
+                # Not a number of seconds but an HTTP date
+                pass
+        return self._backoff(attempt)
+
 
 class RestClient(object):
 
@@ -65,6 +348,8 @@ class RestClient(object):
         # The version of the API this client implements
         self.api_version = None
         self._skip_path = False
+        # (endpoint_type, region) per (service, endpoint_url)
+        self._endpoint_filters = {}
         self.build_interval = CONF.compute.build_interval
         self.build_timeout = CONF.compute.build_timeout
         self.general_header_lc = set(('cache-control', 'connection',
@@ -76,8 +361,10 @@ class RestClient(object):
                                        'retry-after', 'server',
                                        'vary', 'www-authenticate'))
         dscv = CONF.identity.disable_ssl_certificate_validation
-        self.http_obj = http.ClosingHttp(
+        self.http_obj = http.get_http(
             disable_ssl_certificate_validation=dscv)
+        self.retry_policy = importutils.import_class(
+            CONF.service_clients.retry_policy)()
 
     def _get_type(self):
         return self.TYPE
@@ -160,10 +447,19 @@ class RestClient(object):
 
     @property
     def filters(self):
+        # Looking up endpoint type and region walks the whole config,
+        # so it is done once per service and not on every request
+        key = (self.service, self.endpoint_url)
+        try:
+            endpoint_type, region = self._endpoint_filters[key]
+        except KeyError:
+            endpoint_type = self._get_endpoint_type(self.service)
+            region = self._get_region(self.service)
+            self._endpoint_filters[key] = (endpoint_type, region)
         _filters = dict(
             service=self.service,
-            endpoint_type=self._get_endpoint_type(self.service),
-            region=self._get_region(self.service)
+            endpoint_type=endpoint_type,
+            region=region
         )
         if self.api_version is not None:
             _filters['api_version'] = self.api_version
@@ -218,6 +514,29 @@ class RestClient(object):
     def copy(self, url, headers=None, extra_headers=False):
         return self.request('COPY', url, extra_headers, headers)
 
+    def map_concurrently(self, func, items, return_exceptions=False):
+        """
+        Calls func on each of items from a pool of threads
+
+        func is normally a method of this client, e.g. delete_server, so
+        that requests are authenticated and checked for errors as usual.
+        Results are returned in the order of items, see
+        parallel.Executor.map. Calls are made one after the other when
+        connection pooling is disabled, as a single HTTP object cannot be
+        shared between threads.
+        """
+        max_workers = CONF.service_clients.max_concurrent_requests
+        if not isinstance(self.http_obj, http.PooledHttp):
+            max_workers = 1
+        caller_name = get_caller()
+
+        def call(item):
+            set_caller(caller_name)
+            return func(item)
+
+        return parallel.map_concurrently(call, items, max_workers,
+                                         return_exceptions=return_exceptions)
+
     def get_versions(self):
         resp, body = self.get('')
         body = self._parse_resp(body)
@@ -242,7 +561,7 @@ class RestClient(object):
                 frame = frame.f_back
                 name = frame.f_code.co_name
                 names.append(name)
-                if re.search("^(test_|setUp|tearDown)", name):
+                if name.startswith(('test_', 'setUp', 'tearDown')):
                     cname = ""
                     if 'self' in frame.f_locals:
                         cname = frame.f_locals['self'].__class__.__name__
@@ -250,7 +569,7 @@ class RestClient(object):
                         cname = frame.f_locals['cls'].__name__
                     caller_name = cname + ":" + name
                     break
-                elif re.search("^_run_cleanup", name):
+                elif name.startswith('_run_cleanup'):
                     is_cleanup = True
                 else:
                     cname = ""
@@ -264,7 +583,7 @@ class RestClient(object):
                     # start looking for a real class name, and declare victory
                     # once we do.
                     if is_cleanup and cname:
-                        if not re.search("^RunTest", cname):
+                        if not cname.startswith('RunTest'):
                             caller_name = cname + ":_run_cleanups"
                             break
             except Exception:
@@ -275,6 +594,14 @@ class RestClient(object):
             self.LOG.debug("Sane call name not found in %s" % names)
         return caller_name
 
+    def _get_caller(self):
+        if not CONF.debug.find_caller:
+            return None
+        caller_name = get_caller()
+        if caller_name is None:
+            caller_name = self._find_caller()
+        return caller_name
+
     def _get_request_id(self, resp):
         for i in ('x-openstack-request-id', 'x-compute-request-id'):
             if i in resp:
@@ -290,7 +617,7 @@ class RestClient(object):
         # we're going to just provide work around on who is actually
         # providing timings by gracefully adding no content if they don't.
         # Once we're down to 1 caller, clean this up.
-        caller_name = self._find_caller()
+        caller_name = self._get_caller()
         if secs:
             secs = " %.3fs" % secs
         self.LOG.info(
@@ -305,7 +632,8 @@ class RestClient(object):
         # We intentionally duplicate the info content because in a parallel
         # world this is important to match
         trace_regex = CONF.debug.trace_requests
-        if trace_regex and re.search(trace_regex, caller_name):
+        if (trace_regex and caller_name and
+                re.search(trace_regex, caller_name)):
             log_fmt = """Request (%s): %s %s %s%s
     Request - Headers: %s
         Body: %s
@@ -411,6 +739,8 @@ class RestClient(object):
         self._log_request(method, req_url, resp, secs=(end - start),
                           req_headers=req_headers, req_body=req_body,
                           resp_body=resp_body)
+        METRICS.record(self.service, method, url, resp.status, end - start,
+                       len(resp_body or ''))
 
         # Verify HTTP response codes
         self.response_checker(method, url, req_headers, req_body, resp,
@@ -435,19 +765,27 @@ class RestClient(object):
             except (ValueError, TypeError):
                 headers = self.get_headers()
 
-        resp, resp_body = self._request(method, url,
-                                        headers=headers, body=body)
-
-        while (resp.status == 413 and
-               'retry-after' in resp and
-                not self.is_absolute_limit(
-                    resp, self._parse_resp(resp_body)) and
-                retry < MAX_RECURSION_DEPTH):
+        while True:
             retry += 1
-            delay = int(resp['retry-after'])
+            try:
+                resp, resp_body = self._request(method, url,
+                                                headers=headers, body=body)
+            except socket.error as error:
+                delay = self.retry_policy.get_delay(self, method, retry,
+                                                    error=error)
+                if delay is None:
+                    raise
+                status = 'error'
+            else:
+                delay = self.retry_policy.get_delay(self, method, retry,
+                                                    resp, resp_body)
+                if delay is None:
+                    break
+                status = resp.status
+            self.LOG.info("Retrying %s %s after %s in %.1fs (retry %d)" %
+                          (method, url, status, delay, retry))
+            METRICS.record_retry(self.service, method, url, status)
             time.sleep(delay)
-            resp, resp_body = self._request(method, url,
-                                            headers=headers, body=body)
         self._error_checker(method, url, headers, body,
                             resp, resp_body)
         return resp, resp_body
@@ -564,13 +902,12 @@ class RestClient(object):
 
     def wait_for_resource_deletion(self, id):
         """Waits for a resource to be deleted."""
-        start_time = int(time.time())
-        while True:
-            if self.is_resource_deleted(id):
-                return
-            if int(time.time()) - start_time >= self.build_timeout:
-                raise exceptions.TimeoutException
-            time.sleep(self.build_interval)
+        waiters.wait_for_deletion(self, lambda: self.is_resource_deleted(id),
+                                  id)
+
+    def wait_for_resources_deletion(self, ids):
+        """Waits for many resources to be deleted, checked concurrently."""
+        waiters.wait_for_deletions(self, self.is_resource_deleted, ids)
 
     def is_resource_deleted(self, id):
         """
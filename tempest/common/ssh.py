@@ -34,9 +34,16 @@ LOG = logging.getLogger(__name__)
 
 
 class Client(object):
+    """
+    Runs commands over SSH
+
+    With persistent set, the connection is kept open between commands,
+    and opened again if lost, until close() is called.
+    """
 
     def __init__(self, host, username, password=None, timeout=300, pkey=None,
-                 channel_timeout=10, look_for_keys=False, key_filename=None):
+                 channel_timeout=10, look_for_keys=False, key_filename=None,
+                 persistent=False):
         self.host = host
         self.username = username
         self.password = password
@@ -49,6 +56,8 @@ class Client(object):
         self.timeout = int(timeout)
         self.channel_timeout = float(channel_timeout)
         self.buf_size = 1024
+        self.persistent = persistent
+        self._connection = None
 
     def _get_ssh_connection(self, sleep=1.5, backoff=1):
         """Returns an ssh connection to the specified host."""
@@ -93,6 +102,21 @@ class Client(object):
                             self.username, self.host, e, attempts, bsleep)
                 time.sleep(bsleep)
 
+    def _connect(self):
+        if not self.persistent:
+            return self._get_ssh_connection()
+        transport = (self._connection.get_transport()
+                     if self._connection is not None else None)
+        if transport is None or not transport.is_active():
+            self._connection = self._get_ssh_connection()
+        return self._connection
+
+    def close(self):
+        """Closes the connection kept open by a persistent client."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
     def _is_timed_out(self, start_time):
         return (time.time() - self.timeout) > start_time
 
@@ -107,7 +131,7 @@ class Client(object):
         :raises: SSHExecCommandFailed if command returns nonzero
                  status. The exception contains command status stderr content.
         """
-        ssh = self._get_ssh_connection()
+        ssh = self._connect()
         transport = ssh.get_transport()
         channel = transport.open_session()
         channel.fileno()  # Register event pipe
@@ -11,8 +11,14 @@
 #    under the License.
 
 
+import atexit
+import json
+import os
+import random
+import threading
 import time
 
+from tempest.common import histogram
 from tempest import config
 from tempest import exceptions
 from tempest.openstack.common import log as logging
@@ -21,74 +27,439 @@ CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+class WaitStatistics(object):
+    """
+    Durations of the waits of a process for resources to reach a status
+
+    Waits are grouped by resource type and status waited for. The median
+    duration of a group is the expected duration of the next waits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.stats = {}
+
+    def record(self, resource, status, secs, polls):
+        with self._lock:
+            # Forked processes keep their own statistics
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self.stats = {}
+            group = self.stats.get((resource, status))
+            if group is None:
+                group = dict(duration=histogram.Histogram(0.1),
+                             polls=histogram.Histogram(1))
+                self.stats[(resource, status)] = group
+            group['duration'].add(secs)
+            group['polls'].add(polls)
+
+    def expected(self, resource, status):
+        """Returns the median duration of the waits, or None."""
+        with self._lock:
+            group = self.stats.get((resource, status))
+            if group is not None and self._pid == os.getpid():
+                return group['duration'].percentile(50)
+
+    def to_dict(self):
+        with self._lock:
+            return [dict(resource=key[0], status=key[1],
+                         duration=group['duration'].to_dict(),
+                         polls=group['polls'].to_dict())
+                    for key, group in self.stats.items()]
+
+    def dump(self, directory):
+        """Writes the statistics of this process as JSON."""
+        path = os.path.join(directory, 'wait-metrics-%d.json' % os.getpid())
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+
+# The statistics of all the waits for resources in this process
+WAIT_STATS = WaitStatistics()
+
+
+def _dump_wait_stats():
+    if WAIT_STATS.stats and WAIT_STATS._pid == os.getpid():
+        metrics_dir = CONF.service_clients.request_metrics_dir
+        if metrics_dir:
+            WAIT_STATS.dump(metrics_dir)
+
+
+atexit.register(_dump_wait_stats)
+
+
+class AdaptiveInterval(object):
+    """
+    Intervals between the polls of a resource waited for
+
+    The first polls are [service-clients] poll_initial_interval apart, so
+    that quick transitions are noticed quickly, and the interval grows
+    exponentially up to max_interval, so that long ones do not hammer the
+    API. Until the expected duration of the wait, if known, the resource
+    is polled every max_interval at most, halving the remaining time.
+    Each interval is cut by a random jitter.
+    """
+
+    def __init__(self, max_interval, expected=None):
+        self.max_interval = max_interval
+        self.expected = expected or 0
+        self.initial = min(CONF.service_clients.poll_initial_interval,
+                           max_interval)
+        self.factor = CONF.service_clients.poll_backoff_factor
+        self.jitter = CONF.service_clients.poll_jitter
+        self.start = time.time()
+        self.polls = 0
+        self._backoff = self.initial
+
+    def elapsed(self):
+        return time.time() - self.start
+
+    def next_interval(self):
+        remaining = self.expected - self.elapsed()
+        if remaining > self.initial:
+            interval = remaining / 2
+        else:
+            interval = self._backoff
+            self._backoff *= self.factor
+        interval = max(min(interval, self.max_interval), self.initial)
+        return interval * (1 - random.uniform(0, self.jitter))
+
+    def sleep(self):
+        time.sleep(self.next_interval())
+        self.polls += 1
+
+
+def wait_for_status(get_status, final, timeout, max_interval,
+                    resource='Resource', failed=None, stats_key=None,
+                    message=None, describe=str,
+                    timeout_exception=exceptions.TimeoutException):
+    """
+    Polls a resource until it reaches a final status, and returns it
+
+    :param get_status: callable returning the current status
+    :param final: collection of the final statuses, or callable telling
+                  whether a status is final
+    :param timeout: time in seconds after which timeout_exception is
+                    raised, with message and the current status
+    :param max_interval: maximum time in seconds between two polls, see
+                         AdaptiveInterval
+    :param resource: description of the resource for logs and messages
+    :param failed: callable called with each status which is not final,
+                   raising an exception to stop waiting on errors
+    :param stats_key: resource type and status under which the duration
+                      of the wait is recorded in WAIT_STATS, and whose
+                      expected duration paces the polls
+    :param describe: callable formatting statuses for logs and messages
+    """
+    is_final = final if callable(final) else final.__contains__
+    expected = WAIT_STATS.expected(*stats_key) if stats_key else None
+    interval = AdaptiveInterval(max_interval, expected)
+    old_status = status = get_status()
+    while True:
+        if status != old_status:
+            LOG.info('%s state transition "%s" ==> "%s" after %d second wait',
+                     resource, describe(old_status), describe(status),
+                     interval.elapsed())
+        if is_final(status):
+            if stats_key:
+                WAIT_STATS.record(stats_key[0], stats_key[1],
+                                  interval.elapsed(), interval.polls)
+            return status
+        if failed is not None:
+            failed(status)
+        if interval.elapsed() >= timeout:
+            if message is None:
+                message = ('%s failed to reach a final status within the '
+                           'required time (%s s).' % (resource, timeout))
+            raise timeout_exception('%s Current status: %s.' %
+                                    (message, describe(status)))
+        interval.sleep()
+        old_status = status
+        status = get_status()
+
+
+def wait_for_resource_status(client, get_resource, resource_id, status,
+                             resource='Resource', failed=None,
+                             status_key='status'):
+    """
+    Waits for a resource to reach a given status, and returns the last
+    response and body of get_resource(resource_id)
+
+    The client should have build_interval and build_timeout attributes.
+    failed is called with the body of each resource which is not in the
+    status waited for.
+    """
+    last = []
+
+    def _get_status():
+        last[:] = get_resource(resource_id)
+        return last[1][status_key]
+
+    def _failed(resource_status):
+        failed(last[1])
+
+    message = ('%s %s failed to reach %s status within the required time '
+               '(%s s).' % (resource, resource_id, status,
+                            client.build_timeout))
+    wait_for_status(_get_status, [status], client.build_timeout,
+                    client.build_interval,
+                    resource='%s %s' % (resource, resource_id),
+                    failed=_failed if failed else None,
+                    stats_key=(resource.lower(), status),
+                    message=message)
+    return tuple(last)
+
+
+def wait_for_deletion(client, is_deleted, resource_id, resource='Resource'):
+    """
+    Waits until is_deleted() returns True
+
+    The client should have build_interval and build_timeout attributes.
+    """
+    message = ('%s %s failed to be deleted within the required time '
+               '(%s s).' % (resource, resource_id, client.build_timeout))
+    wait_for_status(is_deleted, [True], client.build_timeout,
+                    client.build_interval,
+                    resource='%s %s' % (resource, resource_id),
+                    stats_key=(resource.lower(), 'DELETED'), message=message,
+                    describe=lambda deleted: ('deleted' if deleted else
+                                              'not deleted'))
+
+
+def wait_for_deletions(client, is_deleted, resource_ids,
+                       resource='Resource'):
+    """
+    Waits until is_deleted(resource_id) returns True for all of
+    resource_ids, checking the resources not deleted yet concurrently
+    with client.map_concurrently at each poll
+
+    The client should have build_interval and build_timeout attributes.
+    """
+    pending = list(resource_ids)
+
+    def _get_status():
+        deleted = client.map_concurrently(is_deleted, pending)
+        pending[:] = [resource_id for resource_id, resource_deleted
+                      in zip(pending, deleted) if not resource_deleted]
+        return tuple(pending)
+
+    message = ('%ss %s failed to be deleted within the required time '
+               '(%s s).' % (resource, ', '.join(map(str, resource_ids)),
+                            client.build_timeout))
+    wait_for_status(_get_status, [()], client.build_timeout,
+                    client.build_interval, resource='%ss' % resource,
+                    stats_key=(resource.lower() + 's', 'DELETED'),
+                    message=message,
+                    describe=lambda ids: ('%s not deleted' %
+                                          ', '.join(map(str, ids))
+                                          if ids else 'deleted'))
+
+
 # NOTE(afazekas): This function needs to know a token and a subject.
 def wait_for_server_status(client, server_id, status, ready_wait=True,
                            extra_timeout=0, raise_on_error=True):
     """Waits for a server to reach a given status."""
 
-    def _get_task_state(body):
-        if client.service == CONF.compute.catalog_v3_type:
-            task_state = body.get("os-extended-status:task_state", None)
-        else:
-            task_state = body.get('OS-EXT-STS:task_state', None)
-        return task_state
+    if client.service == CONF.compute.catalog_v3_type:
+        task_state_key = "os-extended-status:task_state"
+    else:
+        task_state_key = 'OS-EXT-STS:task_state'
+    # Whether the last server shown reported its task state
+    reports_task_state = []
 
     # NOTE(afazekas): UNKNOWN status possible on ERROR
     # or in a very early stage.
-    resp, body = client.get_server(server_id)
-    old_status = server_status = body['status']
-    old_task_state = task_state = _get_task_state(body)
-    start_time = int(time.time())
-    timeout = client.build_timeout + extra_timeout
-    while True:
+    def _get_status():
+        resp, body = client.get_server(server_id)
+        reports_task_state[:] = [task_state_key in body]
+        return body['status'], body.get(task_state_key, None)
+
+    def _is_final(state):
+        server_status, task_state = state
         # NOTE(afazekas): Now the BUILD status only reached
         # between the UNKNOWN->ACTIVE transition.
         # TODO(afazekas): enumerate and validate the stable status set
         if status == 'BUILD' and server_status != 'UNKNOWN':
-            return
-        if server_status == status:
-            if ready_wait:
-                if status == 'BUILD':
-                    return
-                # NOTE(afazekas): The instance is in "ready for action state"
-                # when no task in progress
-                # NOTE(afazekas): Converted to string bacuse of the XML
-                # responses
-                if str(task_state) == "None":
-                    # without state api extension 3 sec usually enough
-                    time.sleep(CONF.compute.ready_wait)
-                    return
-            else:
-                return
-
-        time.sleep(client.build_interval)
-        resp, body = client.get_server(server_id)
-        server_status = body['status']
-        task_state = _get_task_state(body)
-        if (server_status != old_status) or (task_state != old_task_state):
-            LOG.info('State transition "%s" ==> "%s" after %d second wait',
-                     '/'.join((old_status, str(old_task_state))),
-                     '/'.join((server_status, str(task_state))),
-                     time.time() - start_time)
-        if (server_status == 'ERROR') and raise_on_error:
+            return True
+        if server_status != status:
+            return False
+        # NOTE(afazekas): The instance is in "ready for action state"
+        # when no task in progress
+        # NOTE(afazekas): Converted to string bacuse of the XML
+        # responses
+        return not ready_wait or str(task_state) == "None"
+
+    def _failed(state):
+        if state[0] == 'ERROR' and raise_on_error:
             raise exceptions.BuildErrorException(server_id=server_id)
 
-        timed_out = int(time.time()) - start_time >= timeout
+    timeout = client.build_timeout + extra_timeout
+    expected_task_state = 'None' if ready_wait else 'n/a'
+    message = ('Server %(server_id)s failed to reach %(status)s '
+               'status and task state "%(expected_task_state)s" '
+               'within the required time (%(timeout)s s).' %
+               {'server_id': server_id,
+                'status': status,
+                'expected_task_state': expected_task_state,
+                'timeout': timeout})
+    server_status, task_state = wait_for_status(
+        _get_status, _is_final, timeout, client.build_interval,
+        resource='Server %s' % server_id, failed=_failed,
+        stats_key=('server', status), message=message,
+        describe=lambda state: '/'.join((state[0], str(state[1]))))
+    if (ready_wait and status != 'BUILD' and server_status == status and
+            not reports_task_state[0]):
+        # without state api extension 3 sec usually enough
+        time.sleep(CONF.compute.ready_wait)
+
+
+def wait_for_server_termination(client, server_id, ignore_error=False):
+    """Waits for a server to be deleted."""
+
+    def _get_status():
+        try:
+            resp, body = client.get_server(server_id)
+        except exceptions.NotFound:
+            return None
+        return body['status']
+
+    def _failed(server_status):
+        if server_status == 'ERROR' and not ignore_error:
+            raise exceptions.BuildErrorException(server_id=server_id)
+
+    wait_for_status(_get_status, [None], client.build_timeout,
+                    client.build_interval, resource='Server %s' % server_id,
+                    failed=_failed, stats_key=('server', 'DELETED'),
+                    message='Server %s failed to be deleted within the '
+                            'required time (%s s).' % (server_id,
+                                                       client.build_timeout),
+                    describe=lambda server_status: server_status or 'DELETED')
+
+
+def wait_for_servers_termination(client, server_ids, ignore_error=False):
+    """
+    Waits for servers to be deleted, listing the servers in detail once
+    per poll instead of getting each of them
+
+    Servers in ERROR status are not waited for unless ignore_error, a
+    BuildErrorException is raised for them once the other servers are
+    deleted.
+    """
+    pending = set(server_ids)
+    errors = []
 
-        if timed_out:
-            expected_task_state = 'None' if ready_wait else 'n/a'
-            message = ('Server %(server_id)s failed to reach %(status)s '
-                       'status and task state "%(expected_task_state)s" '
-                       'within the required time (%(timeout)s s).' %
-                       {'server_id': server_id,
+    def _get_status():
+        resp, body = client.list_servers_with_detail()
+        statuses = dict((server['id'], server['status'])
+                        for server in body['servers'])
+        for server_id in sorted(pending):
+            server_status = statuses.get(server_id)
+            if server_status is None:
+                pending.discard(server_id)
+            elif server_status == 'ERROR' and not ignore_error:
+                pending.discard(server_id)
+                errors.append(server_id)
+        return tuple(sorted(pending))
+
+    message = ('Servers %s failed to be deleted within the required time '
+               '(%s s).' % (', '.join(sorted(server_ids)),
+                            client.build_timeout))
+    wait_for_status(_get_status, [()], client.build_timeout,
+                    client.build_interval, resource='Servers',
+                    stats_key=('servers', 'DELETED'), message=message,
+                    describe=lambda ids: ('%s not deleted' % ', '.join(ids)
+                                          if ids else 'deleted'))
+    if errors:
+        raise exceptions.BuildErrorException(server_id=errors[0])
+
+
+def wait_for_servers(list_servers, server_ids, status, timeout, max_interval,
+                     ready_wait=True, raise_on_error=True,
+                     task_state_key='OS-EXT-STS:task_state'):
+    """
+    Waits for many servers to reach a given status, listing them all at
+    each poll instead of getting each of them
+
+    :param list_servers: callable returning the servers as dicts with
+                         their details, e.g. listed by name
+    :param server_ids: ids of the servers to wait for, the servers which
+                       are not listed yet are waited for as well
+    """
+    pending = set(server_ids)
+    states = {}
+    sleep_ready_wait = False
+    interval = AdaptiveInterval(max_interval,
+                                WAIT_STATS.expected('servers', status))
+    while True:
+        for server in list_servers():
+            server_id = server['id']
+            if server_id not in pending:
+                continue
+            server_status = server['status']
+            task_state = server.get(task_state_key, None)
+            old_state = states.get(server_id)
+            states[server_id] = (server_status, task_state)
+            if old_state is not None and old_state != states[server_id]:
+                LOG.info('Server %s state transition "%s" ==> "%s" after %d '
+                         'second wait', server_id,
+                         '/'.join((old_state[0], str(old_state[1]))),
+                         '/'.join((server_status, str(task_state))),
+                         interval.elapsed())
+            if server_status == 'ERROR' and raise_on_error:
+                raise exceptions.BuildErrorException(server_id=server_id)
+            if server_status != status:
+                continue
+            # NOTE(afazekas): Converted to string bacuse of the XML
+            # responses
+            if not ready_wait or status == 'BUILD':
+                pending.discard(server_id)
+            elif str(task_state) == "None":
+                pending.discard(server_id)
+                if task_state_key not in server:
+                    sleep_ready_wait = True
+        if not pending:
+            WAIT_STATS.record('servers', status, interval.elapsed(),
+                              interval.polls)
+            if sleep_ready_wait:
+                # without state api extension 3 sec usually enough
+                time.sleep(CONF.compute.ready_wait)
+            return
+
+        if interval.elapsed() >= timeout:
+            message = ('Servers %(server_ids)s failed to reach %(status)s '
+                       'status within the required time (%(timeout)s s).' %
+                       {'server_ids': ', '.join(sorted(pending)),
                         'status': status,
-                        'expected_task_state': expected_task_state,
                         'timeout': timeout})
-            message += ' Current status: %s.' % server_status
-            message += ' Current task state: %s.' % task_state
+            message += ' Current states: %s.' % ', '.join(
+                '%s: %s' % (server_id, '/'.join(map(str, states[server_id])))
+                for server_id in sorted(pending) if server_id in states)
             raise exceptions.TimeoutException(message)
-        old_status = server_status
-        old_task_state = task_state
+        interval.sleep()
+
+
+def wait_for_servers_status(client, server_ids, status, params=None,
+                            ready_wait=True, extra_timeout=0,
+                            raise_on_error=True):
+    """
+    Waits for many servers to reach a given status, with one
+    list_servers_with_detail(params) call per poll
+    """
+    if client.service == CONF.compute.catalog_v3_type:
+        task_state_key = "os-extended-status:task_state"
+    else:
+        task_state_key = 'OS-EXT-STS:task_state'
+
+    def _list_servers():
+        resp, body = client.list_servers_with_detail(params)
+        return body['servers']
+
+    return wait_for_servers(_list_servers, server_ids, status,
+                            client.build_timeout + extra_timeout,
+                            client.build_interval, ready_wait=ready_wait,
+                            raise_on_error=raise_on_error,
+                            task_state_key=task_state_key)
 
 
 def wait_for_image_status(client, image_id, status):
@@ -97,26 +468,20 @@ def wait_for_image_status(client, image_id, status):
     The client should have a get_image(image_id) method to get the image.
     The client should also have build_interval and build_timeout attributes.
     """
-    resp, image = client.get_image(image_id)
-    start = int(time.time())
-
-    while image['status'] != status:
-        time.sleep(client.build_interval)
+    def _get_status():
         resp, image = client.get_image(image_id)
-        if image['status'] == 'ERROR':
-            raise exceptions.AddImageException(image_id=image_id)
+        return image['status']
 
-        # check the status again to avoid a false negative where we hit
-        # the timeout at the same time that the image reached the expected
-        # status
-        if image['status'] == status:
-            return
+    def _failed(image_status):
+        if image_status == 'ERROR':
+            raise exceptions.AddImageException(image_id=image_id)
 
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Image %(image_id)s failed to reach %(status)s '
-                       'status within the required time (%(timeout)s s).' %
-                       {'image_id': image_id,
-                        'status': status,
-                        'timeout': client.build_timeout})
-            message += ' Current status: %s.' % image['status']
-            raise exceptions.TimeoutException(message)
+    message = ('Image %(image_id)s failed to reach %(status)s '
+               'status within the required time (%(timeout)s s).' %
+               {'image_id': image_id,
+                'status': status,
+                'timeout': client.build_timeout})
+    wait_for_status(_get_status, [status], client.build_timeout,
+                    client.build_interval, resource='Image %s' % image_id,
+                    failed=_failed, stats_key=('image', status),
+                    message=message)
@@ -59,6 +59,16 @@ IdentityGroup = [
                choices=['public', 'admin', 'internal',
                         'publicURL', 'adminURL', 'internalURL'],
                help="The endpoint type to use for the identity service."),
+    cfg.BoolOpt('shared_token_cache',
+                default=True,
+                help="Share tokens between all the clients of a test "
+                     "process which use the same credentials, instead of "
+                     "authenticating once per client manager."),
+    cfg.StrOpt('token_cache_dir',
+               default=None,
+               help="Directory in which tokens are cached to share them "
+                    "between test processes as well. If not set, tokens "
+                    "are only shared within a process."),
     cfg.StrOpt('username',
                default=None,
                help="Username to use for Nova API requests."),
@@ -124,6 +134,18 @@ ComputeGroup = [
                      "users. This option enables isolated test cases and "
                      "better parallel execution, but also requires that "
                      "OpenStack Identity API admin credentials are known."),
+    cfg.StrOpt('credential_pool_file',
+               default=None,
+               help="Path to a JSON file of pre-provisioned accounts, as "
+                    "written by tools/credential_pool.py. When set, isolated "
+                    "test cases lease accounts from it, with their network, "
+                    "subnet and router, instead of creating and deleting "
+                    "tenants, users and network resources for every test "
+                    "class."),
+    cfg.IntOpt('credential_pool_timeout',
+               default=300,
+               help="Time in seconds to wait for a free account of the "
+                    "credential pool."),
     cfg.StrOpt('image_ref',
                default="{$IMAGE_ID}",
                help="Valid primary image reference to be used in tests."),
@@ -705,6 +727,21 @@ StressGroup = [
     cfg.IntOpt('default_thread_number_per_action',
                default=4,
                help='The number of threads created while stress test.'),
+    cfg.IntOpt('report_interval',
+               default=60,
+               help='Time (in seconds) between reports of the throughput '
+                    'of each action during a stress test.'),
+    cfg.IntOpt('sample_interval',
+               default=10,
+               help='Time (in seconds) between the samples of the '
+                    'statistics of each action written to the time series '
+                    'file of a stress test.'),
+    cfg.StrOpt('agent_secret',
+               default=None,
+               secret=True,
+               help='Secret shared by stress agents and the coordinators '
+                    'allowed to run tests on them. Required by agents '
+                    'listening on other interfaces than the loopback one.'),
     cfg.BoolOpt('leave_dirty_stack',
                 default=False,
                 help='Prevent the cleaning (tearDownClass()) between'
@@ -712,9 +749,8 @@ StressGroup = [
                      ' during this run.'),
     cfg.BoolOpt('full_clean_stack',
                 default=False,
-                help='Allows a full cleaning process after a stress test.'
-                     ' Caution : this cleanup will remove every objects of'
-                     ' every tenant.')
+                help='Allows a full cleaning process after a stress test,'
+                     ' of the resources tagged with the id of the run.')
 ]
 
 
@@ -816,7 +852,13 @@ Expected values for this field are:
 
 If nothing is specified, this feature is not enabled. To trace everything
 specify .* as the regex.
-""")
+"""),
+    cfg.BoolOpt('find_caller',
+                default=True,
+                help="Report the test class and method issuing each REST "
+                     "request in the request logs. Disabling it saves some "
+                     "CPU time on large runs, but trace_requests then has "
+                     "no effect."),
 ]
 
 input_scenario_group = cfg.OptGroup(name="input-scenario",
@@ -900,6 +942,78 @@ NegativeGroup = [
                help="Test generator class for all negative tests"),
 ]
 
+service_clients_group = cfg.OptGroup(name='service-clients',
+                                     title="Service Clients Options")
+
+ServiceClientsGroup = [
+    cfg.BoolOpt('connection_pooling',
+                default=True,
+                help="Keep HTTP connections to the API endpoints alive and "
+                     "reuse them across requests. Set to False to open a "
+                     "new connection for every request, which can help "
+                     "when debugging connection issues."),
+    cfg.IntOpt('connection_pool_size',
+               default=10,
+               help="Maximum number of idle connections kept per API "
+                    "endpoint by each test process."),
+    cfg.IntOpt('connection_idle_timeout',
+               default=60,
+               help="Time in seconds after which an idle pooled connection "
+                    "is closed."),
+    cfg.IntOpt('max_concurrent_requests',
+               default=8,
+               help="Maximum number of requests a client issues at the "
+                    "same time when fanning out independent requests, "
+                    "e.g. to delete many resources."),
+    cfg.StrOpt('retry_policy',
+               default='tempest.common.rest_client.RetryPolicy',
+               help="Class deciding which failed requests are retried and "
+                    "when."),
+    cfg.IntOpt('max_retries',
+               default=2,
+               help="Maximum number of times a request is retried."),
+    cfg.ListOpt('retry_statuses',
+                default=['429', '503'],
+                help="HTTP status codes of the responses to retry, besides "
+                     "413 rate limit responses. Only 429 responses are "
+                     "retried for requests which are not idempotent."),
+    cfg.FloatOpt('retry_backoff',
+                 default=1.0,
+                 help="Delay in seconds before the first retry of a request "
+                      "when the response does not specify one. It doubles "
+                      "with every retry, with some random jitter."),
+    cfg.FloatOpt('retry_backoff_max',
+                 default=60.0,
+                 help="Maximum delay in seconds between two retries."),
+    cfg.FloatOpt('retry_budget',
+                 default=0.2,
+                 help="Maximum number of retries per request issued by a "
+                      "test process, on average, so that retries do not "
+                      "add up when the cloud is overloaded."),
+    cfg.FloatOpt('poll_initial_interval',
+                 default=0.2,
+                 help="Interval in seconds between the first polls of a "
+                      "resource waited for, e.g. a server being built. "
+                      "The interval then grows exponentially up to the "
+                      "build_interval of the service."),
+    cfg.FloatOpt('poll_backoff_factor',
+                 default=1.5,
+                 help="Factor by which the interval between two polls of "
+                      "a resource waited for grows."),
+    cfg.FloatOpt('poll_jitter',
+                 default=0.2,
+                 help="Fraction of each interval between two polls which "
+                      "is randomly cut, so that test processes do not "
+                      "poll in lockstep."),
+    cfg.StrOpt('request_metrics_dir',
+               default=None,
+               help="Directory in which each test process writes the "
+                    "latency and response size statistics of its REST "
+                    "requests, as JSON and CSV, and the durations of its "
+                    "waits for resources, as JSON, when it exits. "
+                    "Statistics are not written if not set."),
+]
+
 
 def register_opts():
     register_opt_group(cfg.CONF, compute_group, ComputeGroup)
@@ -937,6 +1051,7 @@ def register_opts():
     register_opt_group(cfg.CONF, input_scenario_group, InputScenarioGroup)
     register_opt_group(cfg.CONF, cli_group, CLIGroup)
     register_opt_group(cfg.CONF, negative_group, NegativeGroup)
+    register_opt_group(cfg.CONF, service_clients_group, ServiceClientsGroup)
 
 
 # this should never be called outside of this class
@@ -979,6 +1094,7 @@ class TempestConfigPrivate(object):
         self.input_scenario = cfg.CONF['input-scenario']
         self.cli = cfg.CONF.cli
         self.negative = cfg.CONF.negative
+        self.service_clients = cfg.CONF['service-clients']
         if not self.compute_admin.username:
             self.compute_admin.username = self.identity.admin_username
             self.compute_admin.password = self.identity.admin_password
@@ -183,6 +183,10 @@ class TearDownException(TempestException):
     message = "%(num)d cleanUp operation failed"
 
 
+class StressAgentError(TempestException):
+    message = "Stress agent %(agent)s failed: %(error)s"
+
+
 class ResponseWithNonEmptyBody(RFCViolation):
     message = ("RFC Violation! Response with %(status)d HTTP Status Code "
                "MUST NOT have a body")
@@ -16,10 +16,75 @@
 from tempest import auth
 from tempest import config
 from tempest import exceptions
+from tempest.openstack.common import importutils
 
 CONF = config.CONF
 
 
+def auth_provider_client(manager, client_class):
+    return client_class(manager.auth_provider)
+
+
+class ServiceClient(object):
+    """
+    Manager attribute which builds its service client on first access
+
+    The client class is picked according to the interface of the manager,
+    and its module is only imported then, so that importing the managers
+    does not pull in every service client. Accessing the attribute raises
+    AttributeError when the manager's interface has no such client, or when
+    the service it depends on is not available, just as if it had never
+    been set.
+
+    :param module: module of the client classes, relative to package, in
+                   which %s is replaced by the interface
+    :param json: name of the client class for the json interface
+    :param xml: name of the client class for the xml interface
+    :param service: [service_available] option the client depends on
+    :param factory: callable building the client from the manager and the
+                    client class, by default with the auth provider
+    :param package: package containing module
+    """
+
+    def __init__(self, module, json=None, xml=None, service=None,
+                 factory=auth_provider_client, package='tempest.services'):
+        self.module = module
+        self.class_names = dict(json=json, xml=xml)
+        self.service = service
+        self.factory = factory
+        self.package = package
+        self._client_classes = {}
+
+    def get_client_class(self, interface):
+        """Imports and returns the client class for the interface."""
+        client_class = self._client_classes.get(interface)
+        if client_class is None:
+            module = self.module
+            if '%s' in module:
+                module = module % interface
+            client_class = importutils.import_class('%s.%s.%s' % (
+                self.package, module, self.class_names[interface]))
+            self._client_classes[interface] = client_class
+        return client_class
+
+    def __get__(self, manager, owner):
+        if manager is None:
+            return self
+        client = manager._clients.get(self)
+        if client is None:
+            if (self.class_names.get(manager.interface) is None or
+                    self.service and not getattr(CONF.service_available,
+                                                 self.service)):
+                raise AttributeError(
+                    "No such service client for interface %s" %
+                    manager.interface)
+            client_class = self.get_client_class(manager.interface)
+            # Concurrent first accesses all get the client stored first
+            client = manager._clients.setdefault(
+                self, self.factory(manager, client_class))
+        return client
+
+
 class Manager(object):
 
     """
@@ -49,6 +114,8 @@ class Manager(object):
             self.credentials['domain_name'] = 'Default'
         # Creates an auth provider for the credentials
         self.auth_provider = self.get_auth_provider(self.credentials)
+        # Clients built by the ServiceClient attributes
+        self._clients = {}
         # FIXME(andreaf) unused
         self.client_attr_names = []
 
@@ -29,6 +29,7 @@ from tempest import clients
 from tempest.common import isolated_creds
 from tempest.common.utils import data_utils
 from tempest.common.utils.linux import remote_client
+from tempest.common import waiters
 from tempest import config
 from tempest import exceptions
 from tempest.openstack.common import log
@@ -184,6 +185,26 @@ class OfficialClientTest(tempest.test.BaseTestCase):
                              error_status=error_status,
                              not_found_exception=not_found_exception)
 
+    def servers_status_timeout(self, servers, expected_status,
+                               search_opts=None):
+        """
+        Given servers and an expected status, wait for all of them to
+        show the status, listing the servers matching search_opts once
+        per poll. If any server goes to ERROR, fail out.
+        """
+        client = self.compute_client.servers
+
+        def list_servers():
+            return [server.to_dict()
+                    for server in client.list(search_opts=search_opts)]
+
+        waiters.wait_for_servers(list_servers,
+                                 [server.id for server in servers],
+                                 expected_status,
+                                 CONF.compute.build_timeout,
+                                 CONF.compute.build_interval,
+                                 ready_wait=False)
+
     def delete_timeout(self, things, thing_id,
                        error_status='ERROR',
                        not_found_exception=nova_exceptions.NotFound):
@@ -211,41 +232,45 @@ class OfficialClientTest(tempest.test.BaseTestCase):
         if allow_notfound:
             log_status += ' or NotFound' if log_status != '' else 'NotFound'
 
-        def check_status():
+        def get_status():
             # python-novaclient has resources available to its client
             # that all implement a get() method taking an identifier
             # for the singular resource to retrieve.
             try:
-                thing = things.get(thing_id)
+                return things.get(thing_id).status
             except not_found_exception:
                 if allow_notfound:
-                    return True
-                else:
-                    raise
+                    return None
+                raise
 
-            new_status = thing.status
+        def is_final(new_status):
+            if new_status is None:
+                return True
+            return (new_status == expected_status and
+                    expected_status is not None)
 
+        def check_error(new_status):
             # Some components are reporting error status in lower case
             # so case sensitive comparisons can really mess things
             # up.
             if new_status.lower() == error_status.lower():
                 message = ("%s failed to get to expected status (%s). "
-                           "In %s state.") % (thing, expected_status,
+                           "In %s state.") % (thing_id, expected_status,
                                               new_status)
                 raise exceptions.BuildErrorException(message,
                                                      server_id=thing_id)
-            elif new_status == expected_status and expected_status is not None:
-                return True  # All good.
             LOG.debug("Waiting for %s to get to %s status. "
                       "Currently in %s status",
-                      thing, log_status, new_status)
-        if not tempest.test.call_until_true(
-            check_status,
-            CONF.compute.build_timeout,
-            CONF.compute.build_interval):
-            message = ("Timed out waiting for thing %s "
-                       "to become %s") % (thing_id, log_status)
-            raise exceptions.TimeoutException(message)
+                      thing_id, log_status, new_status)
+
+        message = ("Timed out waiting for thing %s "
+                   "to become %s.") % (thing_id, log_status)
+        waiters.wait_for_status(get_status, is_final,
+                                CONF.compute.build_timeout,
+                                CONF.compute.build_interval,
+                                resource=str(thing_id), failed=check_error,
+                                message=message,
+                                describe=lambda status: status or 'NotFound')
 
     def _create_loginable_secgroup_rule_nova(self, client=None,
                                              secgroup_id=None):
@@ -42,10 +42,9 @@ class TestLargeOpsScenario(manager.NetworkScenarioTest):
         cls.set_network_resources()
         super(TestLargeOpsScenario, cls).setUpClass()
 
-    def _wait_for_server_status(self, status):
-        for server in self.servers:
-            self.status_timeout(
-                self.compute_client.servers, server.id, status)
+    def _wait_for_server_status(self, status, name):
+        self.servers_status_timeout(self.servers, status,
+                                    search_opts={'name': name})
 
     def nova_boot(self):
         name = data_utils.rand_name('scenario-server-')
@@ -61,7 +60,7 @@ class TestLargeOpsScenario(manager.NetworkScenarioTest):
         self.servers = [x for x in client.servers.list() if name in x.name]
         for server in self.servers:
             self.set_resource(server.name, server)
-        self._wait_for_server_status('ACTIVE')
+        self._wait_for_server_status('ACTIVE', name)
 
     @test.services('compute', 'image')
     def test_large_ops_scenario(self):
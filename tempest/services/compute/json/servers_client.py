@@ -15,7 +15,6 @@
 #    under the License.
 
 import json
-import time
 import urllib
 
 from tempest.api_schema.compute import servers as common_schema
@@ -23,7 +22,6 @@ from tempest.api_schema.compute.v2 import servers as schema
 from tempest.common import rest_client
 from tempest.common import waiters
 from tempest import config
-from tempest import exceptions
 
 CONF = config.CONF
 
@@ -167,23 +165,26 @@ class ServersClientJSON(rest_client.RestClient):
                                               extra_timeout=extra_timeout,
                                               raise_on_error=raise_on_error)
 
+    def wait_for_servers_status(self, server_ids, status, params=None,
+                                extra_timeout=0, raise_on_error=True):
+        """
+        Waits for many servers to reach a given status, listing the
+        servers matching params in detail at each poll.
+        """
+        return waiters.wait_for_servers_status(self, server_ids, status,
+                                               params=params,
+                                               extra_timeout=extra_timeout,
+                                               raise_on_error=raise_on_error)
+
     def wait_for_server_termination(self, server_id, ignore_error=False):
         """Waits for server to reach termination."""
-        start_time = int(time.time())
-        while True:
-            try:
-                resp, body = self.get_server(server_id)
-            except exceptions.NotFound:
-                return
-
-            server_status = body['status']
-            if server_status == 'ERROR' and not ignore_error:
-                raise exceptions.BuildErrorException(server_id=server_id)
-
-            if int(time.time()) - start_time >= self.build_timeout:
-                raise exceptions.TimeoutException
+        return waiters.wait_for_server_termination(self, server_id,
+                                                   ignore_error=ignore_error)
 
-            time.sleep(self.build_interval)
+    def wait_for_servers_termination(self, server_ids, ignore_error=False):
+        """Waits for many servers to be deleted, listing them at each poll."""
+        return waiters.wait_for_servers_termination(
+            self, server_ids, ignore_error=ignore_error)
 
     def list_addresses(self, server_id):
         """Lists all addresses for a server."""
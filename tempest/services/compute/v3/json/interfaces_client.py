@@ -13,12 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 import json
-import time
 
 from tempest.common import rest_client
+from tempest.common import waiters
 from tempest import config
-from tempest import exceptions
 
 CONF = config.CONF
 
@@ -63,24 +63,9 @@ class InterfacesV3ClientJSON(rest_client.RestClient):
 
     def wait_for_interface_status(self, server, port_id, status):
         """Waits for a interface to reach a given status."""
-        resp, body = self.show_interface(server, port_id)
-        interface_status = body['port_state']
-        start = int(time.time())
-
-        while(interface_status != status):
-            time.sleep(self.build_interval)
-            resp, body = self.show_interface(server, port_id)
-            interface_status = body['port_state']
-
-            timed_out = int(time.time()) - start >= self.build_timeout
-
-            if interface_status != status and timed_out:
-                message = ('Interface %s failed to reach %s status within '
-                           'the required time (%s s).' %
-                           (port_id, status, self.build_timeout))
-                raise exceptions.TimeoutException(message)
-
-        return resp, body
+        return waiters.wait_for_resource_status(
+            self, functools.partial(self.show_interface, server), port_id,
+            status, resource='Interface', status_key='port_state')
 
     def add_fixed_ip(self, server_id, network_id):
         """Add a fixed IP to input server instance."""
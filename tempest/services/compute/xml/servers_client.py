@@ -14,7 +14,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import time
 import urllib
 
 from lxml import etree
@@ -23,7 +22,6 @@ from tempest.common import rest_client
 from tempest.common import waiters
 from tempest.common import xml_utils
 from tempest import config
-from tempest import exceptions
 from tempest.openstack.common import log as logging
 
 CONF = config.CONF
@@ -387,23 +385,26 @@ class ServersClientXML(rest_client.RestClient):
                                               extra_timeout=extra_timeout,
                                               raise_on_error=raise_on_error)
 
+    def wait_for_servers_status(self, server_ids, status, params=None,
+                                extra_timeout=0, raise_on_error=True):
+        """
+        Waits for many servers to reach a given status, listing the
+        servers matching params in detail at each poll.
+        """
+        return waiters.wait_for_servers_status(self, server_ids, status,
+                                               params=params,
+                                               extra_timeout=extra_timeout,
+                                               raise_on_error=raise_on_error)
+
     def wait_for_server_termination(self, server_id, ignore_error=False):
         """Waits for server to reach termination."""
-        start_time = int(time.time())
-        while True:
-            try:
-                resp, body = self.get_server(server_id)
-            except exceptions.NotFound:
-                return
-
-            server_status = body['status']
-            if server_status == 'ERROR' and not ignore_error:
-                raise exceptions.BuildErrorException(server_id=server_id)
-
-            if int(time.time()) - start_time >= self.build_timeout:
-                raise exceptions.TimeoutException
+        return waiters.wait_for_server_termination(self, server_id,
+                                                   ignore_error=ignore_error)
 
-            time.sleep(self.build_interval)
+    def wait_for_servers_termination(self, server_ids, ignore_error=False):
+        """Waits for many servers to be deleted, listing them at each poll."""
+        return waiters.wait_for_servers_termination(
+            self, server_ids, ignore_error=ignore_error)
 
     def _parse_network(self, node):
         addrs = []
@@ -55,7 +55,7 @@ class EndPointClientXML(rest_client.RestClient):
             except (ValueError, TypeError):
                 headers = self.get_headers()
         dscv = CONF.identity.disable_ssl_certificate_validation
-        self.http_obj = http.ClosingHttp(
+        self.http_obj = http.get_http(
             disable_ssl_certificate_validation=dscv)
         return super(EndPointClientXML, self).request(method, url,
                                                       extra_headers,
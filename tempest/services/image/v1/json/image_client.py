@@ -17,11 +17,11 @@ import copy
 import errno
 import json
 import os
-import time
 import urllib
 
 from tempest.common import glance_http
 from tempest.common import rest_client
+from tempest.common import waiters
 from tempest import config
 from tempest import exceptions
 from tempest.openstack.common import log as logging
@@ -269,30 +269,15 @@ class ImageClientJSON(rest_client.RestClient):
         status = meta['status']
         return status
 
-    # NOTE(afazkas): Wait reinvented again. It is not in the correct layer
     def wait_for_image_status(self, image_id, status):
         """Waits for a Image to reach a given status."""
-        start_time = time.time()
-        old_value = value = self._get_image_status(image_id)
-        while True:
-            dtime = time.time() - start_time
-            time.sleep(self.build_interval)
-            if value != old_value:
-                LOG.info('Value transition from "%s" to "%s"'
-                         'in %d second(s).', old_value,
-                         value, dtime)
-            if value == status:
-                return value
-
+        def _failed(value):
             if value == 'killed':
                 raise exceptions.ImageKilledException(image_id=image_id,
                                                       status=status)
-            if dtime > self.build_timeout:
-                message = ('Time Limit Exceeded! (%ds)'
-                           'while waiting for %s, '
-                           'but we got %s.' %
-                           (self.build_timeout, status, value))
-                raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
-            old_value = value
-            value = self._get_image_status(image_id)
+
+        return waiters.wait_for_status(
+            lambda: self._get_image_status(image_id), [status],
+            self.build_timeout, self.build_interval,
+            resource='Image %s' % image_id, failed=_failed,
+            stats_key=('image', status))
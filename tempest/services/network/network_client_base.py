@@ -10,9 +10,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import time
+import functools
 import urllib
 
+from tempest.common import waiters
 from tempest import config
 from tempest import exceptions
 
@@ -77,6 +78,10 @@ class NetworkClientBase(object):
     def delete(self, uri, headers=None):
         return self.rest_client.delete(uri, headers)
 
+    def map_concurrently(self, func, items, return_exceptions=False):
+        return self.rest_client.map_concurrently(
+            func, items, return_exceptions=return_exceptions)
+
     def deserialize_list(self, body):
         raise NotImplementedError
 
@@ -101,12 +106,30 @@ class NetworkClientBase(object):
         return resource_plural_map.get(resource_name, resource_name + 's')
 
     def _lister(self, plural_name):
-        def _list(**filters):
+        def _list(page_size=None, **filters):
+            # The filters are matched by the server, a list value matches
+            # any of its items, e.g. device_owner=['network:dhcp', ...].
+            # With a page_size, the resources are fetched page_size at a
+            # time, following the id of the last one as marker.
             uri = self.get_uri(plural_name)
-            if filters:
-                uri += '?' + urllib.urlencode(filters)
-            resp, body = self.get(uri)
-            result = {plural_name: self.deserialize_list(body)}
+            if page_size:
+                filters['limit'] = page_size
+            resources = []
+            seen = set()
+            while True:
+                query = urllib.urlencode(filters, doseq=True)
+                resp, body = self.get(uri + '?' + query if query else uri)
+                page = self.deserialize_list(body)
+                new = [resource for resource in page
+                       if resource['id'] not in seen] if seen else page
+                resources.extend(new)
+                # Neutron ignores the marker if pagination is disabled,
+                # and returns the first page again
+                if not page_size or len(page) < page_size or not new:
+                    break
+                seen.update(resource['id'] for resource in new)
+                filters['marker'] = page[-1]['id']
+            result = {plural_name: resources}
             return resp, result
 
         return _list
@@ -199,13 +222,15 @@ class NetworkClientBase(object):
 
     def wait_for_resource_deletion(self, resource_type, id):
         """Waits for a resource to be deleted."""
-        start_time = int(time.time())
-        while True:
-            if self.is_resource_deleted(resource_type, id):
-                return
-            if int(time.time()) - start_time >= self.build_timeout:
-                raise exceptions.TimeoutException
-            time.sleep(self.build_interval)
+        waiters.wait_for_deletion(
+            self, lambda: self.is_resource_deleted(resource_type, id), id,
+            resource=resource_type)
+
+    def wait_for_resources_deletion(self, resource_type, ids):
+        """Waits for many resources to be deleted, checked concurrently."""
+        waiters.wait_for_deletions(
+            self, functools.partial(self.is_resource_deleted, resource_type),
+            ids, resource=resource_type)
 
     def is_resource_deleted(self, resource_type, id):
         method = 'show_' + resource_type
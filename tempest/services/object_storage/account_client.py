@@ -165,7 +165,7 @@ class AccountClientCustomizedHeader(rest_client.RestClient):
     def request(self, method, url, extra_headers=False, headers=None,
                 body=None):
         """A simple HTTP request interface."""
-        self.http_obj = http.ClosingHttp()
+        self.http_obj = http.get_http()
         if headers is None:
             headers = {}
         elif extra_headers:
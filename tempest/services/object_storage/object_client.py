@@ -154,7 +154,7 @@ class ObjectClientCustomizedHeader(rest_client.RestClient):
                 body=None):
         """A simple HTTP request interface."""
         dscv = CONF.identity.disable_ssl_certificate_validation
-        self.http_obj = http.ClosingHttp(
+        self.http_obj = http.get_http(
             disable_ssl_certificate_validation=dscv)
         if headers is None:
             headers = {}
@@ -15,10 +15,10 @@
 
 import json
 import re
-import time
 import urllib
 
 from tempest.common import rest_client
+from tempest.common import waiters
 from tempest import config
 from tempest import exceptions
 
@@ -137,60 +137,54 @@ class OrchestrationClient(rest_client.RestClient):
     def wait_for_resource_status(self, stack_identifier, resource_name,
                                  status, failure_pattern='^.*_FAILED$'):
         """Waits for a Resource to reach a given status."""
-        start = int(time.time())
         fail_regexp = re.compile(failure_pattern)
+        last = {}
 
-        while True:
+        def _get_status():
             try:
                 resp, body = self.get_resource(
                     stack_identifier, resource_name)
             except exceptions.NotFound:
                 # ignore this, as the resource may not have
                 # been created yet
-                pass
-            else:
-                resource_name = body['resource_name']
-                resource_status = body['resource_status']
-                if resource_status == status:
-                    return
-                if fail_regexp.search(resource_status):
-                    raise exceptions.StackResourceBuildErrorException(
-                        resource_name=resource_name,
-                        stack_identifier=stack_identifier,
-                        resource_status=resource_status,
-                        resource_status_reason=body['resource_status_reason'])
-
-            if int(time.time()) - start >= self.build_timeout:
-                message = ('Resource %s failed to reach %s status within '
-                           'the required time (%s s).' %
-                           (resource_name, status, self.build_timeout))
-                raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+                return None
+            last.update(body)
+            return body['resource_status']
+
+        def _failed(resource_status):
+            if resource_status and fail_regexp.search(resource_status):
+                raise exceptions.StackResourceBuildErrorException(
+                    resource_name=last['resource_name'],
+                    stack_identifier=stack_identifier,
+                    resource_status=resource_status,
+                    resource_status_reason=last['resource_status_reason'])
+
+        message = ('Resource %s failed to reach %s status within '
+                   'the required time (%s s).' %
+                   (resource_name, status, self.build_timeout))
+        waiters.wait_for_status(_get_status, [status], self.build_timeout,
+                                self.build_interval,
+                                resource='Resource %s' % resource_name,
+                                failed=_failed,
+                                stats_key=('stack resource', status),
+                                message=message)
 
     def wait_for_stack_status(self, stack_identifier, status,
                               failure_pattern='^.*_FAILED$'):
         """Waits for a Stack to reach a given status."""
-        start = int(time.time())
         fail_regexp = re.compile(failure_pattern)
 
-        while True:
-            resp, body = self.get_stack(stack_identifier)
-            stack_name = body['stack_name']
-            stack_status = body['stack_status']
-            if stack_status == status:
-                return body
-            if fail_regexp.search(stack_status):
+        def _failed(stack):
+            if fail_regexp.search(stack['stack_status']):
                 raise exceptions.StackBuildErrorException(
                     stack_identifier=stack_identifier,
-                    stack_status=stack_status,
-                    stack_status_reason=body['stack_status_reason'])
-
-            if int(time.time()) - start >= self.build_timeout:
-                message = ('Stack %s failed to reach %s status within '
-                           'the required time (%s s).' %
-                           (stack_name, status, self.build_timeout))
-                raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+                    stack_status=stack['stack_status'],
+                    stack_status_reason=stack['stack_status_reason'])
+
+        resp, body = waiters.wait_for_resource_status(
+            self, self.get_stack, stack_identifier, status, resource='Stack',
+            failed=_failed, status_key='stack_status')
+        return body
 
     def show_resource_metadata(self, stack_identifier, resource_name):
         """Returns the resource's metadata."""
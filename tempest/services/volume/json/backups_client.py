@@ -14,9 +14,9 @@
 #    under the License.
 
 import json
-import time
 
 from tempest.common import rest_client
+from tempest.common import waiters
 from tempest import config
 from tempest import exceptions
 
@@ -78,19 +78,10 @@ class BackupsClientJSON(rest_client.RestClient):
 
     def wait_for_backup_status(self, backup_id, status):
         """Waits for a Backup to reach a given status."""
-        resp, body = self.get_backup(backup_id)
-        backup_status = body['status']
-        start = int(time.time())
-
-        while backup_status != status:
-            time.sleep(self.build_interval)
-            resp, body = self.get_backup(backup_id)
-            backup_status = body['status']
-            if backup_status == 'error':
+        def _failed(backup):
+            if backup['status'] == 'error':
                 raise exceptions.VolumeBackupException(backup_id=backup_id)
 
-            if int(time.time()) - start >= self.build_timeout:
-                message = ('Volume backup %s failed to reach %s status within '
-                           'the required time (%s s).' %
-                           (backup_id, status, self.build_timeout))
-                raise exceptions.TimeoutException(message)
+        waiters.wait_for_resource_status(self, self.get_backup, backup_id,
+                                         status, resource='Volume backup',
+                                         failed=_failed)
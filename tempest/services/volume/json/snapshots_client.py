@@ -11,10 +11,10 @@
 #    under the License.
 
 import json
-import time
 import urllib
 
 from tempest.common import rest_client
+from tempest.common import waiters
 from tempest import config
 from tempest import exceptions
 from tempest.openstack.common import log as logging
@@ -95,30 +95,13 @@ class SnapshotsClientJSON(rest_client.RestClient):
 
         return status
 
-    # NOTE(afazkas): Wait reinvented again. It is not in the correct layer
     def wait_for_snapshot_status(self, snapshot_id, status):
         """Waits for a Snapshot to reach a given status."""
-        start_time = time.time()
-        old_value = value = self._get_snapshot_status(snapshot_id)
-        while True:
-            dtime = time.time() - start_time
-            time.sleep(self.build_interval)
-            if value != old_value:
-                LOG.info('Value transition from "%s" to "%s"'
-                         'in %d second(s).', old_value,
-                         value, dtime)
-            if (value == status):
-                return value
-
-            if dtime > self.build_timeout:
-                message = ('Time Limit Exceeded! (%ds)'
-                           'while waiting for %s, '
-                           'but we got %s.' %
-                           (self.build_timeout, status, value))
-                raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
-            old_value = value
-            value = self._get_snapshot_status(snapshot_id)
+        return waiters.wait_for_status(
+            lambda: self._get_snapshot_status(snapshot_id), [status],
+            self.build_timeout, self.build_interval,
+            resource='Snapshot %s' % snapshot_id,
+            stats_key=('snapshot', status))
 
     def delete_snapshot(self, snapshot_id):
         """Delete Snapshot."""
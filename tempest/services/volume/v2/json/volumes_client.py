@@ -14,10 +14,10 @@
 #    under the License.
 
 import json
-import time
 import urllib
 
 from tempest.common import rest_client
+from tempest.common import waiters
 from tempest import config
 from tempest import exceptions
 
@@ -150,23 +150,13 @@ class VolumesV2ClientJSON(rest_client.RestClient):
 
     def wait_for_volume_status(self, volume_id, status):
         """Waits for a Volume to reach a given status."""
-        resp, body = self.get_volume(volume_id)
-        volume_name = body['name']
-        volume_status = body['status']
-        start = int(time.time())
-
-        while volume_status != status:
-            time.sleep(self.build_interval)
-            resp, body = self.get_volume(volume_id)
-            volume_status = body['status']
-            if volume_status == 'error':
+        def _failed(volume):
+            if volume['status'] == 'error':
                 raise exceptions.VolumeBuildErrorException(volume_id=volume_id)
 
-            if int(time.time()) - start >= self.build_timeout:
-                message = ('Volume %s failed to reach %s status within '
-                           'the required time (%s s).' %
-                           (volume_name, status, self.build_timeout))
-                raise exceptions.TimeoutException(message)
+        waiters.wait_for_resource_status(self, self.get_volume, volume_id,
+                                         status, resource='Volume',
+                                         failed=_failed)
 
     def is_resource_deleted(self, id):
         try:
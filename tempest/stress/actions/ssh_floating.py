@@ -65,7 +65,7 @@ class FloatingStress(stressaction.StressAction):
             raise RuntimeError("Cannot ping the machine.")
 
     def _create_vm(self):
-        self.name = name = data_utils.rand_name("instance")
+        self.name = name = self.resource_name("instance")
         servers_client = self.manager.servers_client
         self.logger.info("creating %s" % name)
         vm_args = self.vm_extra_args.copy()
@@ -88,7 +88,7 @@ class FloatingStress(stressaction.StressAction):
 
     def _create_sec_group(self):
         sec_grp_cli = self.manager.security_groups_client
-        s_name = data_utils.rand_name('sec_grp-')
+        s_name = self.resource_name('sec_grp')
         s_description = data_utils.rand_name('desc-')
         _, self.sec_grp = sec_grp_cli.create_security_group(s_name,
                                                             s_description)
@@ -10,14 +10,13 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
-from tempest.common.utils import data_utils
 import tempest.stress.stressaction as stressaction
 
 
 class VolumeCreateDeleteTest(stressaction.StressAction):
 
     def run(self):
-        name = data_utils.rand_name("volume")
+        name = self.resource_name("volume")
         self.logger.info("creating %s" % name)
         volumes_client = self.manager.volumes_client
         resp, volume = volumes_client.create_volume(size=1,
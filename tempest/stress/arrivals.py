@@ -0,0 +1,123 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from tempest import exceptions
+
+PROFILES = ('constant', 'ramp', 'step', 'poisson')
+
+
+class ArrivalSchedule(object):
+    """
+    Arrival times of the runs of an action in open-loop mode
+
+    The rate, in runs per second, is constant, ramps linearly from rate to
+    end_rate over ramp_duration seconds, or grows by step every
+    step_interval seconds. With the poisson profile the rate is constant
+    but the times between arrivals are exponentially distributed.
+
+    The schedule is in shared memory and handed out to the worker processes
+    of the action one arrival at a time, so whichever worker is free takes
+    the next run. It starts with the first arrival and must be created
+    before the workers are forked.
+    """
+
+    def __init__(self, profile='constant', rate=1.0, end_rate=None,
+                 ramp_duration=None, step=None, step_interval=None):
+        if profile not in PROFILES:
+            raise exceptions.InvalidConfiguration(
+                "Unknown arrival profile %s, expected one of %s" %
+                (profile, ', '.join(PROFILES)))
+        if rate <= 0:
+            raise exceptions.InvalidConfiguration(
+                "The arrival rate must be positive, got %s" % rate)
+        if profile == 'ramp' and (end_rate is None or end_rate <= 0 or
+                                  not ramp_duration):
+            raise exceptions.InvalidConfiguration(
+                "A ramp needs a positive end_rate and a ramp_duration")
+        if profile == 'step' and (step is None or step < 0 or
+                                  not step_interval):
+            raise exceptions.InvalidConfiguration(
+                "Steps need a non negative step and a step_interval")
+        self.profile = profile
+        self.rate = float(rate)
+        self.end_rate = end_rate
+        self.ramp_duration = ramp_duration
+        self.step = step
+        self.step_interval = step_interval
+        # Start time and offset of the next arrival from it
+        self._state = multiprocessing.RawArray('d', 2)
+        self._lock = multiprocessing.Lock()
+        self._random = None
+        self._random_pid = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    @property
+    def start(self):
+        """The time of the first arrival, or None if not started."""
+        return self._state[0] or None
+
+    def rate_at(self, offset):
+        """Returns the target rate offset seconds after the start."""
+        if self.profile == 'ramp':
+            progress = min(float(offset) / self.ramp_duration, 1)
+            return self.rate + (self.end_rate - self.rate) * progress
+        if self.profile == 'step':
+            steps = math.floor(offset / self.step_interval)
+            return self.rate + self.step * steps
+        return self.rate
+
+    def expected_arrivals(self, offset):
+        """Returns the number of runs targeted in the first offset secs."""
+        if self.profile == 'ramp':
+            ramp = min(offset, self.ramp_duration)
+            return ((self.rate + self.rate_at(ramp)) / 2 * ramp +
+                    self.end_rate * (offset - ramp))
+        if self.profile == 'step':
+            arrivals = 0
+            start = 0
+            while start < offset:
+                end = min(start + self.step_interval, offset)
+                arrivals += self.rate_at(start) * (end - start)
+                start = end
+            return arrivals
+        return self.rate * offset
+
+    def _gap(self, offset):
+        rate = self.rate_at(offset)
+        if self.profile == 'poisson':
+            if self._random_pid != os.getpid():
+                # Forked workers must not share the same random sequence
+                self._random = random.Random()
+                self._random_pid = os.getpid()
+            return self._random.expovariate(rate)
+        return 1 / rate
+
+    def next_arrival(self):
+        """Takes the next arrival and returns its time."""
+        with self._lock:
+            if not self._state[0]:
+                self._state[0] = time.time()
+            offset = self._state[1]
+            self._state[1] = offset + self._gap(offset)
+            return self._state[0] + offset
@@ -15,98 +15,133 @@
 #    limitations under the License.
 
 from tempest import clients
+from tempest import exceptions
 from tempest.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
 
-def cleanup():
+def _select(resources, run_id, key='name'):
+    """Returns the resources whose name is tagged with run_id, if given."""
+    if run_id is None:
+        return list(resources)
+    return [resource for resource in resources
+            if run_id in (resource.get(key) or '')]
+
+
+def _delete_all(client, delete, ids, kind):
+    """Deletes resources concurrently, logging the failures."""
+    LOG.info("Cleanup::remove %s %s" % (len(ids), kind))
+    results = client.map_concurrently(delete, ids, return_exceptions=True)
+    for resource_id, result in zip(ids, results):
+        if (isinstance(result, Exception) and
+                not isinstance(result, exceptions.NotFound)):
+            LOG.warn("Cleanup::failed to remove %s %s: %s" %
+                     (kind, resource_id, result))
+
+
+def _wait_for_deletion(wait, ids, kind):
+    if not ids:
+        return
+    try:
+        wait(ids)
+    except Exception as e:
+        LOG.warn("Cleanup::%s not all removed: %s" % (kind, e))
+
+
+def _delete_when_available(client, wait_for_status, delete, ids, kind):
+    """
+    Deletes volumes or snapshots concurrently, once they are available
+    """
+    def delete_when_available(resource_id):
+        wait_for_status(resource_id, 'available')
+        return delete(resource_id)
+
+    _delete_all(client, delete_when_available, ids, kind)
+    _wait_for_deletion(client.wait_for_resources_deletion, ids, kind)
+
+
+def cleanup(run_id=None):
+    """
+    Deletes the resources of a stress run, those whose name contains
+    run_id, or of every tenant if run_id is None.
+
+    The resources of each kind are deleted concurrently, and their
+    deletion waited for at once. Kinds are deleted in dependency order:
+    servers, then the floating IPs associated to them, keypairs and
+    security groups, then snapshots before the volumes they are taken
+    from, and users and tenants last.
+    """
     admin_manager = clients.AdminManager()
 
-    _, body = admin_manager.servers_client.list_servers({"all_tenants": True})
-    LOG.info("Cleanup::remove %s servers" % len(body['servers']))
-    for s in body['servers']:
-        try:
-            admin_manager.servers_client.delete_server(s['id'])
-        except Exception:
-            pass
-
-    for s in body['servers']:
-        try:
-            admin_manager.servers_client.wait_for_server_termination(s['id'])
-        except Exception:
-            pass
-
-    _, keypairs = admin_manager.keypairs_client.list_keypairs()
-    LOG.info("Cleanup::remove %s keypairs" % len(keypairs))
-    for k in keypairs:
-        try:
-            admin_manager.keypairs_client.delete_keypair(k['name'])
-        except Exception:
-            pass
+    servers_client = admin_manager.servers_client
+    params = {"all_tenants": True}
+    if run_id is not None:
+        # Filtered by the server
+        params['name'] = run_id
+    _, body = servers_client.list_servers(params)
+    server_ids = [s['id'] for s in _select(body['servers'], run_id)]
+
+    floating_ips_client = admin_manager.floating_ips_client
+    _, floating_ips = floating_ips_client.list_floating_ips()
+    if run_id is not None:
+        # Floating IPs have no name, only those in use by the servers of
+        # the run are known to be theirs
+        floating_ips = [f for f in floating_ips
+                        if f.get('instance_id') in server_ids]
+
+    _delete_all(servers_client, servers_client.delete_server, server_ids,
+                'servers')
+    _wait_for_deletion(
+        lambda ids: servers_client.wait_for_servers_termination(
+            ids, ignore_error=True), server_ids, 'servers')
+
+    _delete_all(floating_ips_client, floating_ips_client.delete_floating_ip,
+                [f['id'] for f in floating_ips], 'floating ips')
+
+    keypairs_client = admin_manager.keypairs_client
+    _, keypairs = keypairs_client.list_keypairs()
+    keypairs = _select([k['keypair'] for k in keypairs], run_id)
+    _delete_all(keypairs_client, keypairs_client.delete_keypair,
+                [k['name'] for k in keypairs], 'keypairs')
 
     secgrp_client = admin_manager.security_groups_client
     _, secgrp = secgrp_client.list_security_groups({"all_tenants": True})
-    secgrp_del = [grp for grp in secgrp if grp['name'] != 'default']
-    LOG.info("Cleanup::remove %s Security Group" % len(secgrp_del))
-    for g in secgrp_del:
-        try:
-            secgrp_client.delete_security_group(g['id'])
-        except Exception:
-            pass
-
-    _, floating_ips = admin_manager.floating_ips_client.list_floating_ips()
-    LOG.info("Cleanup::remove %s floating ips" % len(floating_ips))
-    for f in floating_ips:
-        try:
-            admin_manager.floating_ips_client.delete_floating_ip(f['id'])
-        except Exception:
-            pass
-
-    _, users = admin_manager.identity_client.get_users()
-    LOG.info("Cleanup::remove %s users" % len(users))
-    for user in users:
-        if user['name'].startswith("stress_user"):
-            admin_manager.identity_client.delete_user(user['id'])
-
-    _, tenants = admin_manager.identity_client.list_tenants()
-    LOG.info("Cleanup::remove %s tenants" % len(tenants))
-    for tenant in tenants:
-        if tenant['name'].startswith("stress_tenant"):
-            admin_manager.identity_client.delete_tenant(tenant['id'])
+    secgrp_del = [grp for grp in _select(secgrp, run_id)
+                  if grp['name'] != 'default']
+    _delete_all(secgrp_client, secgrp_client.delete_security_group,
+                [g['id'] for g in secgrp_del], 'security groups')
 
     # We have to delete snapshots first or
     # volume deletion may block
-
-    _, snaps = admin_manager.snapshots_client.\
-        list_snapshots({"all_tenants": True})
-    LOG.info("Cleanup::remove %s snapshots" % len(snaps))
-    for v in snaps:
-        try:
-            admin_manager.snapshots_client.\
-                wait_for_snapshot_status(v['id'], 'available')
-            admin_manager.snapshots_client.delete_snapshot(v['id'])
-        except Exception:
-            pass
-
-    for v in snaps:
-        try:
-            admin_manager.snapshots_client.wait_for_resource_deletion(v['id'])
-        except Exception:
-            pass
-
-    _, vols = admin_manager.volumes_client.list_volumes({"all_tenants": True})
-    LOG.info("Cleanup::remove %s volumes" % len(vols))
-    for v in vols:
-        try:
-            admin_manager.volumes_client.\
-                wait_for_volume_status(v['id'], 'available')
-            admin_manager.volumes_client.delete_volume(v['id'])
-        except Exception:
-            pass
-
-    for v in vols:
-        try:
-            admin_manager.volumes_client.wait_for_resource_deletion(v['id'])
-        except Exception:
-            pass
+    snapshots_client = admin_manager.snapshots_client
+    _, snaps = snapshots_client.list_snapshots({"all_tenants": True})
+    _delete_when_available(snapshots_client,
+                           snapshots_client.wait_for_snapshot_status,
+                           snapshots_client.delete_snapshot,
+                           [s['id'] for s in _select(snaps, run_id,
+                                                     'display_name')],
+                           'snapshots')
+
+    volumes_client = admin_manager.volumes_client
+    _, vols = volumes_client.list_volumes({"all_tenants": True})
+    _delete_when_available(volumes_client,
+                           volumes_client.wait_for_volume_status,
+                           volumes_client.delete_volume,
+                           [v['id'] for v in _select(vols, run_id,
+                                                     'display_name')],
+                           'volumes')
+
+    # The users and tenants created by the stress driver
+    identity_client = admin_manager.identity_client
+    _, users = identity_client.get_users()
+    users = [user for user in _select(users, run_id)
+             if user['name'].startswith("stress_user")]
+    _delete_all(identity_client, identity_client.delete_user,
+                [user['id'] for user in users], 'users')
+
+    _, tenants = identity_client.list_tenants()
+    tenants = [tenant for tenant in _select(tenants, run_id)
+               if tenant['name'].startswith("stress_tenant")]
+    _delete_all(identity_client, identity_client.delete_tenant,
+                [tenant['id'] for tenant in tenants], 'tenants')
@@ -0,0 +1,413 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Runs of stress tests spread over the worker processes of several hosts
+
+A coordinator connects to stress agents, each one listening on a host of
+its own (or on a port of its own for testing), sends them the tests and
+starts them all at once. The agents run the workers of every test with
+the local driver and stream their throughput snapshots back, then their
+statistics, which the coordinator aggregates into a single report.
+
+Messages are JSON objects, one per line. The coordinator sends commands:
+prepare (with the tests), start (with the duration) and stop. The agents
+send events: ready, snapshot, done (with the statistics of the actions)
+and error.
+
+Agents run whatever actions they are sent with the credentials of their
+tempest.conf, so coordinators must first prove that they know the
+agent_secret of the stress section: the agent sends a challenge with a
+random nonce, which the coordinator answers with its HMAC-SHA256 keyed
+with the secret. Agents listen on the loopback interface unless a host is
+given, and refuse to listen on another one without a secret.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import socket
+import threading
+
+from six import moves
+
+from tempest.common import histogram
+from tempest import config
+from tempest import exceptions
+from tempest.openstack.common import log as logging
+from tempest.stress import cleanup
+from tempest.stress import driver
+from tempest.stress import statistics
+from tempest.stress import stressaction
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+def parse_address(address, default_host='127.0.0.1'):
+    """Returns the host and port of an address like host:port or port."""
+    host, _, port = address.rpartition(':')
+    return host or default_host, int(port)
+
+
+def _digest(secret, nonce):
+    return hmac.new(str(secret or ''), str(nonce), hashlib.sha256).hexdigest()
+
+
+def _digests_equal(digest, other):
+    """Compares digests in a time independent of where they differ."""
+    if len(digest) != len(other):
+        return False
+    result = 0
+    for a, b in zip(digest, other):
+        result |= ord(a) ^ ord(b)
+    return result == 0
+
+
+class Connection(object):
+    """JSON messages, one per line, over a socket."""
+
+    def __init__(self, sock, name):
+        self.sock = sock
+        self.name = name
+        self._reader = sock.makefile('r')
+        self._lock = threading.Lock()
+
+    def send(self, **message):
+        with self._lock:
+            self.sock.sendall(json.dumps(message) + '\n')
+
+    def receive(self):
+        """Returns the next message, or None if the peer is gone."""
+        line = self._reader.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def stop(self):
+        """Tells an agent to stop, unless it is already gone."""
+        try:
+            self.send(command='stop')
+        except socket.error:
+            pass
+
+    def close(self):
+        try:
+            # Also wakes up the threads waiting for messages
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self.sock.close()
+
+
+def actions_to_dict(actions):
+    """Returns the action statistics of the driver as JSON data."""
+    data = {}
+    for name, action in actions.items():
+        data[name] = dict((key, value) for key, value in action.items()
+                          if key != 'latency')
+        data[name]['latency'] = action['latency'].to_dict()
+    return data
+
+
+def merge_actions(agent_actions):
+    """
+    Returns the statistics of each action summed over the agents, from
+    the JSON data sent by each agent.
+    """
+    actions = {}
+    for data in agent_actions:
+        for name, remote in data.items():
+            action = actions.setdefault(
+                name,
+                dict(runs=0, fails=0,
+                     latency=histogram.Histogram(statistics.LATENCY_BASE,
+                                                 statistics.LATENCY_FACTOR),
+                     lag_total=0, lag_max=0))
+            action['runs'] += remote['runs']
+            action['fails'] += remote['fails']
+            action['latency'].merge(
+                histogram.Histogram.from_dict(remote['latency']))
+            action['lag_total'] += remote['lag_total']
+            action['lag_max'] = max(action['lag_max'], remote['lag_max'])
+            if 'open_loop' in remote:
+                open_loop = action.setdefault(
+                    'open_loop', dict(target_rate=0, achieved_rate=0))
+                open_loop['target_rate'] += remote['open_loop']['target_rate']
+                open_loop['achieved_rate'] += (
+                    remote['open_loop']['achieved_rate'])
+    for action in actions.values():
+        if 'open_loop' in action:
+            action['open_loop']['lag'] = dict(
+                mean=(action['lag_total'] / action['runs']
+                      if action['runs'] else None),
+                max=action['lag_max'])
+    return actions
+
+
+def _merge_snapshots(snapshots):
+    """Logs and returns the sum of the throughput snapshots of agents."""
+    merged = dict(time=max(snapshot['time'] for snapshot in snapshots),
+                  actions={})
+    for snapshot in snapshots:
+        for name, remote in snapshot['actions'].items():
+            action = merged['actions'].setdefault(
+                name, dict(runs=0, fails=0, throughput=0))
+            for key in action:
+                action[key] += remote[key]
+    for name, action in sorted(merged['actions'].items()):
+        LOG.info("%s: %.2f actions/s (%d runs, %d failed) after %ds on %d "
+                 "agents" % (name, action['throughput'], action['runs'],
+                             action['fails'], merged['time'],
+                             len(snapshots)))
+    return merged
+
+
+def _authenticate_coordinator(connection, secret):
+    """Returns whether the coordinator proved it knows the secret."""
+    nonce = os.urandom(16).encode('hex')
+    connection.send(event='challenge', nonce=nonce)
+    message = connection.receive()
+    if (message is None or message.get('command') != 'authenticate' or
+            not _digests_equal(_digest(secret, nonce),
+                               str(message.get('digest', '')))):
+        LOG.error("Coordinator %s failed to authenticate" % connection.name)
+        connection.send(event='error', error='authentication failed')
+        return False
+    return True
+
+
+def _authenticate(connection, secret):
+    """Answers the challenge of an agent."""
+    message = connection.receive()
+    if message is None or message.get('event') != 'challenge':
+        raise exceptions.StressAgentError(
+            agent=connection.name,
+            error=message and message.get('error') or 'no challenge')
+    connection.send(command='authenticate',
+                    digest=_digest(secret, message['nonce']))
+
+
+def _run_agent_session(connection, secret=None):
+    if not _authenticate_coordinator(connection, secret):
+        return
+    message = connection.receive()
+    if message is None or message['command'] != 'prepare':
+        return
+    max_runs = message.get('max_runs')
+    stop_on_error = message.get('stop_on_error', False)
+    try:
+        workers, startup = driver.prepare_workers(
+            message['tests'], max_runs, stop_on_error, message.get('run_id'))
+    except Exception as e:
+        connection.send(event='error', error=str(e))
+        raise
+    try:
+        _run_prepared_workers(connection, workers, max_runs, stop_on_error,
+                              startup)
+    finally:
+        # The workers of a session never outlive it, even if it fails
+        driver.terminate_all_processes()
+
+
+def _run_prepared_workers(connection, workers, max_runs, stop_on_error,
+                          startup):
+    connection.send(event='ready', startup=startup)
+    message = connection.receive()
+    if message is None or message['command'] != 'start':
+        LOG.info("Run cancelled by the coordinator %s" % connection.name)
+        return
+
+    stop_event = threading.Event()
+
+    def wait_for_stop():
+        message = connection.receive()
+        while message is not None and message['command'] != 'stop':
+            message = connection.receive()
+        stop_event.set()
+
+    stop_thread = threading.Thread(target=wait_for_stop)
+    stop_thread.daemon = True
+    stop_thread.start()
+    had_errors, start_time, stopped, _ = driver.run_workers(
+        workers, message['duration'], max_runs, stop_on_error, stop_event,
+        lambda snapshot: connection.send(event='snapshot',
+                                         snapshot=snapshot))
+    actions = driver.action_statistics(workers, stopped)
+    connection.send(event='done', had_errors=had_errors,
+                    duration=stopped - start_time,
+                    actions=actions_to_dict(actions))
+
+
+def serve_agent(address):
+    """
+    Runs the tests sent by coordinators connecting to address, host:port
+    or port, one coordinator at a time.
+    """
+    secret = CONF.stress.agent_secret
+    host, port = parse_address(address)
+    if host not in LOOPBACK_HOSTS and not secret:
+        raise exceptions.InvalidConfiguration(
+            "A stress agent listening on %s needs an agent_secret in the "
+            "stress section" % host)
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((host, port))
+    server.listen(1)
+    LOG.info("Stress agent listening on %s" % address)
+    while True:
+        sock, peer = server.accept()
+        connection = Connection(sock, '%s:%d' % peer)
+        LOG.info("Coordinator %s connected" % connection.name)
+        try:
+            _run_agent_session(connection, secret)
+        except Exception:
+            LOG.exception("Failure in the run of coordinator %s" %
+                          connection.name)
+        finally:
+            connection.close()
+
+
+def _read_events(connection, index, events):
+    message = connection.receive()
+    while message is not None:
+        events.put((index, message))
+        message = connection.receive()
+    events.put((index, None))
+
+
+def _coordinate(connections, tests, duration, max_runs, stop_on_error,
+                run_id=None, secret=None):
+    for connection in connections:
+        _authenticate(connection, secret)
+    for connection in connections:
+        connection.send(command='prepare', tests=tests, max_runs=max_runs,
+                        stop_on_error=stop_on_error, run_id=run_id)
+    startups = []
+    for connection in connections:
+        message = connection.receive()
+        if message is not None and message['event'] == 'ready':
+            startups.append(message['startup'])
+        else:
+            for other in connections:
+                if other is not connection:
+                    other.stop()
+            raise exceptions.StressAgentError(
+                agent=connection.name,
+                error=message and message.get('error') or 'disconnected')
+    # All the agents are ready, start them as close together as possible
+    for connection in connections:
+        connection.send(command='start', duration=duration)
+
+    events = moves.queue.Queue()
+    for index, connection in enumerate(connections):
+        reader = threading.Thread(target=_read_events,
+                                  args=(connection, index, events))
+        reader.daemon = True
+        reader.start()
+    agent_snapshots = [[] for _ in connections]
+    snapshots = []
+    results = {}
+    while len(results) < len(connections):
+        try:
+            # With a timeout, so that the coordinator can be interrupted
+            index, message = events.get(True, 1)
+        except moves.queue.Empty:
+            continue
+        if message is None:
+            if index not in results:
+                LOG.error("Stress agent %s is gone" % connections[index].name)
+                results[index] = None
+        elif message['event'] == 'snapshot':
+            agent_snapshots[index].append(message['snapshot'])
+            # Snapshots are summed once every agent has sent its own
+            if min(len(agent) for agent in agent_snapshots) > len(snapshots):
+                snapshots.append(_merge_snapshots(
+                    [agent[len(snapshots)] for agent in agent_snapshots]))
+        elif message['event'] == 'done':
+            results[index] = message
+            failed = message['had_errors'] or any(
+                action['fails'] for action in message['actions'].values())
+            if stop_on_error and failed:
+                for other, connection in enumerate(connections):
+                    if other not in results:
+                        connection.stop()
+    # The run starts once the slowest agent is ready
+    startup = dict((step, max(agent[step] for agent in startups))
+                   for step in startups[0])
+    results = [results[agent] for agent in range(len(connections))]
+    return results, snapshots, startup
+
+
+def run_coordinator(agents, tests, duration, max_runs=None,
+                    stop_on_error=False, report_file=None):
+    """
+    Runs tests on the stress agents listening at the addresses of agents
+    and reports the statistics of all of them, like
+    driver.stress_openstack does for local workers.
+    """
+    # The agents tag the resources of the run with the same id
+    run_id = stressaction.new_run_id()
+    LOG.info("Stress run id: %s" % run_id)
+    connections = []
+    try:
+        for address in agents:
+            sock = socket.create_connection(
+                parse_address(address, 'localhost'))
+            connections.append(Connection(sock, address))
+        results, snapshots, startup = _coordinate(
+            connections, tests, duration, max_runs, stop_on_error, run_id,
+            CONF.stress.agent_secret)
+    finally:
+        for connection in connections:
+            connection.close()
+
+    had_errors = False
+    LOG.info("Statistics (per agent):")
+    for connection, result in zip(connections, results):
+        if result is None:
+            had_errors = True
+            continue
+        runs = sum(action['runs'] for action in result['actions'].values())
+        fails = sum(action['fails']
+                    for action in result['actions'].values())
+        if result['had_errors'] or fails:
+            had_errors = True
+        LOG.info(" Agent %s: Run %d actions (%d failed)" %
+                 (connection.name, runs, fails))
+    actions = merge_actions([result['actions'] for result in results
+                             if result is not None])
+    LOG.info("Summary:")
+    LOG.info("Run %d actions (%d failed)" %
+             (sum(action['runs'] for action in actions.values()),
+              sum(action['fails'] for action in actions.values())))
+    elapsed = max([result['duration'] for result in results
+                   if result is not None] or [0])
+    report = driver.stress_report(actions, elapsed, snapshots, startup)
+    if report_file:
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if not had_errors and CONF.stress.full_clean_stack:
+        LOG.info("cleaning up")
+        cleanup.cleanup(run_id)
+    if had_errors:
+        return 1
+    else:
+        return 0
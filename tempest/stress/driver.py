@@ -12,6 +12,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import json
 import multiprocessing
 import os
 import signal
@@ -20,13 +21,19 @@ import time
 from six import moves
 
 from tempest import clients
+from tempest.common import histogram
+from tempest.common import parallel
 from tempest.common import ssh
-from tempest.common.utils import data_utils
 from tempest import config
 from tempest import exceptions
 from tempest.openstack.common import importutils
 from tempest.openstack.common import log as logging
+from tempest.stress import arrivals
 from tempest.stress import cleanup
+from tempest.stress import log_scanner
+from tempest.stress import statistics
+from tempest.stress import stressaction
+from tempest.stress import timeseries
 
 CONF = config.CONF
 
@@ -63,21 +70,114 @@ def _get_compute_nodes(controller, ssh_user, ssh_key=None):
     return nodes
 
 
-def _has_error_in_logs(logfiles, nodes, ssh_user, ssh_key=None,
-                       stop_on_error=False):
+def action_statistics(workers, stopped=None):
     """
-    Detect errors in the nova log files on the controller and compute nodes.
+    Returns the runs, fails, latency histogram and start lag of each
+    action, summed over its worker processes. For the actions run in
+    open-loop mode, the target and achieved rates until stopped are
+    returned too.
     """
-    grep = 'egrep "ERROR|TRACE" %s' % logfiles
-    ret = False
-    for node in nodes:
-        errors = do_ssh(grep, node, ssh_user, ssh_key)
-        if len(errors) > 0:
-            LOG.error('%s: %s' % (node, errors))
-            ret = True
-            if stop_on_error:
-                break
-    return ret
+    actions = {}
+    schedules = {}
+    for worker in workers:
+        action = actions.setdefault(
+            worker['action'],
+            dict(runs=0, fails=0,
+                 latency=histogram.Histogram(statistics.LATENCY_BASE,
+                                             statistics.LATENCY_FACTOR),
+                 lag_total=0, lag_max=0))
+        action['runs'] += worker['statistic']['runs']
+        action['fails'] += worker['statistic']['fails']
+        action['latency'].merge(worker['statistic'].latency())
+        action['lag_total'] += worker['statistic']['lag_total_us'] / 1000000.0
+        action['lag_max'] = max(action['lag_max'],
+                                worker['statistic']['lag_max_us'] / 1000000.0)
+        schedule = worker.get('schedule')
+        action_schedules = schedules.setdefault(worker['action'], [])
+        if schedule is not None and schedule not in action_schedules:
+            action_schedules.append(schedule)
+    if stopped is not None:
+        for name, action in actions.items():
+            open_loop = _open_loop_report(action, schedules[name], stopped)
+            if open_loop is not None:
+                action['open_loop'] = open_loop
+    return actions
+
+
+def _open_loop_report(action, schedules, stopped):
+    """
+    Returns the target and achieved rates of an action run in open-loop
+    mode, from the start of its schedules until stopped, and how late its
+    runs started.
+    """
+    started = [schedule.start for schedule in schedules if schedule.start]
+    window = stopped - min(started) if started else 0
+    if window <= 0:
+        return None
+    target = sum(schedule.expected_arrivals(stopped - schedule.start)
+                 for schedule in schedules if schedule.start)
+    return dict(target_rate=target / window,
+                achieved_rate=action['runs'] / window,
+                lag=dict(mean=(action['lag_total'] / action['runs']
+                               if action['runs'] else None),
+                         max=action['lag_max']))
+
+
+def throughput_snapshot(actions, elapsed, previous):
+    """
+    Logs and returns the number of runs of each action per second since
+    the previous snapshot.
+    """
+    snapshot = dict(time=elapsed, actions={})
+    interval = elapsed - (previous['time'] if previous else 0)
+    for name, action in sorted(actions.items()):
+        previous_runs = (previous['actions'][name]['runs']
+                         if previous else 0)
+        throughput = (action['runs'] - previous_runs) / interval
+        snapshot['actions'][name] = dict(runs=action['runs'],
+                                         fails=action['fails'],
+                                         throughput=throughput)
+        LOG.info("%s: %.2f actions/s (%d runs, %d failed) after %ds" %
+                 (name, throughput, action['runs'], action['fails'],
+                  elapsed))
+    return snapshot
+
+
+def stress_report(actions, elapsed, snapshots, startup=None):
+    """
+    Logs and returns the throughput and latency percentiles of each
+    action over the whole run, with the throughput snapshots, and the
+    target and achieved rates of the actions run in open-loop mode.
+    The time the workers took to start, which elapsed does not include,
+    is reported as startup.
+    """
+    report = dict(duration=elapsed, actions={}, snapshots=snapshots,
+                  startup=startup)
+    LOG.info("Latency (per action):")
+    for name, action in sorted(actions.items()):
+        latency = action['latency']
+        report['actions'][name] = entry = dict(
+            runs=action['runs'], fails=action['fails'],
+            throughput=action['runs'] / elapsed if elapsed else None,
+            latency=dict(mean=latency.mean(),
+                         p50=latency.percentile(50),
+                         p90=latency.percentile(90),
+                         p99=latency.percentile(99),
+                         max=latency.max))
+        if latency.count:
+            LOG.info(" %s: mean %.3fs, p50 %.3fs, p90 %.3fs, p99 %.3fs, "
+                     "max %.3fs" % (name, latency.mean(),
+                                    latency.percentile(50),
+                                    latency.percentile(90),
+                                    latency.percentile(99), latency.max))
+        open_loop = action.get('open_loop')
+        if open_loop is not None:
+            entry['open_loop'] = open_loop
+            LOG.info(" %s: %.2f actions/s for a target of %.2f, runs "
+                     "started %.3fs late at most" %
+                     (name, open_loop['achieved_rate'],
+                      open_loop['target_rate'], open_loop['lag']['max']))
+    return report
 
 
 def sigchld_handler(signal, frame):
@@ -90,6 +190,8 @@ def sigchld_handler(signal, frame):
 def terminate_all_processes(check_interval=20):
     """
     Goes through the process list and terminates all child processes.
+    The list is emptied, the processes of the next run are not mixed with
+    those of this one.
     """
     for process in processes:
         if process['process'].is_alive():
@@ -97,7 +199,9 @@ def terminate_all_processes(check_interval=20):
                 process['process'].terminate()
             except Exception:
                 pass
-    time.sleep(check_interval)
+    deadline = time.time() + check_interval
+    for process in processes:
+        process['process'].join(max(0, deadline - time.time()))
     for process in processes:
         if process['process'].is_alive():
             try:
@@ -107,124 +211,294 @@ def terminate_all_processes(check_interval=20):
             except Exception:
                 pass
         process['process'].join()
+    del processes[:]
 
 
-def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
+def _create_isolated_credentials(admin_manager, count, run_id=None):
     """
-    Workload driver. Executes an action function against a nova-cluster.
+    Creates count tenants with a user each, concurrently, and returns
+    their user names and tenant names.
     """
+    identity_client = admin_manager.identity_client
+
+    def create(_):
+        username = stressaction.resource_name("stress_user", run_id)
+        tenant_name = stressaction.resource_name("stress_tenant", run_id)
+        _, tenant = identity_client.create_tenant(name=tenant_name)
+        identity_client.create_user(username,
+                                    "pass",
+                                    tenant['id'],
+                                    "email")
+        return username, tenant_name
+
+    return identity_client.map_concurrently(create, moves.xrange(count))
+
+
+def _authenticate(manager):
+    # The forked workers inherit the token instead of all asking for one
+    manager.auth_provider.auth_data
+
+
+def _run_worker(test_run, shared_statistic, schedule, start_event):
+    start_event.wait()
+    test_run.execute(shared_statistic, schedule)
+
+
+def prepare_workers(tests, max_runs=None, stop_on_error=False, run_id=None):
+    """
+    Sets up the actions of tests and forks their worker processes, which
+    wait for run_workers to start them.
+    The tenants and users of actions using isolated tenants are created
+    concurrently, and all the client managers authenticated before the
+    workers are forked.
+    Actions with a 'rate' run in open-loop mode: their runs start at the
+    arrival times of an arrivals.ArrivalSchedule, built from the rate,
+    instead of back-to-back.
+    The resources created for the run are tagged with run_id, if given.
+    Returns the workers and how long each step of their startup took.
+    """
+    startup = {}
+    start = time.time()
     admin_manager = clients.AdminManager()
 
-    ssh_user = CONF.stress.target_ssh_user
-    ssh_key = CONF.stress.target_private_key_path
-    logfiles = CONF.stress.target_logfiles
-    log_check_interval = int(CONF.stress.log_check_interval)
     default_thread_num = int(CONF.stress.default_thread_number_per_action)
-    if logfiles:
-        controller = CONF.stress.target_controller
-        computes = _get_compute_nodes(controller, ssh_user, ssh_key)
-        for node in computes:
-            do_ssh("rm -f %s" % logfiles, node, ssh_user, ssh_key)
+    isolated_credentials = _create_isolated_credentials(
+        admin_manager,
+        sum(test.get('threads', default_thread_num) for test in tests
+            if test.get('use_isolated_tenants', False)),
+        run_id)
+    startup['tenants'] = time.time() - start
+
+    step_start = time.time()
+    test_managers = []
     for test in tests:
-        if test.get('use_admin', False):
-            manager = admin_manager
+        if test.get('use_isolated_tenants', False):
+            managers = [clients.Manager(username=username,
+                                        password="pass",
+                                        tenant_name=tenant_name)
+                        for username, tenant_name in isolated_credentials[
+                            :test.get('threads', default_thread_num)]]
+            del isolated_credentials[:len(managers)]
+        elif test.get('use_admin', False):
+            managers = [admin_manager]
         else:
-            manager = clients.Manager()
+            managers = [clients.Manager()]
+        test_managers.append(managers)
+    all_managers = [admin_manager] + [manager for managers in test_managers
+                                      for manager in managers
+                                      if manager is not admin_manager]
+    parallel.map_concurrently(_authenticate, all_managers,
+                              CONF.service_clients.max_concurrent_requests)
+    startup['authentication'] = time.time() - step_start
+
+    step_start = time.time()
+    # The counters of all the workers are in a single shared memory block
+    statistics_block = statistics.StatisticsBlock(
+        sum(test.get('threads', default_thread_num) for test in tests))
+    start_event = multiprocessing.Event()
+    # Every action is set up before any worker is forked, so that a setUp
+    # failure leaves no worker waiting for a start that never comes
+    test_runs = []
+    for test, managers in zip(tests, test_managers):
+        schedule = None
+        if 'rate' in test:
+            # The workers of the action share its arrivals
+            schedule = arrivals.ArrivalSchedule.from_dict(test['rate'])
         for p_number in moves.xrange(test.get('threads', default_thread_num)):
-            if test.get('use_isolated_tenants', False):
-                username = data_utils.rand_name("stress_user")
-                tenant_name = data_utils.rand_name("stress_tenant")
-                password = "pass"
-                identity_client = admin_manager.identity_client
-                _, tenant = identity_client.create_tenant(name=tenant_name)
-                identity_client.create_user(username,
-                                            password,
-                                            tenant['id'],
-                                            "email")
-                manager = clients.Manager(username=username,
-                                          password="pass",
-                                          tenant_name=tenant_name)
+            manager = managers[p_number % len(managers)]
 
             test_obj = importutils.import_class(test['action'])
             test_run = test_obj(manager, max_runs, stop_on_error)
+            test_run.run_id = run_id
 
             kwargs = test.get('kwargs', {})
             test_run.setUp(**dict(kwargs.iteritems()))
+            test_runs.append((test_run, p_number, schedule))
 
-            LOG.debug("calling Target Object %s" %
-                      test_run.__class__.__name__)
-
-            mp_manager = multiprocessing.Manager()
-            shared_statistic = mp_manager.dict()
-            shared_statistic['runs'] = 0
-            shared_statistic['fails'] = 0
-
-            p = multiprocessing.Process(target=test_run.execute,
-                                        args=(shared_statistic,))
-
-            process = {'process': p,
-                       'p_number': p_number,
-                       'action': test_run.action,
-                       'statistic': shared_statistic}
-
-            processes.append(process)
-            p.start()
-    if stop_on_error:
-        # NOTE(mkoderer): only the parent should register the handler
-        signal.signal(signal.SIGCHLD, sigchld_handler)
-    end_time = time.time() + duration
-    had_errors = False
-    while True:
-        if max_runs is None:
-            remaining = end_time - time.time()
-            if remaining <= 0:
-                break
-        else:
-            remaining = log_check_interval
-            all_proc_term = True
-            for process in processes:
-                if process['process'].is_alive():
-                    all_proc_term = False
-                    break
-            if all_proc_term:
-                break
+    workers = []
+    for test_run, p_number, schedule in test_runs:
+        LOG.debug("calling Target Object %s" %
+                  test_run.__class__.__name__)
+
+        shared_statistic = statistics_block.slot(len(workers))
+
+        p = multiprocessing.Process(target=_run_worker,
+                                    args=(test_run, shared_statistic,
+                                          schedule, start_event))
+
+        process = {'process': p,
+                   'p_number': p_number,
+                   'action': test_run.action,
+                   'statistic': shared_statistic,
+                   'schedule': schedule,
+                   'start_event': start_event}
+
+        processes.append(process)
+        workers.append(process)
+        p.start()
+    startup['setup'] = time.time() - step_start
+    startup['duration'] = time.time() - start
+    LOG.info("Started %d workers in %.1fs (tenants %.1fs, authentication "
+             "%.1fs, setup %.1fs)" %
+             (len(workers), startup['duration'], startup['tenants'],
+              startup['authentication'], startup['setup']))
+    return workers, startup
 
-        time.sleep(min(remaining, log_check_interval))
+
+def _sleep(secs, stop_event=None):
+    if stop_event is None:
+        time.sleep(secs)
+    else:
+        stop_event.wait(secs)
+
+
+def run_workers(workers, duration, max_runs=None, stop_on_error=False,
+                stop_event=None, snapshot_callback=None, sampler=None):
+    """
+    Starts the worker processes and lets them run until duration is over
+    (or until they are all done if max_runs is given), errors are found in
+    the logs or stop_event, a threading.Event, is set. The throughput
+    snapshots taken every [stress] report_interval are passed to
+    snapshot_callback as they are taken. The statistics of the actions are
+    written to sampler, a timeseries.TimeSeriesWriter, every
+    sampler.interval seconds and when the run stops.
+    Returns whether errors were found in the logs, the time the workers
+    were started and stopped, and the throughput snapshots.
+    """
+    ssh_user = CONF.stress.target_ssh_user
+    ssh_key = CONF.stress.target_private_key_path
+    logfiles = CONF.stress.target_logfiles
+    log_check_interval = int(CONF.stress.log_check_interval)
+    report_interval = int(CONF.stress.report_interval)
+    scanner = None
+    # The workers wait for the start event until they are terminated,
+    # even when the run fails before they are started
+    try:
+        if logfiles:
+            controller = CONF.stress.target_controller
+            computes = _get_compute_nodes(controller, ssh_user, ssh_key)
+            scanner = log_scanner.LogScanner(computes, logfiles, ssh_user,
+                                             ssh_key)
+            # Only the errors logged during the run count
+            scanner.mark()
+        for worker in workers:
+            worker['start_event'].set()
         if stop_on_error:
-            for process in processes:
-                if process['statistic']['fails'] > 0:
+            # NOTE(mkoderer): only the parent should register the handler
+            signal.signal(signal.SIGCHLD, sigchld_handler)
+        start_time = time.time()
+        end_time = start_time + duration
+        # Throughput is not reported during the run if report_interval is 0
+        next_report = (start_time + report_interval if report_interval > 0
+                       else float('inf'))
+        next_sample = (start_time + sampler.interval
+                       if sampler is not None and sampler.interval > 0
+                       else float('inf'))
+        snapshots = []
+        had_errors = False
+        while stop_event is None or not stop_event.is_set():
+            if max_runs is None:
+                remaining = end_time - time.time()
+                if remaining <= 0:
+                    break
+            else:
+                remaining = log_check_interval
+                all_proc_term = True
+                for process in workers:
+                    if process['process'].is_alive():
+                        all_proc_term = False
+                        break
+                if all_proc_term:
                     break
 
-        if not logfiles:
-            continue
-        if _has_error_in_logs(logfiles, computes, ssh_user, ssh_key,
-                              stop_on_error):
-            had_errors = True
-            break
+            next_check = time.time() + min(remaining, log_check_interval)
+            while time.time() < next_check:
+                _sleep(max(0, min(next_check, next_report, next_sample) -
+                           time.time()), stop_event)
+                if stop_event is not None and stop_event.is_set():
+                    break
+                if time.time() >= next_sample:
+                    sampler.sample(action_statistics(workers),
+                                   time.time() - start_time)
+                    next_sample += sampler.interval
+                if time.time() >= next_report:
+                    snapshots.append(throughput_snapshot(
+                        action_statistics(workers), time.time() - start_time,
+                        snapshots[-1] if snapshots else None))
+                    if snapshot_callback is not None:
+                        snapshot_callback(snapshots[-1])
+                    next_report += report_interval
+            if stop_on_error:
+                for process in workers:
+                    if process['statistic']['fails'] > 0:
+                        break
 
-    terminate_all_processes()
+            if scanner is None:
+                continue
+            if scanner.scan():
+                had_errors = True
+                break
+
+        stopped = time.time()
+        if sampler is not None:
+            sampler.sample(action_statistics(workers), stopped - start_time)
+        if scanner is not None:
+            # Errors logged since the last check
+            if not had_errors and scanner.scan():
+                had_errors = True
+    finally:
+        if scanner is not None:
+            scanner.close()
+        terminate_all_processes()
+    return had_errors, start_time, stopped, snapshots
 
-    sum_fails = 0
-    sum_runs = 0
+
+def stress_openstack(tests, duration, max_runs=None, stop_on_error=False,
+                     report_file=None, samples_file=None):
+    """
+    Workload driver. Executes an action function against a nova-cluster.
+    The throughput and latency of each action are written as JSON to
+    report_file, if given, and sampled every [stress] sample_interval
+    into the time series file samples_file, if given.
+    """
+    # Tags the resources of the run, for the cleanup
+    run_id = stressaction.new_run_id()
+    LOG.info("Stress run id: %s" % run_id)
+    sampler = None
+    if samples_file:
+        sampler = timeseries.TimeSeriesWriter(
+            samples_file, int(CONF.stress.sample_interval))
+    try:
+        workers, startup = prepare_workers(tests, max_runs, stop_on_error,
+                                           run_id)
+        had_errors, start_time, stopped, snapshots = run_workers(
+            workers, duration, max_runs, stop_on_error, sampler=sampler)
+    finally:
+        if sampler is not None:
+            sampler.close()
 
     LOG.info("Statistics (per process):")
-    for process in processes:
+    for process in workers:
         if process['statistic']['fails'] > 0:
             had_errors = True
-        sum_runs += process['statistic']['runs']
-        sum_fails += process['statistic']['fails']
         LOG.info(" Process %d (%s): Run %d actions (%d failed)" %
                  (process['p_number'],
                   process['action'],
                   process['statistic']['runs'],
                      process['statistic']['fails']))
+    actions = action_statistics(workers, stopped)
     LOG.info("Summary:")
     LOG.info("Run %d actions (%d failed)" %
-             (sum_runs, sum_fails))
+             (sum(action['runs'] for action in actions.values()),
+              sum(action['fails'] for action in actions.values())))
+    report = stress_report(actions, stopped - start_time, snapshots, startup)
+    if report_file:
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
 
     if not had_errors and CONF.stress.full_clean_stack:
         LOG.info("cleaning up")
-        cleanup.cleanup()
+        cleanup.cleanup(run_id)
     if had_errors:
         return 1
     else:
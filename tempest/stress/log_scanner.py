@@ -0,0 +1,137 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import pipes
+import re
+
+from tempest.common import parallel
+from tempest.common import ssh
+from tempest import exceptions
+from tempest.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+# Nodes scanned at the same time
+MAX_CONCURRENT_SCANS = 16
+
+# Starts the size of each log file in the output of a scan
+FILE_MARKER = '==> tempest-log-scanner'
+
+TIMESTAMP = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d+)?)')
+
+LogError = collections.namedtuple('LogError',
+                                  ['node', 'path', 'timestamp', 'line'])
+
+
+class LogScanner(object):
+    """
+    Finds the errors logged on nodes since the previous scan
+
+    The size of each log file of each node is remembered, so that a scan
+    only reads what was written since the previous one, and a file smaller
+    than before, e.g. rotated, is read again from its start. The nodes are
+    scanned concurrently, each over an SSH connection of its own kept open
+    between scans.
+
+    What a node logged before it is marked is never reported: a node that
+    fails to be marked is not searched by the following scans, which only
+    try to mark it again, until one succeeds.
+    """
+
+    def __init__(self, nodes, logfiles, ssh_user, ssh_key=None,
+                 pattern='ERROR|TRACE'):
+        """
+        :param logfiles: shell pattern of the log files of the nodes
+        :param pattern: extended regular expression of the lines to report
+        """
+        self.logfiles = logfiles
+        self.pattern = pattern
+        self.clients = dict((node, ssh.Client(node, ssh_user,
+                                              key_filename=ssh_key,
+                                              persistent=True))
+                            for node in nodes)
+        self.offsets = dict((node, {}) for node in nodes)
+        self.unmarked = set(nodes)
+
+    def _command(self, node, grep):
+        """
+        Returns the command printing the size of each log file of node and,
+        if grep is True, the matching lines written since the last scan.
+        """
+        offsets = ''.join('%s) offset=%d;; ' % (pipes.quote(path), offset)
+                          for path, offset in self.offsets[node].items())
+        command = ('for f in %s; do [ -f "$f" ] || continue; '
+                   'size=$(stat -c %%s "$f"); '
+                   'case "$f" in %s*) offset=0;; esac; '
+                   '[ "$size" -lt "$offset" ] && offset=0; '
+                   'echo "%s $size $f"; ' %
+                   (self.logfiles, offsets, FILE_MARKER))
+        if grep:
+            command += ('tail -c +$((offset + 1)) "$f" | '
+                        'head -c $((size - offset)) | egrep %s; ' %
+                        pipes.quote(self.pattern))
+        # egrep fails when nothing matches
+        return command + 'done; true'
+
+    def _parse(self, node, output):
+        errors = []
+        path = None
+        for line in output.splitlines():
+            if line.startswith(FILE_MARKER + ' '):
+                size, path = line[len(FILE_MARKER) + 1:].split(' ', 1)
+                self.offsets[node][path] = int(size)
+            elif path is not None and line:
+                match = TIMESTAMP.match(line)
+                errors.append(LogError(node, path,
+                                       match.group(1) if match else None,
+                                       line))
+        return errors
+
+    def _scan_node(self, node, grep=True):
+        grep = grep and node not in self.unmarked
+        command = self._command(node, grep)
+        try:
+            output = self.clients[node].exec_command(command)
+        except (exceptions.SSHExecCommandFailed, exceptions.SSHTimeout,
+                exceptions.TimeoutException) as e:
+            if grep:
+                LOG.error('Failed to scan the logs of %s: %s' % (node, e))
+            else:
+                LOG.error('Failed to mark the logs of %s, they are not '
+                          'scanned until it is marked: %s' % (node, e))
+                self.unmarked.add(node)
+            return []
+        self.unmarked.discard(node)
+        return self._parse(node, output)
+
+    def mark(self):
+        """Skips what was logged so far, the next scan starts from here."""
+        parallel.map_concurrently(lambda node: self._scan_node(node, False),
+                                  self.clients, MAX_CONCURRENT_SCANS)
+
+    def scan(self):
+        """Logs and returns the LogErrors logged since the last scan."""
+        errors = []
+        for node_errors in parallel.map_concurrently(
+                self._scan_node, self.clients, MAX_CONCURRENT_SCANS):
+            errors.extend(node_errors)
+        for error in errors:
+            LOG.error('%s: %s: %s' % (error.node, error.path, error.line))
+        return errors
+
+    def close(self):
+        for client in self.clients.values():
+            client.close()
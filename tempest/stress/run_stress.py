@@ -26,6 +26,7 @@ except ImportError:
     from unittest2 import loader
 
 from tempest.openstack.common import log as logging
+from tempest.stress import distributed
 from tempest.stress import driver
 
 LOG = logging.getLogger(__name__)
@@ -70,8 +71,21 @@ def discover_stress_tests(path="./", filter_attr=None, call_inherited=False):
     return tests
 
 
+def stress(ns, tests, report_file, samples_file):
+    if ns.agents:
+        return distributed.run_coordinator(ns.agents, tests, ns.duration,
+                                           ns.number, ns.stop, report_file)
+    return driver.stress_openstack(tests, ns.duration, ns.number, ns.stop,
+                                   report_file, samples_file)
+
+
 def main(ns):
     result = 0
+    if ns.agent:
+        distributed.serve_agent(ns.agent)
+        return result
+    if ns.agents and ns.samples:
+        parser.error("--samples is not available with --agents")
     if not ns.all:
         tests = json.load(open(ns.tests, 'r'))
     else:
@@ -79,21 +93,17 @@ def main(ns):
                                       call_inherited=ns.call_inherited)
 
     if ns.serial:
-        for test in tests:
-            step_result = driver.stress_openstack([test],
-                                                  ns.duration,
-                                                  ns.number,
-                                                  ns.stop)
+        for index, test in enumerate(tests):
+            report = ns.report and '%s.%d' % (ns.report, index)
+            samples = ns.samples and '%s.%d' % (ns.samples, index)
+            step_result = stress(ns, [test], report, samples)
             # NOTE(mkoderer): we just save the last result code
             if (step_result != 0):
                 result = step_result
                 if ns.stop:
                     return result
     else:
-        result = driver.stress_openstack(tests,
-                                         ns.duration,
-                                         ns.number,
-                                         ns.stop)
+        result = stress(ns, tests, ns.report, ns.samples)
     return result
 
 
@@ -106,6 +116,16 @@ parser.add_argument('-S', '--stop', action='store_true',
                     default=False, help="Stop on first error")
 parser.add_argument('-n', '--number', type=int,
                     help="How often an action is executed for each process")
+parser.add_argument('-r', '--report',
+                    help="Name of the file to write the throughput and "
+                         "latency of each action to, as JSON. Each test "
+                         "gets its own file, suffixed with its index, when "
+                         "running tests serially")
+parser.add_argument('--samples',
+                    help="Name of the file to append samples of the "
+                         "statistics of each action to during the run, as "
+                         "JSON lines. Each test gets its own file, suffixed "
+                         "with its index, when running tests serially")
 group = parser.add_mutually_exclusive_group(required=True)
 group.add_argument('-a', '--all', action='store_true',
                    help="Execute all stress tests")
@@ -116,6 +136,14 @@ parser.add_argument('-i', '--call-inherited', action='store_true',
                     help="Call also inherited function with stress attribute")
 group.add_argument('-t', "--tests", nargs='?',
                    help="Name of the file with test description")
+group.add_argument('--agent', metavar='[HOST:]PORT',
+                   help="Run as a stress agent, running the tests sent by "
+                        "a coordinator connecting to this address. Listens "
+                        "on 127.0.0.1 unless a host is given, which needs "
+                        "the agent_secret option of the stress section")
+parser.add_argument('--agents', nargs='+', metavar='HOST:PORT',
+                    help="Run the tests on the stress agents listening at "
+                         "these addresses instead of locally")
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,114 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+
+from tempest.common import histogram
+
+# Latencies are counted in buckets whose upper bounds grow geometrically
+# from 10ms, up to about 16 minutes for the last one
+LATENCY_BASE = 0.01
+LATENCY_FACTOR = 1.2
+LATENCY_BUCKETS = 64
+
+
+class StatisticsBlock(object):
+    """
+    Counters of the stress worker processes, in shared memory
+
+    Each worker process has a slot of its own, with one counter per field
+    and the buckets of its latency histogram, which only it writes, so
+    that counters are updated without locks or IPC and read directly by
+    the driver. The block must be created before the workers are forked.
+    """
+
+    FIELDS = ('runs', 'fails', 'latency_total_us', 'latency_max_us',
+              'lag_total_us', 'lag_max_us')
+    SLOT_SIZE = len(FIELDS) + LATENCY_BUCKETS
+
+    def __init__(self, slots):
+        self.slots = slots
+        self._counters = multiprocessing.RawArray('l',
+                                                  slots * self.SLOT_SIZE)
+
+    def slot(self, index):
+        if not 0 <= index < self.slots:
+            raise IndexError(index)
+        return StatisticsSlot(self._counters, index * self.SLOT_SIZE)
+
+    def totals(self):
+        """Returns the sum of the runs and fails of all the slots."""
+        return dict((field, sum(self._counters[offset::self.SLOT_SIZE]))
+                    for offset, field in enumerate(self.FIELDS[:2]))
+
+
+class StatisticsSlot(object):
+    """
+    Counters of a worker process, read and written like a dict, e.g.
+    slot['runs'] += 1
+    """
+
+    def __init__(self, counters, offset):
+        self._counters = counters
+        self._offset = offset
+        self._histogram = histogram.Histogram(LATENCY_BASE, LATENCY_FACTOR)
+
+    def _index(self, field):
+        try:
+            return self._offset + StatisticsBlock.FIELDS.index(field)
+        except ValueError:
+            raise KeyError(field)
+
+    def __getitem__(self, field):
+        return self._counters[self._index(field)]
+
+    def __setitem__(self, field, value):
+        self._counters[self._index(field)] = value
+
+    def record_latency(self, secs):
+        """Counts the latency in seconds of a run."""
+        micros = int(secs * 1000000)
+        self['latency_total_us'] += micros
+        if micros > self['latency_max_us']:
+            self['latency_max_us'] = micros
+        bucket = min(self._histogram.bucket_index(secs), LATENCY_BUCKETS - 1)
+        self._counters[self._offset + len(StatisticsBlock.FIELDS) +
+                       bucket] += 1
+
+    def record_lag(self, secs):
+        """Counts how late in seconds a scheduled run started."""
+        micros = int(secs * 1000000)
+        self['lag_total_us'] += micros
+        if micros > self['lag_max_us']:
+            self['lag_max_us'] = micros
+
+    def latency(self):
+        """Returns the latency histogram of the runs, in seconds."""
+        latency = histogram.Histogram(LATENCY_BASE, LATENCY_FACTOR)
+        latency.total = self['latency_total_us'] / 1000000.0
+        latency.max = self['latency_max_us'] / 1000000.0
+        start = self._offset + len(StatisticsBlock.FIELDS)
+        for bucket, count in enumerate(
+                self._counters[start:start + LATENCY_BUCKETS]):
+            if count:
+                if bucket == LATENCY_BUCKETS - 1:
+                    # The last bucket holds all the longer latencies too
+                    bucket = max(bucket, latency.bucket_index(latency.max))
+                latency.buckets[bucket] = count
+                latency.count += count
+        return latency
+
+    def to_dict(self):
+        return dict(runs=self['runs'], fails=self['fails'])
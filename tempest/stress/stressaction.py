@@ -14,12 +14,30 @@
 
 import signal
 import sys
+import time
+import uuid
 
+from tempest.common.utils import data_utils
 from tempest.openstack.common import log as logging
 
 
+def new_run_id():
+    """Returns a new id to tag the resources of a stress run with."""
+    return 'run%s' % uuid.uuid4().hex[:8]
+
+
+def resource_name(prefix, run_id=None):
+    """Returns a random resource name, tagged with run_id if given."""
+    if run_id:
+        prefix = '%s-%s' % (prefix, run_id)
+    return data_utils.rand_name(prefix)
+
+
 class StressAction(object):
 
+    # Set by the driver, see resource_name()
+    run_id = None
+
     def __init__(self, manager, max_runs=None, stop_on_error=False):
         full_cname = self.__module__ + "." + self.__class__.__name__
         self.logger = logging.getLogger(full_cname)
@@ -34,6 +52,13 @@ class StressAction(object):
             self.logger.exception("Error while tearDown")
         sys.exit(0)
 
+    def resource_name(self, prefix):
+        """
+        Returns a random name for a resource created by the action, tagged
+        with the id of the stress run so that cleanup.cleanup() can find it.
+        """
+        return resource_name(prefix, self.run_id)
+
     @property
     def action(self):
         """This methods returns the action. Overload this if you
@@ -57,25 +82,44 @@ class StressAction(object):
         """
         self.logger.debug("tearDown")
 
-    def execute(self, shared_statistic):
+    def execute(self, shared_statistic, schedule=None):
         """This is the main execution entry point called
         by the driver.   We register a signal handler to
         allow us to tearDown gracefully, and then exit.
-        We also keep track of how many runs we do.
+        We also keep track of how many runs we do, and
+        how long they take.
+        If an arrival schedule is given, runs start at the
+        arrival times taken from it instead of back-to-back,
+        and how late they start is kept track of too.
+        Latencies and lags are only recorded by statistics
+        having record_latency() and record_lag(), e.g. a
+        statistics.StatisticsSlot.
         """
         signal.signal(signal.SIGHUP, self._shutdown_handler)
         signal.signal(signal.SIGTERM, self._shutdown_handler)
+        record_latency = getattr(shared_statistic, 'record_latency', None)
+        record_lag = getattr(shared_statistic, 'record_lag', None)
 
         while self.max_runs is None or (shared_statistic['runs'] <
                                         self.max_runs):
             self.logger.debug("Trigger new run (run %d)" %
                               shared_statistic['runs'])
+            if schedule is not None:
+                scheduled = schedule.next_arrival()
+                delay = scheduled - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            start = time.time()
+            if schedule is not None and record_lag is not None:
+                record_lag(max(0, start - scheduled))
             try:
                 self.run()
             except Exception:
                 shared_statistic['fails'] += 1
                 self.logger.exception("Failure in run")
             finally:
+                if record_latency is not None:
+                    record_latency(time.time() - start)
                 shared_statistic['runs'] += 1
                 if self.stop_on_error and (shared_statistic['fails'] > 1):
                     self.logger.warn("Stop process due to"
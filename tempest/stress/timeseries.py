@@ -0,0 +1,113 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import time
+
+from tempest.common import histogram
+
+
+class TimeSeriesWriter(object):
+    """
+    Appends samples of the statistics of each action to a file
+
+    Each sample is a JSON object on a line of its own, with the time it
+    was taken, the seconds elapsed since the start of the run, the name of
+    the action and its runs, fails and latency histogram so far. Lines are
+    flushed as they are written, so that the file can be analyzed while
+    the run goes on.
+    """
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self._file = open(path, 'a')
+
+    def sample(self, actions, elapsed):
+        now = time.time()
+        for name, action in sorted(actions.items()):
+            self._file.write(json.dumps(dict(
+                time=now, elapsed=elapsed, action=name,
+                runs=action['runs'], fails=action['fails'],
+                latency=action['latency'].to_dict())) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def load(path):
+    """Returns the samples of a time series file."""
+    samples = []
+    with open(path) as f:
+        for line in f:
+            try:
+                samples.append(json.loads(line))
+            except ValueError:
+                # The last line of a file being written may be partial
+                break
+    return samples
+
+
+def _interval_latency(previous, current):
+    """Returns the histogram of the latencies between two samples."""
+    latency = histogram.Histogram(current['base'], current['factor'])
+    previous_buckets = previous['buckets'] if previous else {}
+    for index, count in current['buckets'].items():
+        count -= previous_buckets.get(index, 0)
+        if count:
+            latency.buckets[int(index)] = count
+            latency.count += count
+    latency.total = current['total'] - (previous['total'] if previous else 0)
+    if previous is None or current['max'] > previous['max']:
+        latency.max = current['max']
+    elif latency.count:
+        # The maximum of the interval is within its highest bucket
+        latency.max = min(latency.base *
+                          latency.factor ** max(latency.buckets),
+                          current['max'])
+    return latency
+
+
+def analyze(samples):
+    """
+    Returns the throughput, error rate and latency percentiles of each
+    action between consecutive samples, as lists of points keyed by the
+    name of the action. A run started again, which has its elapsed time
+    go back, starts curves over.
+    """
+    curves = {}
+    previous = {}
+    for sample in samples:
+        name = sample['action']
+        last = previous.get(name)
+        if last is not None and sample['elapsed'] < last['elapsed']:
+            last = None
+        previous[name] = sample
+        interval = sample['elapsed'] - (last['elapsed'] if last else 0)
+        if interval <= 0:
+            continue
+        runs = sample['runs'] - (last['runs'] if last else 0)
+        fails = sample['fails'] - (last['fails'] if last else 0)
+        latency = _interval_latency(last and last['latency'],
+                                    sample['latency'])
+        curves.setdefault(name, []).append(dict(
+            elapsed=sample['elapsed'],
+            throughput=runs / float(interval),
+            error_rate=fails / float(runs) if runs else None,
+            p50=latency.percentile(50),
+            p90=latency.percentile(90),
+            p99=latency.percentile(99)))
+    return curves
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Print the throughput, error rate and latency curves of each action of a
+stress test time series file, as CSV.
+"""
+
+import argparse
+import csv
+import sys
+
+from tempest.stress import timeseries
+
+COLUMNS = ('elapsed', 'throughput', 'error_rate', 'p50', 'p90', 'p99')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('path', help='Path of the time series file')
+    parser.add_argument('-a', '--action',
+                        help='Only print the curves of this action')
+    args = parser.parse_args()
+
+    curves = timeseries.analyze(timeseries.load(args.path))
+    writer = csv.writer(sys.stdout)
+    writer.writerow(('action',) + COLUMNS)
+    for name, points in sorted(curves.items()):
+        if args.action and name != args.action:
+            continue
+        for point in points:
+            writer.writerow((name,) + tuple(
+                '' if point[column] is None else '%.3f' % point[column]
+                for column in COLUMNS))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,6 +14,9 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import sys
+
 from tempest.stress import cleanup
 
-cleanup.cleanup()
+# Without the id of a stress run, the resources of every tenant are removed
+cleanup.cleanup(sys.argv[1] if len(sys.argv) > 1 else None)
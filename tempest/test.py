@@ -31,6 +31,7 @@ import testtools
 from tempest import clients
 import tempest.common.generator.valid_generator as valid
 from tempest.common import isolated_creds
+from tempest.common import rest_client
 from tempest import config
 from tempest import exceptions
 from tempest.openstack.common import importutils
@@ -254,6 +255,7 @@ class BaseTestCase(BaseDeps):
 
     @classmethod
     def setUpClass(cls):
+        rest_client.set_caller(cls.__name__ + ":setUpClass")
         if hasattr(super(BaseTestCase, cls), 'setUpClass'):
             super(BaseTestCase, cls).setUpClass()
         cls.setUpClassCalled = True
@@ -294,6 +296,40 @@ class BaseTestCase(BaseDeps):
                                                    format=log_format,
                                                    level=None))
 
+    def run(self, result=None):
+        # Tell the rest client who is issuing requests, see
+        # RestClient._find_caller. Cleanups run after tearDown, so
+        # _run_cleanups is what is left over between the other steps.
+        rest_client.set_caller(self._caller_name('_run_cleanups'))
+        try:
+            return super(BaseTestCase, self).run(result)
+        finally:
+            # tearDownClass is left to RestClient._find_caller
+            rest_client.set_caller(None)
+
+    def _caller_name(self, method_name):
+        return self.__class__.__name__ + ":" + method_name
+
+    def _run_step(self, method_name, step, result):
+        rest_client.set_caller(self._caller_name(method_name))
+        try:
+            return step(result)
+        finally:
+            rest_client.set_caller(self._caller_name('_run_cleanups'))
+
+    def _run_setup(self, result):
+        return self._run_step('setUp', super(BaseTestCase, self)._run_setup,
+                              result)
+
+    def _run_test_method(self, result):
+        return self._run_step(self._testMethodName,
+                              super(BaseTestCase, self)._run_test_method,
+                              result)
+
+    def _run_teardown(self, result):
+        return self._run_step('tearDown',
+                              super(BaseTestCase, self)._run_teardown, result)
+
     @classmethod
     def get_client_manager(cls, interface=None):
         """
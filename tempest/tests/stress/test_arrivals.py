@@ -0,0 +1,103 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+
+from tempest import exceptions
+from tempest.stress import arrivals
+from tempest.stress import driver
+from tempest.stress import statistics
+from tempest.stress import stressaction
+from tempest.tests import base
+
+
+class CountingAction(stressaction.StressAction):
+    def run(self):
+        pass
+
+
+class TestArrivalSchedule(base.TestCase):
+
+    def test_constant(self):
+        schedule = arrivals.ArrivalSchedule(rate=4)
+        self.patch('time.time', return_value=100.0)
+        self.assertEqual([100.0, 100.25, 100.5],
+                         [schedule.next_arrival() for _ in range(3)])
+        self.assertEqual(100.0, schedule.start)
+        self.assertEqual(40, schedule.expected_arrivals(10))
+
+    def test_ramp(self):
+        schedule = arrivals.ArrivalSchedule('ramp', rate=1, end_rate=3,
+                                            ramp_duration=10)
+        self.assertEqual(2, schedule.rate_at(5))
+        self.assertEqual(3, schedule.rate_at(20))
+        self.assertEqual(20 + 30, schedule.expected_arrivals(20))
+
+    def test_step(self):
+        schedule = arrivals.ArrivalSchedule('step', rate=1, step=2,
+                                            step_interval=10)
+        self.assertEqual(1, schedule.rate_at(9))
+        self.assertEqual(5, schedule.rate_at(25))
+        self.assertEqual(10 + 30 + 25, schedule.expected_arrivals(25))
+
+    def test_poisson(self):
+        schedule = arrivals.ArrivalSchedule('poisson', rate=10)
+        self.patch('time.time', return_value=0.5)
+        last = None
+        for _ in range(1000):
+            last = schedule.next_arrival()
+        # 1000 arrivals at 10/s take 100s, give or take a few
+        self.assertTrue(90 < last < 110)
+
+    def test_invalid(self):
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          arrivals.ArrivalSchedule, 'sine')
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          arrivals.ArrivalSchedule, rate=0)
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          arrivals.ArrivalSchedule, 'ramp', end_rate=2)
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          arrivals.ArrivalSchedule, 'step', step=-1,
+                          step_interval=10)
+
+    def test_shared_by_worker_processes(self):
+        schedule = arrivals.ArrivalSchedule(rate=100)
+        block = statistics.StatisticsBlock(2)
+        processes = [multiprocessing.Process(
+            target=CountingAction(None, max_runs=5).execute,
+            args=(block.slot(index), schedule)) for index in range(2)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(10, block.totals()['runs'])
+        # The next arrival is the eleventh one
+        self.assertAlmostEqual(schedule.start + 0.1,
+                               schedule.next_arrival())
+
+    def test_open_loop_report(self):
+        schedule = arrivals.ArrivalSchedule(rate=2)
+        self.patch('time.time', return_value=100.0)
+        schedule.next_arrival()
+        slot = statistics.StatisticsBlock(1).slot(0)
+        slot['runs'] = 15
+        slot.record_lag(0.5)
+        slot.record_lag(1)
+        workers = [dict(action='a', statistic=slot, schedule=schedule)]
+        report = driver.stress_report(
+            driver.action_statistics(workers, stopped=110.0), 10, [])
+        self.assertEqual(dict(target_rate=2.0, achieved_rate=1.5,
+                              lag=dict(mean=0.1, max=1.0)),
+                         report['actions']['a']['open_loop'])
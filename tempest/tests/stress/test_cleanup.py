@@ -0,0 +1,128 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest import exceptions
+from tempest.stress import cleanup
+from tempest.stress import stressaction
+from tempest.tests import base
+
+RUN_ID = 'run1234abcd'
+
+
+def map_concurrently(func, items, return_exceptions=False):
+    results = []
+    for item in items:
+        try:
+            results.append(func(item))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class TestStressCleanup(base.TestCase):
+
+    def setUp(self):
+        super(TestStressCleanup, self).setUp()
+        self.manager = mock.Mock()
+        self.patch('tempest.clients.AdminManager', return_value=self.manager)
+        tagged = stressaction.resource_name('instance', RUN_ID)
+        self.manager.servers_client.list_servers.return_value = (
+            None, dict(servers=[dict(id='s1', name=tagged),
+                                dict(id='s2', name='instance-42')]))
+        self.manager.floating_ips_client.list_floating_ips.return_value = (
+            None, [dict(id='f1', instance_id='s1'),
+                   dict(id='f2', instance_id='s2'),
+                   dict(id='f3', instance_id=None)])
+        self.manager.keypairs_client.list_keypairs.return_value = (
+            None, [dict(keypair=dict(name='key-42'))])
+        self.manager.security_groups_client.list_security_groups.\
+            return_value = (None, [
+                dict(id='g1', name=stressaction.resource_name('sec_grp',
+                                                              RUN_ID)),
+                dict(id='g2', name='default')])
+        self.manager.snapshots_client.list_snapshots.return_value = (
+            None, [dict(id='sn1', display_name='snap-%s-1' % RUN_ID)])
+        self.manager.volumes_client.list_volumes.return_value = (
+            None, [dict(id='v1', display_name='volume-%s-1' % RUN_ID),
+                   dict(id='v2', display_name=None)])
+        self.manager.identity_client.get_users.return_value = (
+            None, [dict(id='u1', name=stressaction.resource_name(
+                'stress_user', RUN_ID)),
+                dict(id='u2', name='stress_user-42')])
+        self.manager.identity_client.list_tenants.return_value = (
+            None, [dict(id='t1', name='stress_tenant-%s-1' % RUN_ID)])
+        for client in (self.manager.servers_client,
+                       self.manager.floating_ips_client,
+                       self.manager.keypairs_client,
+                       self.manager.security_groups_client,
+                       self.manager.snapshots_client,
+                       self.manager.volumes_client,
+                       self.manager.identity_client):
+            client.map_concurrently.side_effect = map_concurrently
+
+    def _deleted(self, client, method):
+        return [args[0] for args, _ in
+                getattr(client, method).call_args_list]
+
+    def test_cleanup_run(self):
+        self.manager.volumes_client.delete_volume.side_effect = (
+            exceptions.NotFound())
+        cleanup.cleanup(RUN_ID)
+        self.assertEqual(
+            {"all_tenants": True, "name": RUN_ID},
+            self.manager.servers_client.list_servers.call_args[0][0])
+        self.assertEqual(['s1'], self._deleted(self.manager.servers_client,
+                                               'delete_server'))
+        self.manager.servers_client.wait_for_servers_termination.\
+            assert_called_once_with(['s1'], ignore_error=True)
+        self.assertEqual(['f1'], self._deleted(
+            self.manager.floating_ips_client, 'delete_floating_ip'))
+        self.assertEqual([], self._deleted(self.manager.keypairs_client,
+                                           'delete_keypair'))
+        self.assertEqual(['g1'], self._deleted(
+            self.manager.security_groups_client, 'delete_security_group'))
+        self.assertEqual(['sn1'], self._deleted(
+            self.manager.snapshots_client, 'delete_snapshot'))
+        self.assertEqual(['v1'], self._deleted(
+            self.manager.volumes_client, 'delete_volume'))
+        self.manager.volumes_client.wait_for_resources_deletion.\
+            assert_called_once_with(['v1'])
+        self.assertEqual(['u1'], self._deleted(
+            self.manager.identity_client, 'delete_user'))
+        self.assertEqual(['t1'], self._deleted(
+            self.manager.identity_client, 'delete_tenant'))
+
+    def test_cleanup_all(self):
+        cleanup.cleanup()
+        self.assertEqual(
+            {"all_tenants": True},
+            self.manager.servers_client.list_servers.call_args[0][0])
+        self.assertEqual(['f1', 'f2', 'f3'], self._deleted(
+            self.manager.floating_ips_client, 'delete_floating_ip'))
+        self.assertEqual(['key-42'], self._deleted(
+            self.manager.keypairs_client, 'delete_keypair'))
+        self.assertEqual(['v1', 'v2'], self._deleted(
+            self.manager.volumes_client, 'delete_volume'))
+        self.assertEqual(['u1', 'u2'], self._deleted(
+            self.manager.identity_client, 'delete_user'))
+
+    def test_resource_name(self):
+        action = stressaction.StressAction(None)
+        self.assertTrue(action.resource_name('volume').startswith('volume-'))
+        action.run_id = RUN_ID
+        self.assertTrue(action.resource_name('volume').startswith(
+            'volume-%s-' % RUN_ID))
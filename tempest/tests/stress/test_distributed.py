@@ -0,0 +1,140 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import socket
+import threading
+
+import mock
+
+from tempest import config
+from tempest import exceptions
+from tempest.stress import distributed
+from tempest.stress import driver
+from tempest.stress import statistics
+from tempest.tests import base
+from tempest.tests import fake_config
+
+TESTS = [dict(action='tempest.stress.actions.volume_create_delete.'
+                     'VolumeCreateDeleteTest', threads=2)]
+
+
+def fake_workers(tests, max_runs, stop_on_error, run_id=None):
+    block = statistics.StatisticsBlock(2)
+    workers = [dict(action='volume', statistic=block.slot(index))
+               for index in range(2)]
+    for worker in workers:
+        worker['statistic']['runs'] = 10
+        worker['statistic'].record_latency(1)
+    return workers, dict(duration=3.0, tenants=1.0, authentication=1.0,
+                         setup=1.0)
+
+
+def fake_run(workers, duration, max_runs, stop_on_error, stop_event,
+             snapshot_callback):
+    snapshot_callback(driver.throughput_snapshot(
+        driver.action_statistics(workers), 5, None))
+    return False, 100.0, 100.0 + duration, []
+
+
+class TestDistributedStress(base.TestCase):
+
+    def setUp(self):
+        super(TestDistributedStress, self).setUp()
+        self.prepare_workers = self.patch(
+            'tempest.stress.driver.prepare_workers', side_effect=fake_workers)
+        self.patch('tempest.stress.driver.run_workers', side_effect=fake_run)
+
+    def _agents(self, count, secret='secret'):
+        connections = []
+        for index in range(count):
+            coordinator_sock, agent_sock = socket.socketpair()
+            agent = distributed.Connection(agent_sock, 'coordinator')
+            thread = threading.Thread(
+                target=distributed._run_agent_session, args=(agent, secret))
+            thread.daemon = True
+            thread.start()
+            connections.append(
+                distributed.Connection(coordinator_sock, 'agent%d' % index))
+            self.addCleanup(agent.close)
+            self.addCleanup(connections[-1].close)
+        return connections
+
+    def test_parse_address(self):
+        self.assertEqual(('host', 4242),
+                         distributed.parse_address('host:4242'))
+        self.assertEqual(('127.0.0.1', 4242),
+                         distributed.parse_address('4242'))
+        self.assertEqual(('localhost', 4242),
+                         distributed.parse_address('4242', 'localhost'))
+
+    def test_agent_needs_secret_on_other_interfaces(self):
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          distributed.serve_agent, '0.0.0.0:4242')
+
+    def test_wrong_secret(self):
+        self.assertRaises(exceptions.StressAgentError,
+                          distributed._coordinate, self._agents(1), TESTS,
+                          10, None, False, None, 'wrong')
+        self.assertFalse(self.prepare_workers.called)
+
+    def test_actions_round_trip(self):
+        workers, _ = fake_workers(TESTS, None, False)
+        actions = driver.action_statistics(workers)
+        data = json.loads(json.dumps(distributed.actions_to_dict(actions)))
+        merged = distributed.merge_actions([data, data])
+        self.assertEqual(40, merged['volume']['runs'])
+        self.assertEqual(4, merged['volume']['latency'].count)
+        self.assertEqual(1, merged['volume']['latency'].percentile(50))
+
+    def test_coordinate_agents(self):
+        results, snapshots, startup = distributed._coordinate(
+            self._agents(2), TESTS, 10, None, False, 'run1234abcd', 'secret')
+        self.assertEqual(3.0, startup['duration'])
+        self.prepare_workers.assert_called_with(TESTS, None, False,
+                                                'run1234abcd')
+        self.assertEqual([10, 10], [result['duration']
+                                    for result in results])
+        self.assertEqual(dict(runs=40, fails=0, throughput=8.0),
+                         snapshots[0]['actions']['volume'])
+        actions = distributed.merge_actions(
+            [result['actions'] for result in results])
+        self.assertEqual(40, actions['volume']['runs'])
+
+    def test_agent_failing_to_prepare(self):
+        self.patch('tempest.stress.driver.prepare_workers',
+                   side_effect=exceptions.InvalidConfiguration('bad'))
+        self.assertRaises(exceptions.StressAgentError,
+                          distributed._coordinate, self._agents(1), TESTS,
+                          10, None, False, None, 'secret')
+
+    def test_agent_workers_terminated_on_failure(self):
+        terminate = self.patch('tempest.stress.driver.'
+                               'terminate_all_processes')
+        self.patch('tempest.stress.driver.run_workers',
+                   side_effect=exceptions.SSHTimeout(host='controller',
+                                                     user='u',
+                                                     password=None))
+        self.patch('tempest.stress.distributed._authenticate_coordinator',
+                   return_value=True)
+        connection = mock.Mock()
+        connection.receive.side_effect = [
+            dict(command='prepare', tests=TESTS),
+            dict(command='start', duration=10)]
+        self.assertRaises(exceptions.SSHTimeout,
+                          distributed._run_agent_session, connection)
+        self.assertTrue(terminate.called)
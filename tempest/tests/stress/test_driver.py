@@ -0,0 +1,109 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest import config
+from tempest import exceptions
+from tempest.stress import driver
+from tempest.tests import base
+from tempest.tests import fake_config
+from tempest.tests.stress import test_statistics
+
+ACTION = 'tempest.tests.stress.test_statistics.CountingAction'
+FAILING_ACTION = 'tempest.tests.stress.test_driver.FailingSecondSetUp'
+
+
+class FailingSecondSetUp(test_statistics.CountingAction):
+    set_ups = 0
+
+    def setUp(self, **kwargs):
+        FailingSecondSetUp.set_ups += 1
+        if FailingSecondSetUp.set_ups == 2:
+            raise ValueError("setUp failed")
+
+
+class TestPrepareWorkers(base.TestCase):
+
+    def setUp(self):
+        super(TestPrepareWorkers, self).setUp()
+        self.conf_fixture = self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.admin_manager = mock.Mock()
+        identity_client = self.admin_manager.identity_client
+        identity_client.create_tenant.return_value = (None, dict(id='t'))
+        identity_client.map_concurrently.side_effect = (
+            lambda func, items: [func(item) for item in items])
+        self.patch('tempest.clients.AdminManager',
+                   return_value=self.admin_manager)
+        self.manager = self.patch('tempest.clients.Manager')
+        self.stubs.Set(driver, 'processes', [])
+
+    def _run(self, workers):
+        for worker in workers:
+            worker['start_event'].set()
+        for worker in workers:
+            worker['process'].join()
+
+    def test_isolated_tenants(self):
+        workers, startup = driver.prepare_workers(
+            [dict(action=ACTION, threads=3, use_isolated_tenants=True),
+             dict(action=ACTION, threads=2)], max_runs=1)
+        self._run(workers)
+        self.assertEqual(
+            3, self.admin_manager.identity_client.create_user.call_count)
+        usernames = set(kwargs['username'] for _, kwargs
+                        in self.manager.call_args_list if kwargs)
+        self.assertEqual(3, len(usernames))
+        self.assertEqual(4, self.manager.call_count)
+        self.assertEqual([1] * 5, [worker['statistic']['runs']
+                                   for worker in workers])
+        self.assertEqual(set(['duration', 'tenants', 'authentication',
+                              'setup']), set(startup))
+
+    def test_workers_wait_to_be_started(self):
+        workers, _ = driver.prepare_workers(
+            [dict(action=ACTION, threads=2, use_admin=True)], max_runs=1)
+        self.assertFalse(self.manager.called)
+        self.assertTrue(all(worker['process'].is_alive()
+                            for worker in workers))
+        self.assertEqual(0, workers[0]['statistic']['runs'])
+        self._run(workers)
+        self.assertEqual(1, workers[1]['statistic']['runs'])
+
+    def test_setup_failure_forks_no_worker(self):
+        self.stubs.Set(FailingSecondSetUp, 'set_ups', 0)
+        forked = self.patch('multiprocessing.Process')
+        self.assertRaises(ValueError, driver.prepare_workers,
+                          [dict(action=FAILING_ACTION, threads=2)],
+                          max_runs=1)
+        self.assertEqual(2, FailingSecondSetUp.set_ups)
+        self.assertFalse(forked.called)
+        self.assertEqual([], driver.processes)
+
+    def test_workers_terminated_if_run_fails_to_start(self):
+        self.conf_fixture.config(target_logfiles='/var/log/nova/*.log',
+                                 group='stress')
+        self.patch('tempest.stress.driver._get_compute_nodes',
+                   side_effect=exceptions.SSHTimeout(host='controller',
+                                                     user='u',
+                                                     password=None))
+        workers, _ = driver.prepare_workers(
+            [dict(action=ACTION, threads=2, use_admin=True)], max_runs=1)
+        self.assertRaises(exceptions.SSHTimeout, driver.run_workers,
+                          workers, 10, max_runs=1)
+        self.assertFalse(any(worker['process'].is_alive()
+                             for worker in workers))
+        self.assertEqual([], driver.processes)
@@ -0,0 +1,89 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import subprocess
+
+import fixtures
+
+from tempest import exceptions
+from tempest.stress import log_scanner
+from tempest.tests import base
+
+ERROR = '2014-05-06 10:11:12.345 ERROR nova.compute.manager [-] Boom\n'
+INFO = '2014-05-06 10:11:13.000 INFO nova.compute.manager [-] Fine\n'
+
+
+def run_locally(command):
+    return subprocess.check_output(['bash', '-c', command])
+
+
+class TestLogScanner(base.TestCase):
+
+    def setUp(self):
+        super(TestLogScanner, self).setUp()
+        self.log_dir = self.useFixture(fixtures.TempDir()).path
+        self.patch('tempest.common.ssh.Client.exec_command',
+                   side_effect=run_locally)
+        self.scanner = log_scanner.LogScanner(
+            ['node1', 'node2'], os.path.join(self.log_dir, '*.log'), 'user')
+
+    def _log(self, name, *lines):
+        with open(os.path.join(self.log_dir, name), 'a') as f:
+            f.writelines(lines)
+
+    def test_only_new_errors(self):
+        self._log('n-cpu.log', ERROR, INFO)
+        self.scanner.mark()
+        self.assertEqual([], self.scanner.scan())
+        self._log('n-cpu.log', INFO, ERROR)
+        self._log('n-api.log', ERROR)
+        errors = self.scanner.scan()
+        # The same files are read on both nodes
+        self.assertEqual(4, len(errors))
+        self.assertEqual(set(['n-cpu.log', 'n-api.log']),
+                         set(os.path.basename(error.path)
+                             for error in errors))
+        self.assertEqual(set(['2014-05-06 10:11:12.345']),
+                         set(error.timestamp for error in errors))
+        self.assertEqual(ERROR.strip(), errors[0].line)
+        self.assertEqual([], self.scanner.scan())
+
+    def test_truncated_file(self):
+        self._log('n-cpu.log', INFO, INFO)
+        self.scanner.mark()
+        open(os.path.join(self.log_dir, 'n-cpu.log'), 'w').write(ERROR)
+        self.assertEqual(2, len(self.scanner.scan()))
+
+    def test_node_failure(self):
+        self.patch('tempest.common.ssh.Client.exec_command',
+                   side_effect=exceptions.SSHTimeout(host='node1', user='u',
+                                                     password=None))
+        self.assertEqual([], self.scanner.scan())
+
+    def test_mark_failure(self):
+        self._log('n-cpu.log', ERROR)
+        exec_command = self.patch(
+            'tempest.common.ssh.Client.exec_command',
+            side_effect=exceptions.SSHTimeout(host='node1', user='u',
+                                              password=None))
+        self.scanner.mark()
+        self.assertEqual(set(['node1', 'node2']), self.scanner.unmarked)
+        # The next scan marks the nodes instead of reporting old errors
+        exec_command.side_effect = run_locally
+        self.assertEqual([], self.scanner.scan())
+        self.assertEqual(set(), self.scanner.unmarked)
+        self._log('n-cpu.log', ERROR)
+        self.assertEqual(2, len(self.scanner.scan()))
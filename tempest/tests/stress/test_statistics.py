@@ -0,0 +1,108 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+
+from tempest.stress import driver
+from tempest.stress import statistics
+from tempest.stress import stressaction
+from tempest.tests import base
+
+
+class CountingAction(stressaction.StressAction):
+    def run(self):
+        pass
+
+
+class TestStatisticsBlock(base.TestCase):
+
+    def setUp(self):
+        super(TestStatisticsBlock, self).setUp()
+        self.block = statistics.StatisticsBlock(3)
+
+    def test_slots_are_separate(self):
+        self.block.slot(0)['runs'] += 2
+        self.block.slot(1)['fails'] = 1
+        self.assertEqual(dict(runs=2, fails=0), self.block.slot(0).to_dict())
+        self.assertEqual(dict(runs=0, fails=1), self.block.slot(1).to_dict())
+        self.assertEqual(dict(runs=2, fails=1), self.block.totals())
+
+    def test_unknown_slot_or_field(self):
+        self.assertRaises(IndexError, self.block.slot, 3)
+        self.assertRaises(KeyError, self.block.slot(0).__getitem__, 'foo')
+
+    def test_updated_by_worker_process(self):
+        action = CountingAction(None, max_runs=5)
+        process = multiprocessing.Process(target=action.execute,
+                                          args=(self.block.slot(2),))
+        process.start()
+        process.join()
+        self.assertEqual(dict(runs=5, fails=0), self.block.slot(2).to_dict())
+
+    def test_latency(self):
+        slot = self.block.slot(1)
+        for secs in (0.005, 0.1, 0.2, 1.5):
+            slot.record_latency(secs)
+        latency = slot.latency()
+        self.assertEqual(4, latency.count)
+        self.assertAlmostEqual(1.805, latency.total)
+        self.assertEqual(1.5, latency.max)
+        self.assertEqual(1.5, latency.percentile(99))
+        self.assertTrue(0.1 <= latency.percentile(50) < 0.1 * 1.2)
+        self.assertEqual(0, self.block.slot(0).latency().count)
+
+    def test_latency_out_of_range(self):
+        slot = self.block.slot(0)
+        slot.record_latency(100000)
+        self.assertEqual(100000, slot.latency().percentile(50))
+        self.assertEqual(0, self.block.slot(1).latency().count)
+
+
+class TestStressReport(base.TestCase):
+
+    def setUp(self):
+        super(TestStressReport, self).setUp()
+        block = statistics.StatisticsBlock(3)
+        self.workers = [dict(action=action, statistic=block.slot(index))
+                        for index, action in enumerate(('a', 'a', 'b'))]
+        for worker, runs in zip(self.workers, (10, 20, 5)):
+            for run in range(runs):
+                worker['statistic']['runs'] += 1
+                worker['statistic'].record_latency(0.5)
+        self.workers[2]['statistic']['fails'] = 1
+
+    def test_throughput_snapshots(self):
+        first = driver.throughput_snapshot(
+            driver.action_statistics(self.workers), 10, None)
+        self.assertEqual(dict(runs=30, fails=0, throughput=3.0),
+                         first['actions']['a'])
+        for run in range(15):
+            self.workers[0]['statistic']['runs'] += 1
+        second = driver.throughput_snapshot(
+            driver.action_statistics(self.workers), 15, first)
+        self.assertEqual(dict(runs=45, fails=0, throughput=3.0),
+                         second['actions']['a'])
+        self.assertEqual(0, second['actions']['b']['throughput'])
+
+    def test_report(self):
+        report = driver.stress_report(
+            driver.action_statistics(self.workers), 5, [])
+        self.assertEqual(5, report['duration'])
+        self.assertEqual(dict(runs=5, fails=1, throughput=1.0),
+                         dict((key, value) for key, value
+                              in report['actions']['b'].items()
+                              if key != 'latency'))
+        self.assertEqual(0.5, report['actions']['a']['latency']['max'])
+        self.assertAlmostEqual(0.5, report['actions']['a']['latency']['mean'])
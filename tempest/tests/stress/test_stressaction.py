@@ -61,3 +61,14 @@ class TestStressAction(tempest.test.BaseTestCase):
         stressAction.execute(stats)
         self.assertEqual(stats['runs'], 1)
         self.assertEqual(stats['fails'], 1)
+
+    def testStressTestRunRecordsLatency(self):
+        class RecordingStats(dict):
+            def record_latency(self, secs):
+                self.setdefault('latencies', []).append(secs)
+
+        stressAction = FakeStressAction(manager=None, max_runs=2)
+        stats = RecordingStats(self._bulid_stats_dict())
+        stressAction.execute(stats)
+        self.assertEqual(stats['runs'], 2)
+        self.assertEqual(len(stats['latencies']), 2)
@@ -0,0 +1,77 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import fixtures
+
+from tempest.stress import driver
+from tempest.stress import statistics
+from tempest.stress import timeseries
+from tempest.tests import base
+
+
+class TestTimeSeries(base.TestCase):
+
+    def setUp(self):
+        super(TestTimeSeries, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'samples.jsonl')
+        self.writer = timeseries.TimeSeriesWriter(self.path, 10)
+        self.addCleanup(self.writer.close)
+        self.slot = statistics.StatisticsBlock(1).slot(0)
+        self.workers = [dict(action='volume', statistic=self.slot)]
+
+    def _run(self, runs, fails, latency):
+        for run in range(runs):
+            self.slot['runs'] += 1
+            self.slot.record_latency(latency)
+        self.slot['fails'] += fails
+
+    def _sample(self, elapsed):
+        self.writer.sample(driver.action_statistics(self.workers), elapsed)
+
+    def test_curves(self):
+        self._run(20, 0, 0.1)
+        self._sample(10)
+        self._run(10, 5, 2)
+        self._sample(20)
+        samples = timeseries.load(self.path)
+        self.assertEqual(2, len(samples))
+        points = timeseries.analyze(samples)['volume']
+        self.assertEqual([2.0, 1.0], [point['throughput']
+                                      for point in points])
+        self.assertEqual([0, 0.5], [point['error_rate']
+                                    for point in points])
+        self.assertTrue(points[0]['p99'] <= 0.1)
+        # Only the latencies of the interval count
+        self.assertTrue(1.6 < points[1]['p50'] <= 2)
+
+    def test_partial_line(self):
+        self._run(1, 0, 0.1)
+        self._sample(10)
+        with open(self.path, 'a') as f:
+            f.write('{"time": 1')
+        self.assertEqual(1, len(timeseries.load(self.path)))
+
+    def test_new_run(self):
+        self._run(10, 0, 0.1)
+        self._sample(10)
+        self._sample(20)
+        self._sample(10)
+        points = timeseries.analyze(timeseries.load(self.path))['volume']
+        self.assertEqual([1.0, 0.0, 1.0], [point['throughput']
+                                           for point in points])
+        self.assertIsNone(points[1]['error_rate'])
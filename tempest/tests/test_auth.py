@@ -16,6 +16,8 @@
 import copy
 import datetime
 
+import fixtures
+
 from tempest import auth
 from tempest.common import http
 from tempest import config
@@ -45,8 +47,10 @@ class BaseAuthTestsSetUp(base.TestCase):
         super(BaseAuthTestsSetUp, self).setUp()
         self.useFixture(fake_config.ConfigFixture())
         self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        # Do not share tokens between tests
+        self.stubs.Set(auth, '_TOKEN_CACHE', None)
         self.fake_http = fake_http.fake_httplib2(return_type=200)
-        self.stubs.Set(http.ClosingHttp, 'request', self.fake_http.request)
+        self.stubs.Set(http.PooledHttp, 'request', self.fake_http.request)
         self.auth_provider = self._auth(self.credentials)
 
 
@@ -107,7 +111,7 @@ class TestKeystoneV2AuthProvider(BaseAuthTestsSetUp):
 
     def setUp(self):
         super(TestKeystoneV2AuthProvider, self).setUp()
-        self.stubs.Set(http.ClosingHttp, 'request',
+        self.stubs.Set(http.PooledHttp, 'request',
                        fake_identity._fake_v2_response)
         self.target_url = 'test_api'
 
@@ -298,6 +302,49 @@ class TestKeystoneV2AuthProvider(BaseAuthTestsSetUp):
         expected = 'http://fake_url/'
         self._test_base_url_helper(expected, self.filters)
 
+    def test_base_url_memoized(self):
+        self.filters = {
+            'service': 'compute',
+            'endpoint_type': 'publicURL',
+            'region': 'FakeRegion'
+        }
+        base_url_mock = self.useFixture(mockpatch.PatchObject(
+            self.auth_provider, '_base_url',
+            wraps=self.auth_provider._base_url)).mock
+        first_url = self.auth_provider.base_url(self.filters)
+        self.assertEqual(first_url, self.auth_provider.base_url(self.filters))
+        self.assertEqual(1, base_url_mock.call_count)
+
+    def test_base_url_memoized_per_filters(self):
+        self.filters = {
+            'service': 'compute',
+            'endpoint_type': 'publicURL',
+            'region': 'FakeRegion'
+        }
+        self.auth_provider.base_url(self.filters)
+        self.filters['api_version'] = 'v12'
+        expected = self._get_result_url_from_endpoint(
+            self._endpoints[0]['endpoints'][1], replacement='v12')
+        self._test_base_url_helper(expected, self.filters)
+
+    def test_base_url_forgotten_on_new_token(self):
+        self.filters = {
+            'service': 'compute',
+            'endpoint_type': 'publicURL',
+            'region': 'FakeRegion'
+        }
+        self.useFixture(mockpatch.PatchObject(self.auth_provider,
+                                              'is_expired',
+                                              return_value=False))
+        self.auth_provider.base_url(self.filters)
+        token, access = self.auth_provider.auth_data
+        self.auth_provider.cache = ('new_token', access)
+        base_url_mock = self.useFixture(mockpatch.PatchObject(
+            self.auth_provider, '_base_url',
+            wraps=self.auth_provider._base_url)).mock
+        self.auth_provider.base_url(self.filters)
+        self.assertEqual(1, base_url_mock.call_count)
+
     def test_token_not_expired(self):
         expiry_data = datetime.datetime.utcnow() + datetime.timedelta(days=1)
         auth_data = self._auth_data_with_expiry(
@@ -330,7 +377,7 @@ class TestKeystoneV3AuthProvider(TestKeystoneV2AuthProvider):
 
     def setUp(self):
         super(TestKeystoneV3AuthProvider, self).setUp()
-        self.stubs.Set(http.ClosingHttp, 'request',
+        self.stubs.Set(http.PooledHttp, 'request',
                        fake_identity._fake_v3_response)
 
     def _get_fake_alt_identity(self):
@@ -361,3 +408,67 @@ class TestKeystoneV3AuthProvider(TestKeystoneV2AuthProvider):
         expected = self._get_result_url_from_endpoint(
             self._endpoints[0]['endpoints'][2])
         self._test_base_url_helper(expected, self.filters)
+
+
+class TestSharedTokenCache(BaseAuthTestsSetUp):
+    _auth_provider_class = auth.KeystoneV2AuthProvider
+
+    def setUp(self):
+        super(TestSharedTokenCache, self).setUp()
+        self.fetch_mock = self.useFixture(mockpatch.PatchObject(
+            self._auth_provider_class, '_fetch_auth',
+            side_effect=self._fetch_auth)).mock
+        self.tokens = iter(['token1', 'token2', 'token3'])
+
+    def _fetch_auth(self):
+        access = copy.deepcopy(
+            fake_identity.IDENTITY_V2_RESPONSE['access'])
+        expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        access['token']['expires'] = expiry.strftime(
+            self._auth_provider_class.EXPIRY_DATE_FORMAT)
+        return next(self.tokens), access
+
+    def test_token_shared_between_providers(self):
+        other_provider = self._auth(self.credentials)
+        self.assertEqual('token1', self.auth_provider.get_token())
+        self.assertEqual('token1', other_provider.get_token())
+        self.assertEqual(1, self.fetch_mock.call_count)
+
+    def test_token_not_shared_between_credentials(self):
+        credentials = dict(self.credentials, username='other_user')
+        other_provider = self._auth(credentials)
+        self.assertEqual('token1', self.auth_provider.get_token())
+        self.assertEqual('token2', other_provider.get_token())
+
+    def test_expired_token_refreshed(self):
+        self.auth_provider.get_token()
+        other_provider = self._auth(self.credentials)
+        self.useFixture(mockpatch.PatchObject(
+            self._auth_provider_class, 'is_expired',
+            side_effect=lambda auth_data: auth_data[0] == 'token1'))
+        self.assertEqual('token2', other_provider.get_token())
+
+    def test_clear_auth_invalidates_shared_token(self):
+        other_provider = self._auth(self.credentials)
+        self.auth_provider.get_token()
+        self.auth_provider.clear_auth()
+        self.assertEqual('token2', other_provider.get_token())
+
+    def test_token_shared_between_processes(self):
+        cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.auth_provider.get_token()
+        key = self.auth_provider.token_cache_key()
+        auth.TokenCache(cache_dir).get(key, self.auth_provider._fetch_auth,
+                                       self.auth_provider.is_expired)
+        auth_data = auth.TokenCache(cache_dir).get(
+            key, self.auth_provider._fetch_auth,
+            self.auth_provider.is_expired)
+        self.assertEqual('token2', auth_data[0])
+        self.assertEqual(2, self.fetch_mock.call_count)
+
+    def test_shared_token_cache_disabled(self):
+        cfg = self.useFixture(fake_config.ConfigFixture())
+        cfg.config(shared_token_cache=False, group='identity')
+        other_provider = self._auth(self.credentials)
+        self.assertEqual('token1', self.auth_provider.get_token())
+        self.assertEqual('token2', other_provider.get_token())
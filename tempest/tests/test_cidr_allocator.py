@@ -0,0 +1,63 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import errno
+import json
+
+import fixtures
+
+from tempest.common import cidr_allocator
+from tempest.tests import base
+
+
+class TestCidrAllocator(base.TestCase):
+
+    def setUp(self):
+        super(TestCidrAllocator, self).setUp()
+        self.state_dir = self.useFixture(fixtures.TempDir()).path
+        self.allocator = cidr_allocator.CidrAllocator('10.100.0.0/24', 26,
+                                                      self.state_dir)
+
+    def test_allocate_distinct_cidrs(self):
+        self.assertEqual(['10.100.0.0/26', '10.100.0.64/26'],
+                         [self.allocator.allocate(),
+                          self.allocator.allocate()])
+
+    def test_allocations_shared_between_allocators(self):
+        other = cidr_allocator.CidrAllocator('10.100.0.0/24', 26,
+                                             self.state_dir)
+        self.assertNotEqual(self.allocator.allocate(), other.allocate())
+
+    def test_all_cidrs_allocated(self):
+        for _ in range(4):
+            self.assertIsNotNone(self.allocator.allocate())
+        self.assertIsNone(self.allocator.allocate())
+
+    def test_released_cidr_allocated_again(self):
+        cidr = self.allocator.allocate()
+        self.allocator.release(cidr)
+        self.assertEqual(cidr, self.allocator.allocate())
+
+    def test_cidr_of_dead_process_reclaimed(self):
+        with open(self.allocator.path, 'w') as f:
+            json.dump({'10.100.0.0/26': 1234567}, f)
+        self.patch('os.kill', side_effect=OSError(errno.ESRCH, 'No process'))
+        self.assertEqual('10.100.0.0/26', self.allocator.allocate())
+
+    def test_cidr_of_live_process_kept(self):
+        with open(self.allocator.path, 'w') as f:
+            json.dump({'10.100.0.0/26': 1234567}, f)
+        self.patch('os.kill')
+        self.assertEqual('10.100.0.64/26', self.allocator.allocate())
@@ -0,0 +1,126 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import subprocess
+import sys
+
+from tempest import clients
+from tempest import config
+from tempest import exceptions
+from tempest import manager
+from tempest.services.compute.json import servers_client
+from tempest.services.compute.xml import servers_client as servers_client_xml
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class FakeClient(object):
+
+    def __init__(self, auth_provider):
+        self.auth_provider = auth_provider
+
+
+class FakeManager(manager.Manager):
+
+    json_client = manager.ServiceClient(
+        'test_clients', json='FakeClient', package='tempest.tests')
+    common_client = manager.ServiceClient(
+        'test_clients', json='FakeClient', xml='FakeClient',
+        package='tempest.tests')
+    ceilometer_client = manager.ServiceClient(
+        'test_clients', json='FakeClient', service='ceilometer',
+        package='tempest.tests')
+
+    def __init__(self, interface='json'):
+        self.interface = interface
+        self.client_type = 'tempest'
+        super(FakeManager, self).__init__('fake_user', 'fake_pass',
+                                          'fake_tenant')
+
+
+class TestServiceClient(base.TestCase):
+
+    def setUp(self):
+        super(TestServiceClient, self).setUp()
+        self.conf_fixture = self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+
+    def test_client_built_once(self):
+        fake_manager = FakeManager()
+        client = fake_manager.json_client
+        self.assertIsInstance(client, FakeClient)
+        self.assertIs(fake_manager.auth_provider, client.auth_provider)
+        self.assertIs(client, fake_manager.json_client)
+
+    def test_client_not_shared_between_managers(self):
+        self.assertIsNot(FakeManager().json_client, FakeManager().json_client)
+
+    def test_client_not_available_for_interface(self):
+        fake_manager = FakeManager(interface='xml')
+        self.assertIsNotNone(fake_manager.common_client)
+        self.assertFalse(hasattr(fake_manager, 'json_client'))
+
+    def test_client_for_unavailable_service(self):
+        self.conf_fixture.config(ceilometer=False, group='service_available')
+        self.assertFalse(hasattr(FakeManager(), 'ceilometer_client'))
+
+    def test_client_can_be_replaced(self):
+        fake_manager = FakeManager()
+        fake_manager.json_client = 'fake_client'
+        self.assertEqual('fake_client', fake_manager.json_client)
+
+
+class TestManager(base.TestCase):
+
+    def setUp(self):
+        super(TestManager, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+
+    def _get_manager(self, interface='json'):
+        return clients.Manager('fake_user', 'fake_pass', 'fake_tenant',
+                               interface=interface)
+
+    def test_no_client_built_on_init(self):
+        self.assertEqual({}, self._get_manager()._clients)
+
+    def test_client_for_interface(self):
+        self.assertIsInstance(self._get_manager().servers_client,
+                              servers_client.ServersClientJSON)
+        self.assertIsInstance(self._get_manager('xml').servers_client,
+                              servers_client_xml.ServersClientXML)
+
+    def test_negative_client_service(self):
+        os = clients.Manager('fake_user', 'fake_pass', 'fake_tenant',
+                             service='compute')
+        self.assertEqual('compute', os.negative_client.service)
+
+    def test_service_clients_not_imported(self):
+        # Only the identity clients, which the auth providers use, should be
+        # imported with the managers
+        script = ("import sys; import tempest.clients; "
+                  "print(' '.join(sorted(sys.modules)))")
+        modules = subprocess.check_output(
+            [sys.executable, '-c', script]).split()
+        self.assertEqual([], [module for module in modules
+                              if module.startswith('tempest.services.') and
+                              not module.startswith('tempest.services.'
+                                                    'identity')])
+        self.assertNotIn('boto', modules)
+        self.assertNotIn('keystoneclient', modules)
+
+    def test_unsupported_interface(self):
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          self._get_manager, 'yaml')
@@ -0,0 +1,94 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+import subprocess
+import sys
+
+import fixtures
+
+from tempest.common import credential_pool
+from tempest import exceptions
+from tempest.tests import base
+
+ACCOUNTS = [
+    dict(username='user1', password='pass1', tenant_name='tenant1',
+         user_id='u1', tenant_id='t1', admin=False),
+    dict(username='user2', password='pass2', tenant_name='tenant2',
+         user_id='u2', tenant_id='t2', admin=False),
+    dict(username='admin1', password='pass3', tenant_name='tenant3',
+         user_id='u3', tenant_id='t3', admin=True),
+]
+
+LOCK_SCRIPT = """
+import fcntl
+import sys
+lock_file = open(sys.argv[1], 'w')
+fcntl.lockf(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+print('locked')
+sys.stdout.flush()
+sys.stdin.read()
+"""
+
+
+class TestCredentialPool(base.TestCase):
+
+    def setUp(self):
+        super(TestCredentialPool, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'accounts.json')
+        with open(self.path, 'w') as f:
+            json.dump(ACCOUNTS, f)
+        self.pool = credential_pool.CredentialPool(self.path, timeout=0)
+
+    def test_lease_distinct_accounts(self):
+        self.assertEqual(['user1', 'user2'],
+                         sorted([self.pool.lease()['username'],
+                                 self.pool.lease()['username']]))
+
+    def test_lease_admin_account(self):
+        self.assertEqual('admin1', self.pool.lease(admin=True)['username'])
+
+    def test_no_free_account(self):
+        self.pool.lease(admin=True)
+        self.assertRaises(exceptions.TimeoutException, self.pool.lease,
+                          admin=True)
+
+    def test_released_account_leased_again(self):
+        account = self.pool.lease(admin=True)
+        self.pool.release(account)
+        self.assertEqual(account, self.pool.lease(admin=True))
+
+    def test_account_locked_by_other_process(self):
+        os.makedirs(self.pool.lock_dir)
+        lock_path = os.path.join(
+            self.pool.lock_dir,
+            self.pool.account_key(ACCOUNTS[2]) + '.lock')
+        locker = subprocess.Popen([sys.executable, '-c', LOCK_SCRIPT,
+                                   lock_path],
+                                  stdin=subprocess.PIPE,
+                                  stdout=subprocess.PIPE)
+        self.addCleanup(locker.communicate, '')
+        self.assertEqual('locked', locker.stdout.readline().strip())
+        self.assertRaises(exceptions.TimeoutException, self.pool.lease,
+                          admin=True)
+
+    def test_no_matching_account(self):
+        with open(self.path, 'w') as f:
+            json.dump(ACCOUNTS[:2], f)
+        pool = credential_pool.CredentialPool(self.path, timeout=0)
+        self.assertRaises(exceptions.InvalidConfiguration, pool.lease,
+                          admin=True)
@@ -0,0 +1,106 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import httplib2
+import mock
+
+from tempest.common import http
+from tempest import config
+from tempest.tests import base
+from tempest.tests import fake_config
+from tempest.tests import fake_http
+
+
+class TestHttpConnectionPool(base.TestCase):
+
+    key = ('http', 'fake_host:5000')
+
+    def setUp(self):
+        super(TestHttpConnectionPool, self).setUp()
+        self.pool = http.HttpConnectionPool(max_size=2, idle_timeout=60)
+
+    def test_get_new_connection(self):
+        http_obj = self.pool.get(self.key)
+        self.assertIsInstance(http_obj, httplib2.Http)
+
+    def test_connection_reused(self):
+        http_obj = self.pool.get(self.key)
+        self.pool.put(self.key, http_obj)
+        self.assertIs(http_obj, self.pool.get(self.key))
+
+    def test_connection_not_shared_between_endpoints(self):
+        http_obj = self.pool.get(self.key)
+        self.pool.put(self.key, http_obj)
+        self.assertIsNot(http_obj, self.pool.get(('http', 'other_host')))
+
+    def test_pool_size_is_bounded(self):
+        http_objs = [self.pool.get(self.key) for _ in range(3)]
+        for http_obj in http_objs:
+            self.pool.put(self.key, http_obj)
+        self.assertEqual(2, len(self.pool._idle[self.key]))
+
+    def test_idle_connection_evicted(self):
+        http_obj = self.pool.get(self.key)
+        time_mock = self.patch('time.time', return_value=100)
+        self.pool.put(self.key, http_obj)
+        time_mock.return_value = 161
+        self.assertIsNot(http_obj, self.pool.get(self.key))
+        self.assertEqual(0, len(self.pool._idle[self.key]))
+
+    def test_pool_reset_after_fork(self):
+        http_obj = self.pool.get(self.key)
+        self.pool.put(self.key, http_obj)
+        with mock.patch('os.getpid', return_value=-1):
+            self.assertIsNot(http_obj, self.pool.get(self.key))
+
+
+class TestPooledHttp(base.TestCase):
+
+    url = 'http://fake_host:5000/v2/servers'
+
+    def setUp(self):
+        super(TestPooledHttp, self).setUp()
+        self.pool = http.HttpConnectionPool()
+        self.http_obj = http.PooledHttp(self.pool)
+
+    def test_request_returns_connection(self):
+        self.stubs.Set(httplib2.Http, 'request',
+                       fake_http.fake_httplib2(200).request)
+        resp, _ = self.http_obj.request(self.url, 'GET')
+        self.assertEqual(200, resp.status)
+        self.assertEqual(1, len(self.pool._idle[('http', 'fake_host:5000')]))
+
+    def test_request_failure_drops_connection(self):
+        self.patch('httplib2.Http.request', side_effect=IOError)
+        self.assertRaises(IOError, self.http_obj.request, self.url, 'GET')
+        self.assertEqual(0, len(self.pool._idle[('http', 'fake_host:5000')]))
+
+
+class TestGetHttp(base.TestCase):
+
+    def setUp(self):
+        super(TestGetHttp, self).setUp()
+        self.conf_fixture = self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+
+    def test_pooled_by_default(self):
+        http_obj = http.get_http()
+        self.assertIsInstance(http_obj, http.PooledHttp)
+        self.assertIs(http_obj.pool, http.get_http().pool)
+
+    def test_closing_when_pooling_disabled(self):
+        self.conf_fixture.config(connection_pooling=False,
+                                 group='service-clients')
+        self.assertIsInstance(http.get_http(), http.ClosingHttp)
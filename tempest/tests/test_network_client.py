@@ -0,0 +1,82 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import urlparse
+
+from tempest import config
+from tempest.openstack.common.fixture import mockpatch
+from tempest.services.network.json import network_client
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+from tempest.tests import fake_config
+
+
+class TestNetworkClientList(base.TestCase):
+
+    def setUp(self):
+        super(TestNetworkClientList, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.client = network_client.NetworkClientJSON(
+            fake_auth_provider.FakeAuthProvider())
+        self.ports = [dict(id='port%d' % i) for i in range(5)]
+        self.get_mock = self.useFixture(mockpatch.PatchObject(
+            self.client, 'get', side_effect=self._get)).mock
+        self.pagination = True
+
+    def _get(self, uri):
+        query = urlparse.parse_qs(urlparse.urlparse(uri).query)
+        ports = self.ports
+        if self.pagination and 'limit' in query:
+            if 'marker' in query:
+                ids = [port['id'] for port in ports]
+                ports = ports[ids.index(query['marker'][0]) + 1:]
+            ports = ports[:int(query['limit'][0])]
+        return {'status': 200}, json.dumps({'ports': ports})
+
+    def _queries(self):
+        return [urlparse.parse_qs(urlparse.urlparse(call[0][0]).query)
+                for call in self.get_mock.call_args_list]
+
+    def test_list_with_filters(self):
+        resp, body = self.client.list_ports(
+            network_id='net1', device_owner=['network:dhcp', 'compute:nova'])
+        self.assertEqual(self.ports, body['ports'])
+        self.assertEqual([dict(network_id=['net1'],
+                               device_owner=['network:dhcp',
+                                             'compute:nova'])],
+                         self._queries())
+
+    def test_list_pages(self):
+        resp, body = self.client.list_ports(page_size=2, network_id='net1')
+        self.assertEqual(self.ports, body['ports'])
+        self.assertEqual([None, ['port1'], ['port3']],
+                         [query.get('marker') for query in self._queries()])
+        self.assertTrue(all(query['network_id'] == ['net1'] and
+                            query['limit'] == ['2']
+                            for query in self._queries()))
+
+    def test_list_pages_exact_multiple(self):
+        self.ports = self.ports[:4]
+        resp, body = self.client.list_ports(page_size=2)
+        self.assertEqual(self.ports, body['ports'])
+        self.assertEqual(3, self.get_mock.call_count)
+
+    def test_list_pagination_disabled(self):
+        self.pagination = False
+        resp, body = self.client.list_ports(page_size=5)
+        self.assertEqual(self.ports, body['ports'])
+        self.assertEqual(2, self.get_mock.call_count)
@@ -0,0 +1,84 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+from tempest.common import parallel
+from tempest.tests import base
+
+
+class TestExecutor(base.TestCase):
+
+    def test_submit(self):
+        with parallel.Executor(2) as executor:
+            future = executor.submit(lambda x, y: x + y, 1, y=2)
+            self.assertEqual(3, future.result())
+            self.assertIsNone(future.exception())
+
+    def test_submit_failure(self):
+        with parallel.Executor(2) as executor:
+            future = executor.submit(int, 'not_an_int')
+            self.assertRaises(ValueError, future.result)
+            self.assertIsInstance(future.exception(), ValueError)
+
+    def test_map_keeps_order(self):
+        with parallel.Executor(4) as executor:
+            self.assertEqual([x * 2 for x in range(20)],
+                             executor.map(lambda x: x * 2, range(20)))
+
+    def test_map_raises_after_all_calls(self):
+        calls = []
+
+        def call(item):
+            calls.append(item)
+            if item == 0:
+                raise ValueError()
+
+        self.assertRaises(ValueError, parallel.map_concurrently, call,
+                          range(5), 2)
+        self.assertEqual(range(5), sorted(calls))
+
+    def test_map_return_exceptions(self):
+        results = parallel.map_concurrently(int, ['1', 'x'], 2,
+                                            return_exceptions=True)
+        self.assertEqual(1, results[0])
+        self.assertIsInstance(results[1], ValueError)
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+        release = threading.Event()
+
+        def call(item):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+                if running[0] == 3:
+                    # Every call waits until 3 of them run at once
+                    release.set()
+            # With a timeout, so that a broken bound fails instead of hanging
+            release.wait(10)
+            with lock:
+                running[0] -= 1
+
+        parallel.map_concurrently(call, range(10), 3)
+        self.assertTrue(release.is_set())
+        self.assertEqual(3, max_running[0])
+
+    def test_submit_after_shutdown(self):
+        executor = parallel.Executor(1)
+        executor.shutdown()
+        self.assertRaises(RuntimeError, executor.submit, int, '1')
@@ -14,7 +14,11 @@
 
 import httplib2
 import json
+import socket
 
+import mock
+
+from tempest.common import http
 from tempest.common import rest_client
 from tempest.common import xml_utils as xml
 from tempest import config
@@ -84,6 +88,250 @@ class TestRestClientHTTPMethods(BaseRestClientTestClass):
         self.assertEqual('COPY', return_dict['method'])
 
 
+class TestRestClientFilters(BaseRestClientTestClass):
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientFilters, self).setUp()
+        self.endpoint_type_mock = self.useFixture(mockpatch.PatchObject(
+            self.rest_client, '_get_endpoint_type',
+            return_value='publicURL')).mock
+
+    def test_filters(self):
+        self.rest_client.service = 'compute'
+        self.rest_client.api_version = 'v12'
+        filters = self.rest_client.filters
+        self.assertEqual('compute', filters['service'])
+        self.assertEqual('publicURL', filters['endpoint_type'])
+        self.assertEqual('v12', filters['api_version'])
+
+    def test_endpoint_lookup_memoized(self):
+        self.rest_client.service = 'compute'
+        self.rest_client.filters
+        self.rest_client.filters
+        self.assertEqual(1, self.endpoint_type_mock.call_count)
+
+    def test_endpoint_lookup_per_service(self):
+        self.rest_client.service = 'compute'
+        self.rest_client.filters
+        self.rest_client.service = 'volume'
+        self.rest_client.filters
+        self.assertEqual(2, self.endpoint_type_mock.call_count)
+
+
+class TestRestClientCaller(BaseRestClientTestClass):
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientCaller, self).setUp()
+        self.addCleanup(rest_client.set_caller, None)
+
+    def test_caller_set_by_test(self):
+        rest_client.set_caller('FakeTest:test_fake')
+        find_caller = self.useFixture(mockpatch.PatchObject(
+            self.rest_client, '_find_caller')).mock
+        self.assertEqual('FakeTest:test_fake', self.rest_client._get_caller())
+        self.assertFalse(find_caller.called)
+
+    def test_caller_found_in_stack(self):
+        rest_client.set_caller(None)
+        self.assertEqual('TestRestClientCaller:test_caller_found_in_stack',
+                         self.rest_client._get_caller())
+
+    def test_caller_disabled(self):
+        cfg = self.useFixture(fake_config.ConfigFixture())
+        cfg.config(find_caller=False, group='debug')
+        rest_client.set_caller('FakeTest:test_fake')
+        self.assertIsNone(self.rest_client._get_caller())
+
+
+class TestRestClientMetrics(BaseRestClientTestClass):
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientMetrics, self).setUp()
+        self.metrics = rest_client.RequestMetrics()
+        self.stubs.Set(rest_client, 'METRICS', self.metrics)
+        self.useFixture(mockpatch.PatchObject(self.rest_client,
+                                              '_error_checker'))
+
+    def test_request_recorded(self):
+        self.rest_client.service = 'compute'
+        self.rest_client.get('servers/1234')
+        self.rest_client.get('servers/5678')
+        summary = self.metrics.summary()
+        self.assertEqual(1, len(summary))
+        self.assertEqual(('compute', 'GET', 'servers/{id}', 200, 2),
+                         (summary[0]['service'], summary[0]['method'],
+                          summary[0]['url'], summary[0]['status'],
+                          summary[0]['count']))
+
+    def test_url_template(self):
+        url = ('http://fake_url:8774/v2/c9c0c1f8b7b14e5a9c1bd5e2f3c4d5e6/'
+               'servers/6e7c1d2a-4b6f-4c8e-9b9a-1f2e3d4c5b6a/'
+               'os-volume_attachments/12?all_tenants=1')
+        self.assertEqual('v2/{id}/servers/{id}/os-volume_attachments/{id}',
+                         self.metrics.url_template(url))
+
+    def test_url_template_generated_name(self):
+        self.assertEqual('container/{name}/object',
+                         self.metrics.url_template(
+                             'container/TestContainer-1234567/object'))
+
+    def test_percentiles(self):
+        for secs in range(1, 101):
+            self.metrics.record('compute', 'GET', 'servers', 200,
+                                secs / 100.0, 100)
+        row = self.metrics.summary()[0]
+        self.assertAlmostEqual(0.505, row['latency_mean'])
+        self.assertEqual(1.0, row['latency_max'])
+        for percent in (50, 90, 99):
+            expected = percent / 100.0
+            self.assertTrue(expected <= row['latency_p%d' % percent] <=
+                            expected * 1.1)
+
+    def test_merge(self):
+        self.metrics.record('compute', 'GET', 'servers', 200, 0.1, 100)
+        other = rest_client.RequestMetrics()
+        other.record('compute', 'GET', 'servers', 200, 0.3, 300)
+        other.record('compute', 'DELETE', 'servers/1', 204, 0.2, 0)
+        self.metrics.merge(rest_client.RequestMetrics.from_dict(
+            json.loads(json.dumps(other.to_dict()))))
+        summary = self.metrics.summary()
+        self.assertEqual(2, len(summary))
+        self.assertEqual(2, summary[1]['count'])
+        self.assertEqual(300, summary[1]['size_max'])
+
+
+class TestRestClientMapConcurrently(BaseRestClientTestClass):
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientMapConcurrently, self).setUp()
+        self.useFixture(mockpatch.PatchObject(self.rest_client,
+                                              '_error_checker'))
+
+    def _get_method(self, url):
+        return self.rest_client.get(url)[1]['uri']
+
+    def test_map_concurrently(self):
+        urls = ['servers/%d' % i for i in range(10)]
+        self.assertEqual(urls, self.rest_client.map_concurrently(
+            self._get_method, urls))
+
+    def test_map_concurrently_keeps_caller(self):
+        rest_client.set_caller('FakeTest:test_fake')
+        self.addCleanup(rest_client.set_caller, None)
+        callers = self.rest_client.map_concurrently(
+            lambda _: rest_client.get_caller(), range(3))
+        self.assertEqual(['FakeTest:test_fake'] * 3, callers)
+
+    def test_map_concurrently_without_pooling(self):
+        map_mock = self.patch('tempest.common.parallel.map_concurrently')
+        self.rest_client.http_obj = http.ClosingHttp()
+        self.rest_client.map_concurrently(self._get_method, ['servers'])
+        self.assertEqual(1, map_mock.call_args[0][2])
+
+
+class TestRestClientRetry(BaseRestClientTestClass):
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientRetry, self).setUp()
+        self.useFixture(mockpatch.PatchObject(self.rest_client,
+                                              '_error_checker'))
+        self.sleep = self.patch('time.sleep')
+        self.metrics = rest_client.RequestMetrics()
+        self.stubs.Set(rest_client, 'METRICS', self.metrics)
+        self.rest_client.retry_policy.budget = rest_client.RetryBudget(0.2)
+
+    def _responses(self, *statuses, **headers):
+        responses = []
+        for status in statuses:
+            if isinstance(status, Exception):
+                responses.append(status)
+            else:
+                responses.append((httplib2.Response(
+                    dict(headers, status=str(status))), '{}'))
+        return self.useFixture(mockpatch.PatchObject(
+            self.rest_client, '_request', side_effect=responses)).mock
+
+    def test_retry_503_idempotent(self):
+        request = self._responses(503, 200)
+        resp, _ = self.rest_client.get(self.url)
+        self.assertEqual(200, resp.status)
+        self.assertEqual(2, request.call_count)
+        self.assertEqual(1, self.sleep.call_count)
+
+    def test_no_retry_503_not_idempotent(self):
+        request = self._responses(503, 200)
+        resp, _ = self.rest_client.post(self.url, {})
+        self.assertEqual(503, resp.status)
+        self.assertEqual(1, request.call_count)
+
+    def test_retry_429_not_idempotent(self):
+        self._responses(429, 202, **{'retry-after': '3'})
+        resp, _ = self.rest_client.post(self.url, {})
+        self.assertEqual(202, resp.status)
+        self.sleep.assert_called_once_with(3)
+
+    def test_retry_413_rate_limit(self):
+        self.useFixture(mockpatch.PatchObject(
+            self.rest_client, 'is_absolute_limit', return_value=False))
+        self._responses(413, 200, **{'retry-after': '1'})
+        resp, _ = self.rest_client.post(self.url, {})
+        self.assertEqual(200, resp.status)
+
+    def test_no_retry_413_absolute_limit(self):
+        self.useFixture(mockpatch.PatchObject(
+            self.rest_client, 'is_absolute_limit', return_value=True))
+        request = self._responses(413, 200, **{'retry-after': '1'})
+        resp, _ = self.rest_client.get(self.url)
+        self.assertEqual(413, resp.status)
+        self.assertEqual(1, request.call_count)
+
+    def test_retry_connection_error(self):
+        self._responses(socket.error(), 200)
+        resp, _ = self.rest_client.get(self.url)
+        self.assertEqual(200, resp.status)
+        self.assertEqual(1, self.metrics.summary()[0]['retries'])
+
+    def test_connection_error_not_retried_for_post(self):
+        self._responses(socket.error(), 200)
+        self.assertRaises(socket.error, self.rest_client.post, self.url, {})
+
+    def test_max_retries(self):
+        request = self._responses(503, 503, 503, 503)
+        resp, _ = self.rest_client.get(self.url)
+        self.assertEqual(503, resp.status)
+        self.assertEqual(3, request.call_count)
+
+    def test_backoff_grows(self):
+        self.rest_client.retry_policy.max_retries = 3
+        self._responses(503, 503, 503, 200)
+        with mock.patch('random.uniform', side_effect=lambda a, b: b):
+            self.rest_client.get(self.url)
+        self.assertEqual([mock.call(1.0), mock.call(2.0), mock.call(4.0)],
+                         self.sleep.call_args_list)
+
+    def test_retry_budget_exhausted(self):
+        self.rest_client.retry_policy.budget = rest_client.RetryBudget(
+            0.2, capacity=1)
+        request = self._responses(503, 503, 200)
+        resp, _ = self.rest_client.get(self.url)
+        self.assertEqual(503, resp.status)
+        self.assertEqual(2, request.call_count)
+
+    def test_custom_policy(self):
+        self.useFixture(fake_config.ConfigFixture()).config(
+            retry_policy='tempest.tests.test_rest_client.NoRetryPolicy',
+            group='service-clients')
+        client = rest_client.RestClient(
+            fake_auth_provider.FakeAuthProvider())
+        self.assertIsInstance(client.retry_policy, NoRetryPolicy)
+
+
+class NoRetryPolicy(object):
+    def get_delay(self, client, method, attempt, resp=None, resp_body=None,
+                  error=None):
+        return None
+
+
 class TestRestClientNotFoundHandling(BaseRestClientTestClass):
     def setUp(self):
         self.fake_http = fake_http.fake_httplib2(404)
@@ -200,3 +200,23 @@ class TestSshClient(base.TestCase):
         chan_mock.recv_stderr.assert_called_once_with(1024)
         chan_mock.recv_exit_status.assert_called_once_with()
         closed_prop.assert_called_once_with()
+
+    def test_persistent_connection(self):
+        gsc_mock = self.patch('tempest.common.ssh.Client._get_ssh_connection')
+        transport = gsc_mock.return_value.get_transport.return_value
+        client = ssh.Client('localhost', 'root', persistent=True)
+        self.assertIs(client._connect(), client._connect())
+        self.assertEqual(1, gsc_mock.call_count)
+        # Lost connections are opened again
+        transport.is_active.return_value = False
+        client._connect()
+        self.assertEqual(2, gsc_mock.call_count)
+        client.close()
+        gsc_mock.return_value.close.assert_called_once_with()
+
+    def test_connection_per_command(self):
+        gsc_mock = self.patch('tempest.common.ssh.Client._get_ssh_connection')
+        client = ssh.Client('localhost', 'root')
+        client._connect()
+        client._connect()
+        self.assertEqual(2, gsc_mock.call_count)
@@ -12,11 +12,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+import os
+
+import fixtures
 import keystoneclient.v2_0.client as keystoneclient
 from mock import patch
 import neutronclient.v2_0.client as neutronclient
 from oslo.config import cfg
 
+from tempest.common import cidr_allocator
 from tempest.common import isolated_creds
 from tempest import config
 from tempest import exceptions
@@ -33,8 +38,15 @@ class TestTenantIsolation(base.TestCase):
 
     def setUp(self):
         super(TestTenantIsolation, self).setUp()
-        self.useFixture(fake_config.ConfigFixture())
+        self.conf_fixture = self.useFixture(fake_config.ConfigFixture())
         self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        # Keeps the allocations of each test in a directory of its own
+        allocator = cidr_allocator.CidrAllocator(
+            cfg.CONF.network.tenant_network_cidr,
+            cfg.CONF.network.tenant_network_mask_bits,
+            self.useFixture(fixtures.TempDir()).path)
+        self.stubs.Set(cidr_allocator, 'get_cidr_allocator',
+                       lambda: allocator)
 
     def test_tempest_client(self):
         iso_creds = isolated_creds.IsolatedCreds('test class')
@@ -305,8 +317,11 @@ class TestTenantIsolation(base.TestCase):
         port_list_mock = patch.object(iso_creds.network_admin_client,
                                       'list_ports', return_value=(
                                       {'status': 200}, {'ports': []}))
-        port_list_mock.start()
+        list_ports = port_list_mock.start()
         iso_creds.clear_isolated_creds()
+        # Verify only the ports of the networks are listed
+        args = [call[2]['network_id'] for call in list_ports.mock_calls]
+        self.assertEqual(['1234', '12345', '123456'], sorted(args))
         # Verify remove router interface calls
         calls = remove_router_interface_mock.mock_calls
         self.assertEqual(len(calls), 3)
@@ -472,3 +487,50 @@ class TestTenantIsolation(base.TestCase):
         self._mock_tenant_create('1234', 'fake_prim_tenant')
         self.assertRaises(exceptions.InvalidConfiguration,
                           iso_creds.get_primary_creds)
+
+    @patch('tempest.common.rest_client.RestClient')
+    def test_pool_creds(self, MockRestClient):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'accounts.json')
+        with open(path, 'w') as f:
+            json.dump([dict(username='fake_pool_user', password='fake_pass',
+                            tenant_name='fake_pool_tenant', user_id='1234',
+                            tenant_id='5678', admin=False,
+                            network=dict(id='1', name='fake_pool_network'),
+                            subnet=None, router=None)], f)
+        self.conf_fixture.config(credential_pool_file=path, group='compute')
+        iso_creds = isolated_creds.IsolatedCreds('test class',
+                                                 password='fake_password')
+        create_user = self._mock_user_create('1234', 'fake_prim_user')
+        self.assertEqual(('fake_pool_user', 'fake_pool_tenant', 'fake_pass'),
+                         iso_creds.get_primary_creds())
+        self.assertEqual('5678', iso_creds.get_primary_user()['tenantId'])
+        self.assertEqual('5678', iso_creds.get_primary_tenant().id)
+        self.assertEqual('fake_pool_network',
+                         iso_creds.get_primary_network()['name'])
+        self.assertEqual([], create_user.mock.mock_calls)
+        delete_user = self.useFixture(mockpatch.PatchObject(
+            json_iden_client.IdentityClientJSON, 'delete_user'))
+        iso_creds.clear_isolated_creds()
+        self.assertEqual([], delete_user.mock.mock_calls)
+        # The account can be leased again once released
+        self.assertEqual('fake_pool_user', isolated_creds.IsolatedCreds(
+            'test class').get_primary_creds()[0])
+
+    @patch('tempest.common.rest_client.RestClient')
+    def test_cleanup_continues_after_error(self, MockRestClient):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        iso_creds = isolated_creds.IsolatedCreds('test class',
+                                                 password='fake_password')
+        self._mock_tenant_create('1234', 'fake_prim_tenant')
+        self._mock_user_create('1234', 'fake_prim_user')
+        iso_creds.get_primary_creds()
+        self.patch('tempest.services.identity.json.identity_client.'
+                   'IdentityClientJSON.delete_user',
+                   side_effect=exceptions.Unauthorized)
+        tenant_mock = self.patch(
+            'tempest.services.identity.json.identity_client.'
+            'IdentityClientJSON.delete_tenant')
+        self.assertRaises(exceptions.Unauthorized,
+                          iso_creds.clear_isolated_creds)
+        tenant_mock.assert_called_once_with('1234')
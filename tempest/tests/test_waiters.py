@@ -17,13 +17,18 @@ import time
 import mock
 
 from tempest.common import waiters
+from tempest import config
 from tempest import exceptions
 from tempest.tests import base
+from tempest.tests import fake_config
 
 
 class TestImageWaiters(base.TestCase):
     def setUp(self):
         super(TestImageWaiters, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.stubs.Set(waiters, 'WAIT_STATS', waiters.WaitStatistics())
         self.client = mock.MagicMock()
         self.client.build_timeout = 1
         self.client.build_interval = 1
@@ -47,3 +52,259 @@ class TestImageWaiters(base.TestCase):
         self.assertRaises(exceptions.AddImageException,
                           waiters.wait_for_image_status,
                           self.client, 'fake_image_id', 'active')
+
+    def test_wait_for_image_status_recorded(self):
+        self.client.get_image.side_effect = [(None, {'status': 'saving'}),
+                                             (None, {'status': 'active'})]
+        waiters.wait_for_image_status(self.client, 'fake_image_id', 'active')
+        self.assertIsNotNone(waiters.WAIT_STATS.expected('image', 'active'))
+        self.assertIsNone(waiters.WAIT_STATS.expected('image', 'saving'))
+
+
+class TestWaitForStatus(base.TestCase):
+    def setUp(self):
+        super(TestWaitForStatus, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.stubs.Set(waiters, 'WAIT_STATS', waiters.WaitStatistics())
+        self.sleep = self.patch('time.sleep')
+        self.client = mock.MagicMock()
+        self.client.build_timeout = 10
+        self.client.build_interval = 1
+
+    def test_final_status(self):
+        get_status = mock.Mock(side_effect=['creating', 'creating',
+                                            'available'])
+        self.assertEqual('available',
+                         waiters.wait_for_status(get_status, ['available'],
+                                                 10, 1))
+        self.assertEqual(2, self.sleep.call_count)
+
+    def test_final_callable(self):
+        get_status = mock.Mock(side_effect=[1, 2, 3])
+        self.assertEqual(2, waiters.wait_for_status(
+            get_status, lambda status: status % 2 == 0, 10, 1))
+
+    def test_failed(self):
+        def failed(status):
+            if status == 'error':
+                raise exceptions.VolumeBuildErrorException(volume_id='fake')
+
+        get_status = mock.Mock(side_effect=['creating', 'error'])
+        self.assertRaises(exceptions.VolumeBuildErrorException,
+                          waiters.wait_for_status, get_status,
+                          ['available'], 10, 1, failed=failed)
+
+    def test_timeout(self):
+        exc = self.assertRaises(ValueError, waiters.wait_for_status,
+                                lambda: 'creating', ['available'], 0, 1,
+                                message='Timed out.',
+                                timeout_exception=ValueError)
+        self.assertEqual('Timed out. Current status: creating.', str(exc))
+
+    def test_stats_recorded(self):
+        waiters.wait_for_status(lambda: 'available', ['available'], 10, 1,
+                                stats_key=('volume', 'available'))
+        self.assertIsNotNone(waiters.WAIT_STATS.expected('volume',
+                                                         'available'))
+
+    def test_wait_for_resource_status(self):
+        get_resource = mock.Mock(side_effect=[
+            (None, {'status': 'creating'}),
+            (None, {'status': 'available', 'name': 'fake'})])
+        self.assertEqual(
+            (None, {'status': 'available', 'name': 'fake'}),
+            waiters.wait_for_resource_status(self.client, get_resource,
+                                             'fake_id', 'available'))
+        get_resource.assert_called_with('fake_id')
+
+    def test_wait_for_resource_status_failed(self):
+        failed = mock.Mock(side_effect=exceptions.BuildErrorException)
+        get_resource = mock.Mock(return_value=(None, {'state': 'error'}))
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_resource_status, self.client,
+                          get_resource, 'fake_id', 'available',
+                          failed=failed, status_key='state')
+        failed.assert_called_once_with({'state': 'error'})
+
+    def test_wait_for_deletion(self):
+        is_deleted = mock.Mock(side_effect=[False, True])
+        waiters.wait_for_deletion(self.client, is_deleted, 'fake_id')
+        self.assertEqual(2, is_deleted.call_count)
+
+    def test_wait_for_deletions(self):
+        checked = []
+
+        def map_concurrently(func, items):
+            checked.append(list(items))
+            return map(func, items)
+
+        self.client.map_concurrently.side_effect = map_concurrently
+        deleted = {'id1': [False, True], 'id2': [True],
+                   'id3': [False, False, True]}
+        waiters.wait_for_deletions(self.client,
+                                   lambda id: deleted[id].pop(0),
+                                   ['id1', 'id2', 'id3'])
+        self.assertEqual([['id1', 'id2', 'id3'], ['id1', 'id3'], ['id3']],
+                         checked)
+
+    def test_wait_for_deletions_timeout(self):
+        self.client.build_timeout = 0
+        self.client.map_concurrently.side_effect = lambda func, items: map(
+            func, items)
+        exc = self.assertRaises(exceptions.TimeoutException,
+                                waiters.wait_for_deletions, self.client,
+                                lambda id: id == 'id1', ['id1', 'id2'])
+        self.assertIn('Current status: id2 not deleted', str(exc))
+
+    def test_wait_for_deletion_timeout(self):
+        self.client.build_timeout = 0
+        exc = self.assertRaises(exceptions.TimeoutException,
+                                waiters.wait_for_deletion, self.client,
+                                lambda: False, 'fake_id', resource='port')
+        self.assertIn('port fake_id failed to be deleted', str(exc))
+        self.assertIn('Current status: not deleted', str(exc))
+
+
+class TestServerWaiters(base.TestCase):
+    def setUp(self):
+        super(TestServerWaiters, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.stubs.Set(waiters, 'WAIT_STATS', waiters.WaitStatistics())
+        self.client = mock.MagicMock()
+        self.client.build_timeout = 10
+        self.client.build_interval = 1
+        self.sleep = self.patch('time.sleep')
+
+    def test_no_ready_wait_with_task_state(self):
+        self.client.get_server.side_effect = [
+            (None, {'status': 'BUILD', 'OS-EXT-STS:task_state': 'spawning'}),
+            (None, {'status': 'ACTIVE', 'OS-EXT-STS:task_state': None})]
+        waiters.wait_for_server_status(self.client, 'fake_id', 'ACTIVE')
+        self.assertEqual(1, self.sleep.call_count)
+        self.assertTrue(self.sleep.call_args[0][0] <= 0.2)
+
+    def test_server_termination(self):
+        self.client.get_server.side_effect = [
+            (None, {'status': 'ACTIVE'}), exceptions.NotFound]
+        waiters.wait_for_server_termination(self.client, 'fake_id')
+        self.assertEqual(2, self.client.get_server.call_count)
+
+    def test_server_termination_error(self):
+        self.client.get_server.return_value = (None, {'status': 'ERROR'})
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_server_termination,
+                          self.client, 'fake_id')
+
+    def test_servers_termination(self):
+        self.client.list_servers_with_detail.side_effect = [
+            (None, {'servers': [{'id': 'id1', 'status': 'ACTIVE'},
+                                {'id': 'id2', 'status': 'ACTIVE'},
+                                {'id': 'other', 'status': 'ACTIVE'}]}),
+            (None, {'servers': [{'id': 'id2', 'status': 'ACTIVE'},
+                                {'id': 'other', 'status': 'ACTIVE'}]}),
+            (None, {'servers': [{'id': 'other', 'status': 'ACTIVE'}]})]
+        waiters.wait_for_servers_termination(self.client, ['id1', 'id2'])
+        self.assertEqual(3, self.client.list_servers_with_detail.call_count)
+        self.assertFalse(self.client.get_server.called)
+
+    def test_servers_termination_error(self):
+        self.client.list_servers_with_detail.side_effect = [
+            (None, {'servers': [{'id': 'id1', 'status': 'ERROR'},
+                                {'id': 'id2', 'status': 'ACTIVE'}]}),
+            (None, {'servers': [{'id': 'id1', 'status': 'ERROR'}]})]
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_servers_termination,
+                          self.client, ['id1', 'id2'])
+        self.assertEqual(2, self.client.list_servers_with_detail.call_count)
+
+    def test_ready_wait_without_task_state(self):
+        self.client.get_server.return_value = (None, {'status': 'ACTIVE'})
+        waiters.wait_for_server_status(self.client, 'fake_id', 'ACTIVE')
+        self.sleep.assert_called_once_with(config.CONF.compute.ready_wait)
+
+
+class TestServersWaiters(base.TestCase):
+    def setUp(self):
+        super(TestServersWaiters, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.stubs.Set(waiters, 'WAIT_STATS', waiters.WaitStatistics())
+        self.client = mock.MagicMock()
+        self.client.build_timeout = 10
+        self.client.build_interval = 1
+        self.sleep = self.patch('time.sleep')
+
+    @staticmethod
+    def _servers(*statuses):
+        return (None, {'servers': [
+            {'id': 'server%d' % i, 'status': status,
+             'OS-EXT-STS:task_state': None}
+            for i, status in enumerate(statuses)]})
+
+    def test_wait_for_servers_status(self):
+        self.client.list_servers_with_detail.side_effect = [
+            self._servers('BUILD', 'BUILD', 'ACTIVE'),
+            self._servers('ACTIVE', 'BUILD', 'ACTIVE'),
+            self._servers('ACTIVE', 'ACTIVE', 'ACTIVE', 'BUILD')]
+        waiters.wait_for_servers_status(self.client,
+                                        ['server0', 'server1', 'server2'],
+                                        'ACTIVE', params={'name': 'fake'})
+        self.assertEqual(3, self.client.list_servers_with_detail.call_count)
+        self.client.list_servers_with_detail.assert_called_with(
+            {'name': 'fake'})
+        self.assertEqual(2, self.sleep.call_count)
+        self.assertFalse(self.client.get_server.called)
+
+    def test_wait_for_servers_not_listed_yet(self):
+        self.client.list_servers_with_detail.side_effect = [
+            self._servers('ACTIVE'), self._servers('ACTIVE', 'ACTIVE')]
+        waiters.wait_for_servers_status(self.client, ['server0', 'server1'],
+                                        'ACTIVE')
+        self.assertEqual(2, self.client.list_servers_with_detail.call_count)
+
+    def test_wait_for_servers_error(self):
+        self.client.list_servers_with_detail.return_value = self._servers(
+            'ACTIVE', 'ERROR')
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_servers_status, self.client,
+                          ['server0', 'server1'], 'ACTIVE')
+
+    def test_wait_for_servers_timeout(self):
+        self.client.build_timeout = 0
+        self.client.list_servers_with_detail.return_value = self._servers(
+            'ACTIVE', 'BUILD')
+        exc = self.assertRaises(exceptions.TimeoutException,
+                                waiters.wait_for_servers_status, self.client,
+                                ['server0', 'server1'], 'ACTIVE')
+        self.assertIn('server1: BUILD/None', str(exc))
+        self.assertNotIn('server0', str(exc))
+
+
+class TestAdaptiveInterval(base.TestCase):
+    def setUp(self):
+        super(TestAdaptiveInterval, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.patch('random.uniform', return_value=0)
+        self.now = 1000.0
+        self.patch('time.time', side_effect=lambda: self.now)
+
+    def test_backoff_capped(self):
+        interval = waiters.AdaptiveInterval(1)
+        intervals = [interval.next_interval() for _ in range(6)]
+        self.assertEqual(0.2, intervals[0])
+        self.assertEqual(sorted(intervals), intervals)
+        self.assertEqual(1, intervals[-1])
+
+    def test_expected_duration(self):
+        interval = waiters.AdaptiveInterval(10, expected=8)
+        self.assertEqual(4, interval.next_interval())
+        self.now += 7.9
+        self.assertEqual(0.2, interval.next_interval())
+
+    def test_jitter(self):
+        self.patch('random.uniform', return_value=0.1)
+        interval = waiters.AdaptiveInterval(1)
+        self.assertAlmostEqual(0.18, interval.next_interval())
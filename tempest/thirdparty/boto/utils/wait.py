@@ -19,6 +19,7 @@ import time
 import boto.exception
 import testtools
 
+from tempest.common import waiters
 from tempest import config
 from tempest.openstack.common import log as logging
 
@@ -26,54 +27,48 @@ CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+def _wait(get_status, is_final, message, describe=str):
+    return waiters.wait_for_status(
+        get_status, is_final, CONF.boto.build_timeout,
+        CONF.boto.build_interval, resource='EC2 resource', message=message,
+        describe=describe,
+        timeout_exception=testtools.TestCase.failureException)
+
+
 def state_wait(lfunction, final_set=set(), valid_set=None):
     # TODO(afazekas): evaluate using ABC here
     if not isinstance(final_set, set):
         final_set = set((final_set,))
     if not isinstance(valid_set, set) and valid_set is not None:
         valid_set = set((valid_set,))
-    start_time = time.time()
-    old_status = status = lfunction()
-    while True:
-        if status != old_status:
-            LOG.info('State transition "%s" ==> "%s" %d second', old_status,
-                     status, time.time() - start_time)
+
+    def is_final(status):
         if status in final_set:
-            return status
-        if valid_set is not None and status not in valid_set:
-            return status
-        dtime = time.time() - start_time
-        if dtime > CONF.boto.build_timeout:
-            raise testtools.TestCase\
-                .failureException("State change timeout exceeded!"
-                                  '(%ds) While waiting'
-                                  'for %s at "%s"' %
-                                  (dtime, final_set, status))
-        time.sleep(CONF.boto.build_interval)
-        old_status = status
-        status = lfunction()
+            return True
+        return valid_set is not None and status not in valid_set
+
+    return _wait(lfunction, is_final,
+                 "State change timeout exceeded! (%ds) While waiting for "
+                 "%s." % (CONF.boto.build_timeout, final_set))
+
+
+def _describe_text(text):
+    # Console outputs are too long to be logged on every change
+    if len(text) <= 80:
+        return text
+    return '...%s (%d characters)' % (text[-80:], len(text))
 
 
 def re_search_wait(lfunction, regexp):
     """Stops waiting on success."""
     start_time = time.time()
-    while True:
-        text = lfunction()
-        result = re.search(regexp, text)
-        if result is not None:
-            LOG.info('Pattern "%s" found in %d second in "%s"',
-                     regexp,
-                     time.time() - start_time,
-                     text)
-            return result
-        dtime = time.time() - start_time
-        if dtime > CONF.boto.build_timeout:
-            raise testtools.TestCase\
-                .failureException('Pattern find timeout exceeded!'
-                                  '(%ds) While waiting for'
-                                  '"%s" pattern in "%s"' %
-                                  (dtime, regexp, text))
-        time.sleep(CONF.boto.build_interval)
+    text = _wait(lfunction, lambda text: re.search(regexp, text),
+                 'Pattern find timeout exceeded! (%ds) While waiting for '
+                 '"%s" pattern.' % (CONF.boto.build_timeout, regexp),
+                 describe=_describe_text)
+    LOG.info('Pattern "%s" found in %d second in "%s"',
+             regexp, time.time() - start_time, text)
+    return re.search(regexp, text)
 
 
 def wait_no_exception(lfunction, exc_class=None, exc_matcher=None):
@@ -84,13 +79,10 @@ def wait_no_exception(lfunction, exc_class=None, exc_matcher=None):
 
     if exc_class is None:
         exc_class = BaseException
-    while True:
-        result = None
+
+    def get_status():
         try:
-            result = lfunction()
-            LOG.info('No Exception in %d second',
-                     time.time() - start_time)
-            return result
+            return True, lfunction()
         except exc_class as exc:
             if exc_matcher is not None:
                 res = exc_matcher.match(exc)
@@ -98,28 +90,31 @@ def wait_no_exception(lfunction, exc_class=None, exc_matcher=None):
                     LOG.info(res)
                     raise exc
         # Let the other exceptions propagate
-        dtime = time.time() - start_time
-        if dtime > CONF.boto.build_timeout:
-            raise testtools.TestCase\
-                .failureException("Wait timeout exceeded! (%ds)" % dtime)
-        time.sleep(CONF.boto.build_interval)
+        return False, None
+
+    success, result = _wait(
+        get_status, lambda status: status[0],
+        "Wait timeout exceeded! (%ds)" % CONF.boto.build_timeout,
+        describe=lambda status: 'success' if status[0] else 'exception')
+    LOG.info('No Exception in %d second', time.time() - start_time)
+    return result
 
 
 # NOTE(afazekas): EC2/boto normally raise exception instead of empty list
 def wait_exception(lfunction):
     """Returns with the exception or raises one."""
     start_time = time.time()
-    while True:
+
+    def get_status():
         try:
             lfunction()
         except BaseException as exc:
-            LOG.info('Exception in %d second',
-                     time.time() - start_time)
             return exc
-        dtime = time.time() - start_time
-        if dtime > CONF.boto.build_timeout:
-            raise testtools.TestCase\
-                .failureException("Wait timeout exceeded! (%ds)" % dtime)
-        time.sleep(CONF.boto.build_interval)
+
+    exc = _wait(get_status, lambda exc: exc is not None,
+                "Wait timeout exceeded! (%ds)" % CONF.boto.build_timeout,
+                describe=lambda exc: 'exception' if exc else 'success')
+    LOG.info('Exception in %d second', time.time() - start_time)
+    return exc
 
 # TODO(afazekas): consider strategy design pattern..
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Create or delete the pre-provisioned accounts of a credential pool.
+
+The accounts, tenants and users with their network resources when Neutron
+is available, are created with the admin credentials of tempest.conf and
+written to a JSON file to use as [compute] credential_pool_file. Each test
+process leases up to three accounts at a time (primary, alt and admin), so
+create about two regular and one admin account per test worker.
+"""
+
+import argparse
+import json
+import sys
+
+from tempest.common import isolated_creds
+from tempest import config
+
+CONF = config.CONF
+
+NETWORK_RESOURCES = dict(network=True, subnet=True, router=True, dhcp=True)
+
+
+def _get_isolated_creds():
+    creds = isolated_creds.IsolatedCreds('tempest-pool',
+                                         network_resources=NETWORK_RESOURCES)
+    # Never lease accounts from an already configured pool
+    creds.credential_pool = None
+    return creds
+
+
+def _resource(resource, *keys):
+    if resource is not None:
+        return dict((key, resource[key]) for key in ('id', 'name') + keys)
+
+
+def create_accounts(count, admin_count):
+    creds = _get_isolated_creds()
+    accounts = []
+    for index in range(count + admin_count):
+        admin = index >= count
+        user, tenant = creds._create_creds(suffix='-pool', admin=admin)
+        account = dict(username=user['name'], password=creds.password,
+                       tenant_name=tenant['name'], user_id=user['id'],
+                       tenant_id=tenant['id'], admin=admin)
+        if CONF.service_available.neutron:
+            network, subnet, router = creds._create_network_resources(
+                tenant['id'])
+            account.update(network=_resource(network),
+                           subnet=_resource(subnet, 'cidr'),
+                           router=_resource(router))
+        accounts.append(account)
+        print("Created account %s" % account['username'])
+    return accounts
+
+
+def delete_accounts(accounts):
+    creds = _get_isolated_creds()
+    for index, account in enumerate(accounts):
+        cred_type = str(index)
+        creds.isolated_creds[cred_type] = (
+            dict(id=account['user_id'], name=account['username']),
+            dict(id=account['tenant_id'], name=account['tenant_name']))
+        if account.get('network'):
+            creds.isolated_net_resources[cred_type] = (
+                account['network'], account['subnet'], account['router'])
+    creds.clear_isolated_creds()
+    print("Deleted %d accounts" % len(accounts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('path', help='Path of the credential pool file')
+    parser.add_argument('--delete', action='store_true',
+                        help='Delete the accounts listed in the file')
+    parser.add_argument('-n', '--count', type=int, default=8,
+                        help='Number of regular accounts to create')
+    parser.add_argument('-a', '--admin-count', type=int, default=4,
+                        help='Number of admin accounts to create')
+    args = parser.parse_args()
+
+    if args.delete:
+        with open(args.path) as f:
+            delete_accounts(json.load(f))
+    else:
+        accounts = create_accounts(args.count, args.admin_count)
+        with open(args.path, 'w') as f:
+            json.dump(accounts, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the time it takes to import tempest modules.
+
+Each import is timed in a fresh interpreter, several times, and the best
+and median times are reported along with the number of modules loaded.
+A maximum time can be given to use this as a regression check.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+SCRIPT = """
+import json
+import sys
+import time
+start = time.time()
+__import__(sys.argv[1])
+print(json.dumps([time.time() - start, len(sys.modules)]))
+"""
+
+
+def time_import(module):
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT, module])
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('modules', nargs='*', default=['tempest.clients'],
+                        help='Modules to import, tempest.clients by default')
+    parser.add_argument('-n', '--runs', type=int, default=5,
+                        help='Number of imports of each module')
+    parser.add_argument('--max-time', type=float,
+                        help='Fail if the best import time, in seconds, of '
+                             'any module is above this')
+    args = parser.parse_args()
+
+    status = 0
+    for module in args.modules:
+        results = [time_import(module) for _ in range(args.runs)]
+        times = sorted(result[0] for result in results)
+        best, median = times[0], times[len(times) // 2]
+        print("%s: best %.3fs, median %.3fs, %d modules loaded" %
+              (module, best, median, results[0][1]))
+        if args.max_time is not None and best > args.max_time:
+            print("%s takes more than %.3fs to import" %
+                  (module, args.max_time))
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
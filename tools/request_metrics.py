@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Merge the REST request statistics written by each test process.
+
+Test processes write them to the [service-clients] request_metrics_dir
+directory when it is set. This aggregates all the per worker files found
+there into a single JSON and CSV report for the whole run.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+from tempest.common import rest_client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('metrics_dir',
+                        help='Directory containing the per worker files')
+    parser.add_argument('-o', '--output', default='request-metrics',
+                        help='Path of the reports, without extension')
+    args = parser.parse_args()
+
+    paths = glob.glob(os.path.join(args.metrics_dir,
+                                   'request-metrics-*.json'))
+    if not paths:
+        print("No request metrics found in %s" % args.metrics_dir)
+        return 1
+    metrics = rest_client.RequestMetrics()
+    for path in paths:
+        with open(path) as f:
+            metrics.merge(rest_client.RequestMetrics.from_dict(json.load(f)))
+    metrics.dump_json(args.output + '.json')
+    metrics.dump_csv(args.output + '.csv')
+    print("Merged %d files into %s.json and %s.csv" %
+          (len(paths), args.output, args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())